@@ -65,11 +65,13 @@ CREATE TABLE tareas (
     fecha_entrega DATE NOT NULL,
     puntos INT DEFAULT 20,
     profesor_id VARCHAR(20) NOT NULL,
-    estado ENUM('activa', 'cerrada', 'archivada') DEFAULT 'activa',
+    estado ENUM('activa', 'cerrada', 'archivada', 'eliminada') DEFAULT 'activa',
     FOREIGN KEY (profesor_id) REFERENCES usuarios(id) ON DELETE CASCADE,
     INDEX idx_profesor (profesor_id),
     INDEX idx_fecha_entrega (fecha_entrega),
-    INDEX idx_curso (curso)
+    INDEX idx_curso (curso),
+    -- Búsqueda por texto (GET /api/tareas/buscar)
+    FULLTEXT INDEX ft_tareas_texto (titulo, descripcion)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ============================================
@@ -133,11 +135,76 @@ CREATE TABLE asignaciones (
     UNIQUE KEY unique_asignacion (profesor_id, curso_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ============================================
+-- TABLA: AGREGADOS_ESTUDIANTE
+-- Suma y cantidad de notas por estudiante, mantenidas por los triggers
+-- ============================================
+CREATE TABLE agregados_estudiante (
+    estudiante_id VARCHAR(20) PRIMARY KEY,
+    suma_notas DECIMAL(12,2) NOT NULL DEFAULT 0,
+    calificadas INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (estudiante_id) REFERENCES usuarios(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- TABLA: AGREGADOS_CURSO
+-- Suma y cantidad de notas por curso, mantenidas por los triggers
+-- ============================================
+CREATE TABLE agregados_curso (
+    curso VARCHAR(100) PRIMARY KEY,
+    suma_notas DECIMAL(14,2) NOT NULL DEFAULT 0,
+    calificadas INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================
+-- TABLA: CONTADORES
+-- Contadores globales (p. ej. total de tareas) mantenidos por los triggers
+-- ============================================
+CREATE TABLE contadores (
+    nombre VARCHAR(50) PRIMARY KEY,
+    valor BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO contadores (nombre, valor) VALUES ('total_tareas', 0);
+
 -- ============================================
 -- TRIGGERS
 -- ============================================
 
--- Trigger: Actualizar contador de tareas del profesor
+-- Procedimiento: Acumular una variación de notas en los agregados (O(1)).
+-- Lo usan los triggers de entregas; también actualiza promedio_general y
+-- tareas_completadas de estudiantes a partir de la suma y cantidad acumuladas.
+DELIMITER $$
+CREATE PROCEDURE sp_acumular_nota(
+    IN p_estudiante_id VARCHAR(20),
+    IN p_tarea_id INT,
+    IN p_suma DECIMAL(6,2),
+    IN p_cantidad INT
+)
+BEGIN
+    IF p_suma <> 0 OR p_cantidad <> 0 THEN
+        INSERT INTO agregados_estudiante (estudiante_id, suma_notas, calificadas)
+        VALUES (p_estudiante_id, p_suma, p_cantidad)
+        ON DUPLICATE KEY UPDATE
+            suma_notas = suma_notas + p_suma,
+            calificadas = calificadas + p_cantidad;
+        
+        INSERT INTO agregados_curso (curso, suma_notas, calificadas)
+        SELECT t.curso, p_suma, p_cantidad FROM tareas t WHERE t.id = p_tarea_id
+        ON DUPLICATE KEY UPDATE
+            suma_notas = suma_notas + p_suma,
+            calificadas = calificadas + p_cantidad;
+        
+        UPDATE estudiantes e
+        JOIN agregados_estudiante a ON a.estudiante_id = e.usuario_id
+        SET e.promedio_general = IF(a.calificadas > 0, a.suma_notas / a.calificadas, 0),
+            e.tareas_completadas = a.calificadas
+        WHERE e.usuario_id = p_estudiante_id;
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger: Actualizar contador de tareas del profesor y el total global
 DELIMITER $$
 CREATE TRIGGER after_tarea_insert
 AFTER INSERT ON tareas
@@ -146,41 +213,106 @@ BEGIN
     UPDATE profesores 
     SET total_tareas_creadas = total_tareas_creadas + 1
     WHERE usuario_id = NEW.profesor_id;
+    
+    UPDATE contadores SET valor = valor + 1 WHERE nombre = 'total_tareas';
 END$$
 DELIMITER ;
 
--- Trigger: Actualizar promedio del estudiante
+-- Trigger: Descontar las notas de una tarea eliminada de los agregados.
+-- El ON DELETE CASCADE de entregas no dispara sus triggers, por eso se
+-- descuentan aquí antes de borrar la tarea.
+DELIMITER $$
+CREATE TRIGGER before_tarea_delete
+BEFORE DELETE ON tareas
+FOR EACH ROW
+BEGIN
+    UPDATE agregados_estudiante a
+    JOIN (
+        SELECT estudiante_id, SUM(nota) AS suma, COUNT(nota) AS cantidad
+        FROM entregas
+        WHERE tarea_id = OLD.id AND nota IS NOT NULL
+        GROUP BY estudiante_id
+    ) d ON d.estudiante_id = a.estudiante_id
+    SET a.suma_notas = a.suma_notas - d.suma,
+        a.calificadas = a.calificadas - d.cantidad;
+    
+    UPDATE agregados_curso c
+    JOIN (
+        SELECT SUM(nota) AS suma, COUNT(nota) AS cantidad
+        FROM entregas
+        WHERE tarea_id = OLD.id AND nota IS NOT NULL
+    ) d
+    SET c.suma_notas = c.suma_notas - IFNULL(d.suma, 0),
+        c.calificadas = c.calificadas - d.cantidad
+    WHERE c.curso = OLD.curso;
+    
+    UPDATE estudiantes e
+    JOIN agregados_estudiante a ON a.estudiante_id = e.usuario_id
+    JOIN entregas en ON en.estudiante_id = e.usuario_id
+        AND en.tarea_id = OLD.id AND en.nota IS NOT NULL
+    SET e.promedio_general = IF(a.calificadas > 0, a.suma_notas / a.calificadas, 0),
+        e.tareas_completadas = a.calificadas;
+    
+    -- Las tareas eliminadas con borrado lógico ya se descontaron al marcarlas
+    IF OLD.estado <> 'eliminada' THEN
+        UPDATE contadores SET valor = valor - 1 WHERE nombre = 'total_tareas';
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger: Descontar del total una tarea marcada como eliminada (o restaurada).
+-- Sus notas siguen en los agregados hasta que el purgador borra las entregas
+-- por lotes (after_calificacion_delete las va descontando).
+DELIMITER $$
+CREATE TRIGGER after_tarea_update
+AFTER UPDATE ON tareas
+FOR EACH ROW
+BEGIN
+    IF NEW.estado = 'eliminada' AND OLD.estado <> 'eliminada' THEN
+        UPDATE contadores SET valor = valor - 1 WHERE nombre = 'total_tareas';
+    ELSEIF OLD.estado = 'eliminada' AND NEW.estado <> 'eliminada' THEN
+        UPDATE contadores SET valor = valor + 1 WHERE nombre = 'total_tareas';
+    END IF;
+END$$
+DELIMITER ;
+
+-- Trigger: Actualizar agregados del estudiante y del curso (variación O(1))
 DELIMITER $$
 CREATE TRIGGER after_calificacion_update
 AFTER UPDATE ON entregas
 FOR EACH ROW
 BEGIN
-    IF NEW.nota IS NOT NULL THEN
-        UPDATE estudiantes
-        SET promedio_general = (
-            SELECT AVG(nota)
-            FROM entregas
-            WHERE estudiante_id = NEW.estudiante_id
-            AND nota IS NOT NULL
-        ),
-        tareas_completadas = (
-            SELECT COUNT(*)
-            FROM entregas
-            WHERE estudiante_id = NEW.estudiante_id
-            AND nota IS NOT NULL
-        )
-        WHERE usuario_id = NEW.estudiante_id;
+    IF NOT (OLD.nota <=> NEW.nota) OR OLD.estudiante_id <> NEW.estudiante_id
+        OR OLD.tarea_id <> NEW.tarea_id THEN
+        CALL sp_acumular_nota(OLD.estudiante_id, OLD.tarea_id,
+                            -IFNULL(OLD.nota, 0), -(OLD.nota IS NOT NULL));
+        CALL sp_acumular_nota(NEW.estudiante_id, NEW.tarea_id,
+                            IFNULL(NEW.nota, 0), (NEW.nota IS NOT NULL));
+    END IF;
+    
+    -- Al recalificar (upsert sobre una entrega existente) también se avisa
+    IF NEW.nota IS NOT NULL AND NOT (OLD.nota <=> NEW.nota) THEN
+        INSERT INTO notificaciones (usuario_id, tipo, titulo, mensaje)
+        SELECT 
+            NEW.estudiante_id,
+            'success',
+            IF(OLD.nota IS NULL, 'Tarea Calificada', 'Calificación Actualizada'),
+            CONCAT('Tu tarea "', t.titulo, '" ha sido calificada: ', NEW.nota, '/20')
+        FROM tareas t
+        WHERE t.id = NEW.tarea_id;
     END IF;
 END$$
 DELIMITER ;
 
--- Trigger: Crear notificación al calificar
+-- Trigger: Crear notificación al calificar y actualizar agregados
 DELIMITER $$
 CREATE TRIGGER after_calificacion_insert
 AFTER INSERT ON entregas
 FOR EACH ROW
 BEGIN
     IF NEW.nota IS NOT NULL THEN
+        CALL sp_acumular_nota(NEW.estudiante_id, NEW.tarea_id, NEW.nota, 1);
+        
         INSERT INTO notificaciones (usuario_id, tipo, titulo, mensaje)
         SELECT 
             NEW.estudiante_id,
@@ -193,6 +325,18 @@ BEGIN
 END$$
 DELIMITER ;
 
+-- Trigger: Descontar de los agregados una entrega eliminada
+DELIMITER $$
+CREATE TRIGGER after_calificacion_delete
+AFTER DELETE ON entregas
+FOR EACH ROW
+BEGIN
+    IF OLD.nota IS NOT NULL THEN
+        CALL sp_acumular_nota(OLD.estudiante_id, OLD.tarea_id, -OLD.nota, -1);
+    END IF;
+END$$
+DELIMITER ;
+
 -- ============================================
 -- DATOS INICIALES
 -- ============================================
@@ -335,9 +479,18 @@ DELIMITER ;
 -- ÍNDICES ADICIONALES PARA OPTIMIZACIÓN
 -- ============================================
 
+-- Listados de tareas por estado paginados por (fecha_entrega, id) y cierre
+-- de las vencidas; en InnoDB el índice ya incluye la clave primaria.
 CREATE INDEX idx_tareas_estado_fecha ON tareas(estado, fecha_entrega);
+CREATE INDEX idx_tareas_profesor_estado_fecha ON tareas(profesor_id, estado, fecha_entrega);
 CREATE INDEX idx_entregas_calificacion ON entregas(estudiante_id, nota);
 CREATE INDEX idx_usuarios_activo ON usuarios(activo, tipo);
+-- Orden de los listados paginados por cursor (apellidos, nombres, id).
+CREATE INDEX idx_usuarios_tipo_nombre ON usuarios(tipo, apellidos, nombres, id);
+-- Libretas de calificaciones por grado y sección
+CREATE INDEX idx_estudiantes_grado_seccion ON estudiantes(grado, seccion);
+-- Listado de notificaciones no leídas por usuario (el id va implícito en el índice)
+CREATE INDEX idx_notificaciones_usuario_leida ON notificaciones(usuario_id, leida);
 
 -- ============================================
 -- COMENTARIOS DE DOCUMENTACIÓN
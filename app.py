@@ -3,87 +3,224 @@
 # Sistema de Gestión Educativa - Colegio Miguel Grau
 # ============================================
 
+import atexit
+import os
+import threading
 from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_mysqldb import MySQL
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime
 
 # Importar configuración
 from backend.config import Config
+from backend.seguridad import cache_tokens
+from backend.cache import cache_respuestas
+from backend.eventos import canal_eventos
+from backend.ranking import indice_ranking
+from backend.purga import purgador
+from backend.planificador import planificador, cierre_tareas
+from backend.db import BaseDatos, CABECERA_PRIMARIA
+from backend.metricas import init_metricas, registro
+from backend.hashing import pool_hashing
+from backend.accesos import buffer_accesos
+from backend.admision import control_admision
+from backend.recursos import CatalogoRecursos
+from backend.imagenes import CatalogoImagenes
+from backend.respuestas import init_respuestas, compresor_respuestas
+from backend.utils import generar_token, verificar_token
 
 # Importar funciones de inicialización de rutas
-from backend.auth_routes import init_auth_routes, auth_bp
-from backend.tareas_routes import init_tareas_routes, tareas_bp
-from backend.calificaciones_routes import init_calificaciones_routes, calificaciones_bp
+from backend.auth_routes import init_auth_routes
+from backend.tareas_routes import init_tareas_routes
+from backend.calificaciones_routes import init_calificaciones_routes
+from backend.notificaciones_routes import init_notificaciones_routes
+from backend.ranking_routes import init_ranking_routes
+from backend.dashboard_routes import init_dashboard_routes
+from backend.recursos_routes import init_recursos_routes
+from backend.imagenes_routes import init_imagenes_routes
 
 # ============================================
-# INICIALIZACIÓN DE LA APLICACIÓN
+# FÁBRICA DE LA APLICACIÓN
 # ============================================
 
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Inicializar extensiones
-CORS(app)  # Permitir peticiones desde el frontend
-mysql = MySQL(app)
-
-# ============================================
-# REGISTRO DE BLUEPRINTS (RUTAS MODULARES)
-# ============================================
-
-# Inicializar rutas con sus dependencias
-auth_blueprint = init_auth_routes(mysql, app)
-tareas_blueprint = init_tareas_routes(mysql, app)
-calificaciones_blueprint = init_calificaciones_routes(mysql, app)
-
-# Registrar blueprints con sus prefijos
-app.register_blueprint(auth_blueprint, url_prefix='/api')
-app.register_blueprint(tareas_blueprint, url_prefix='/api/tareas')
-app.register_blueprint(calificaciones_blueprint, url_prefix='/api/calificaciones')
-
-# ============================================
-# RUTA DE SALUD
-# ============================================
+def crear_app(config=Config):
+    """Crea y configura una instancia de la aplicación"""
+    app = Flask(__name__)
+    app.config.from_object(config)
+    if app.config['PROXIES_CONFIABLES']:
+        # IP real del cliente (límites de admisión) detrás de nginx o un balanceador
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXIES_CONFIABLES'])
+    
+    # Inicializar extensiones
+    CORS(app, expose_headers=[CABECERA_PRIMARIA, 'Retry-After'])  # Permitir peticiones desde el frontend
+    db = BaseDatos(app)  # Pool de conexiones MySQL compartido por los blueprints
+    init_respuestas(app)  # JSON con orjson y compresión br/gzip de las respuestas
+    
+    # ============================================
+    # REGISTRO DE BLUEPRINTS (RUTAS MODULARES)
+    # ============================================
+    
+    # Inicializar rutas con sus dependencias
+    auth_blueprint = init_auth_routes(db, app)
+    tareas_blueprint = init_tareas_routes(db, app)
+    calificaciones_blueprint = init_calificaciones_routes(db, app)
+    notificaciones_blueprint = init_notificaciones_routes(db, app)
+    ranking_blueprint = init_ranking_routes(db, app)
+    dashboard_blueprint = init_dashboard_routes(db, app)
+    
+    # Registrar blueprints con sus prefijos
+    app.register_blueprint(auth_blueprint, url_prefix='/api')
+    app.register_blueprint(tareas_blueprint, url_prefix='/api/tareas')
+    app.register_blueprint(calificaciones_blueprint, url_prefix='/api/calificaciones')
+    app.register_blueprint(notificaciones_blueprint, url_prefix='/api/notificaciones')
+    app.register_blueprint(ranking_blueprint, url_prefix='/api/ranking')
+    app.register_blueprint(dashboard_blueprint, url_prefix='/api/dashboard')
+    
+    # Frontend: recursos con huella y precomprimidos (python -m backend.recursos)
+    recursos = CatalogoRecursos.cargar(app.config['RECURSOS_DIRECTORIO'])
+    if recursos is not None:
+        app.register_blueprint(init_recursos_routes(recursos, app))
+    else:
+        print(f"Aviso: sin recursos construidos en {app.config['RECURSOS_DIRECTORIO']}; "
+              "el frontend no se sirve desde Flask")
+    
+    # Derivados responsivos de las imágenes (requiere Pillow)
+    imagenes = CatalogoImagenes.cargar(app.config['IMAGENES_DIRECTORIO'], app.config['IMAGENES_CACHE_DIRECTORIO'],
+                                    app.config['IMAGENES_CACHE_MAX_BYTES'], app.config['IMAGENES_ANCHOS'])
+    if imagenes is not None:
+        app.register_blueprint(init_imagenes_routes(imagenes, app))
+    else:
+        print("Aviso: sin Pillow no se sirven los derivados responsivos de las imágenes")
+    
+    # ============================================
+    # MÉTRICAS
+    # ============================================
+    
+    init_metricas(app)
+    registro.registrar_colector('pool_conexiones', db.estadisticas)
+    registro.registrar_colector('replicas', db.estadisticas_replicas)
+    registro.registrar_colector('cache_tokens', cache_tokens.estadisticas)
+    registro.registrar_colector('cache_respuestas', cache_respuestas.estadisticas)
+    registro.registrar_colector('eventos', canal_eventos.estadisticas)
+    registro.registrar_colector('ranking', indice_ranking.estadisticas)
+    registro.registrar_colector('planificador', planificador.estadisticas)
+    registro.registrar_colector('cierre', cierre_tareas.estadisticas)
+    registro.registrar_colector('purga', purgador.estadisticas)
+    registro.registrar_colector('accesos', buffer_accesos.estadisticas)
+    registro.registrar_colector('admision', control_admision.estadisticas)
+    registro.registrar_colector('respuestas', compresor_respuestas.estadisticas)
+    if recursos is not None:
+        registro.registrar_colector('recursos', recursos.estadisticas)
+    if imagenes is not None:
+        registro.registrar_colector('imagenes', imagenes.estadisticas)
+    registro.registrar_colector('hashing', lambda: {'rechazadas': pool_hashing.rechazadas})
+    
+    # ============================================
+    # ARRANQUE DIFERIDO
+    # ============================================
+    
+    @app.before_request
+    def calentar_si_falta():
+        """Sin post_fork (`gunicorn app:app` sin -c, `flask run`) nadie llama a calentar():
+        la primera petición de cada proceso arranca el planificador, el guardado
+        de accesos y el ranking"""
+        if app.extensions.get('calentado_en') != os.getpid():
+            calentar_en_primera_peticion(app)
+    
+    # ============================================
+    # RUTA DE SALUD
+    # ============================================
+    
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        """Verifica que el servidor esté funcionando"""
+        # El estado de la base de datos se deduce del pool, sin abrir otra consulta
+        db_status = "OK" if db.pool.saludable() else "ERROR"
+        
+        return jsonify({
+            'status': 'OK',
+            'mensaje': 'Servidor funcionando correctamente',
+            'database': db_status,
+            'pool': db.estadisticas(),
+            'replicas': db.estadisticas_replicas(),
+            'cache_tokens': cache_tokens.estadisticas(),
+            'cache_respuestas': cache_respuestas.estadisticas(),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+    
+    # ============================================
+    # MANEJO DE ERRORES
+    # ============================================
+    
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({
+            'exito': False,
+            'mensaje': 'Ruta no encontrada'
+        }), 404
+    
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({
+            'exito': False,
+            'mensaje': 'Error interno del servidor'
+        }), 500
+    
+    return app
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Verifica que el servidor esté funcionando"""
+def calentar(app):
+    """Abre las conexiones mínimas del pool, construye el ranking, arranca el
+    pool de hashing, el planificador y el guardado de los últimos accesos y
+    ejercita la firma JWT, para que la primera petición no pague ese costo.
+    
+    Se llama en cada proceso que atiende peticiones (p. ej. en el post_fork
+    de gunicorn), nunca antes de hacer fork. Si no se llamó, la primera
+    petición del proceso lo hace (calentar_en_primera_peticion).
+    """
+    app.extensions['calentado_en'] = os.getpid()
+    db = app.extensions['base_datos']
     try:
-        # Verificar conexión a la base de datos
-        cur = mysql.connection.cursor()
-        cur.execute("SELECT 1")
-        cur.close()
-        db_status = "OK"
-    except:
-        db_status = "ERROR"
-    
-    return jsonify({
-        'status': 'OK',
-        'mensaje': 'Servidor funcionando correctamente',
-        'database': db_status,
-        'timestamp': datetime.now().isoformat()
-    }), 200
-
-# ============================================
-# MANEJO DE ERRORES
-# ============================================
-
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({
-        'exito': False,
-        'mensaje': 'Ruta no encontrada'
-    }), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({
-        'exito': False,
-        'mensaje': 'Error interno del servidor'
-    }), 500
+        db.pool.calentar()
+        db.replicas.calentar()
+        indice_ranking.asegurar(db.conexion)
+    except Exception as e:
+        print(f"Aviso: no se pudo abrir el pool de conexiones: {e}")
+    
+    pool_hashing.calentar()
+    buffer_accesos.iniciar(db.conexion)
+    if app.config['PLANIFICADOR_INTERVALO_SEGUNDOS']:
+        planificador.iniciar(db.pool.parametros, app.config['PLANIFICADOR_INTERVALO_SEGUNDOS'])
+    verificar_token(generar_token('calentamiento', 'profesor', app.config['SECRET_KEY'], 1),
+                    app.config['SECRET_KEY'])
+
+_calentando = threading.Lock()
+
+def calentar_en_primera_peticion(app):
+    """Llama a calentar() una sola vez por proceso y a cerrar() al salir"""
+    with _calentando:
+        if app.extensions.get('calentado_en') == os.getpid():
+            return
+        print(f"Aviso: proceso {os.getpid()} sin calentar al arrancar; se inicia en la primera "
+            "petición (en producción usar gunicorn -c gunicorn.conf.py)")
+        calentar(app)
+        atexit.register(cerrar, app)
+
+def cerrar(app):
+    """Detiene el planificador, guarda los últimos accesos pendientes y libera las
+    conexiones y los procesos de hashing del proceso actual"""
+    planificador.detener(timeout=5)
+    buffer_accesos.detener(timeout=5)
+    app.extensions['base_datos'].pool.cerrar()
+    app.extensions['base_datos'].replicas.cerrar()
+    pool_hashing.cerrar()
+
+# Instancia usada por `python app.py`, `gunicorn -c gunicorn.conf.py` (app:app) y
+# `flask run`. Solo los dos primeros llaman a calentar() al arrancar cada proceso;
+# en los demás casos lo hace la primera petición (ver calentar_si_falta)
+app = crear_app()
 
 # ============================================
-# INICIAR SERVIDOR
+# INICIAR SERVIDOR (DESARROLLO)
 # ============================================
 
 if __name__ == '__main__':
@@ -92,5 +229,10 @@ if __name__ == '__main__':
     print("=" * 60)
     print(f"📍 URL: http://localhost:{Config.PORT}")
     print(f"🔧 Modo: {'Desarrollo' if Config.DEBUG else 'Producción'}")
+    print("   Para producción usar: gunicorn -c gunicorn.conf.py")
     print("=" * 60)
-    app.run(debug=Config.DEBUG, port=Config.PORT)
+    calentar(app)
+    try:
+        app.run(debug=Config.DEBUG, port=Config.PORT)
+    finally:
+        cerrar(app)
@@ -0,0 +1,144 @@
+# ============================================
+# ÚLTIMO ACCESO CON ESCRITURA DIFERIDA
+# ============================================
+#
+# El login no escribe en usuarios: registra el momento del acceso en un
+# buffer en memoria que guarda solo el último de cada usuario. Un hilo lo
+# vacía cada ACCESOS_INTERVALO_SEGUNDOS, o antes si se juntan
+# ACCESOS_MAXIMO_PENDIENTES usuarios, con un único UPDATE por lote. Al
+# apagar el worker (cerrar en app.py) se guarda lo pendiente.
+#
+# El momento se anota con el reloj monótono del proceso y al guardar se
+# escribe como NOW() - INTERVAL <segundos transcurridos>: la hora sale del
+# reloj y de la zona horaria de la sesión de MySQL, igual que cuando el
+# login hacía UPDATE ... NOW(), aunque el servidor de la aplicación tenga
+# otra zona horaria.
+#
+# Si el proceso muere sin apagado ordenado se pierden como mucho los
+# accesos de un intervalo, que solo son informativos.
+
+import logging
+import threading
+import time
+from backend.config import Config
+
+logger_accesos = logging.getLogger('colegio.accesos')
+
+class BufferAccesos:
+    """Acumula el último acceso de cada usuario y lo guarda por lotes"""
+    
+    def __init__(self, maximo=500, intervalo=5):
+        self.maximo = maximo
+        self.intervalo = intervalo
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._lleno = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._conexion = None
+        self.registrados = 0
+        self.guardados = 0
+        self.lotes = 0
+        self.errores = 0
+    
+    def registrar(self, usuario_id, momento=None):
+        """Anota el acceso del usuario (sin tocar la base de datos); `momento` es de time.monotonic()"""
+        momento = time.monotonic() if momento is None else momento
+        with self._lock:
+            anterior = self._pendientes.get(usuario_id)
+            if anterior is None or momento > anterior:
+                self._pendientes[usuario_id] = momento
+            self.registrados += 1
+            lleno = len(self._pendientes) >= self.maximo
+        if lleno:
+            self._lleno.set()
+    
+    def _devolver(self, accesos):
+        # Tras un error los accesos vuelven al buffer sin pisar otros más recientes
+        with self._lock:
+            for usuario_id, momento in accesos.items():
+                anterior = self._pendientes.get(usuario_id)
+                if anterior is None or momento > anterior:
+                    self._pendientes[usuario_id] = momento
+    
+    def vaciar(self, conn):
+        """Guarda los accesos pendientes con un UPDATE por cada `maximo` usuarios"""
+        with self._lock:
+            accesos, self._pendientes = self._pendientes, {}
+            self._lleno.clear()
+        if not accesos:
+            return 0
+        
+        usuarios = sorted(accesos)
+        cur = conn.cursor()
+        try:
+            for inicio in range(0, len(usuarios), self.maximo):
+                lote = usuarios[inicio:inicio + self.maximo]
+                casos, parametros = [], []
+                ahora = time.monotonic()
+                for usuario_id in lote:
+                    # Segundos desde el acceso, restados al NOW() del servidor de base de datos
+                    casos.append('WHEN %s THEN NOW() - INTERVAL %s SECOND')
+                    parametros.extend((usuario_id, max(0, round(ahora - accesos[usuario_id]))))
+                marcadores = ', '.join(['%s'] * len(lote))
+                cur.execute(f"""
+                    UPDATE usuarios
+                    SET ultimo_acceso = CASE id {' '.join(casos)} END
+                    WHERE id IN ({marcadores})
+                """, parametros + lote)
+                conn.commit()
+                self.guardados += len(lote)
+                self.lotes += 1
+        except Exception:
+            conn.rollback()
+            self.errores += 1
+            self._devolver({u: accesos[u] for u in usuarios[inicio:]})
+            raise
+        finally:
+            cur.close()
+        return len(usuarios)
+    
+    def _vaciar_con_conexion(self):
+        try:
+            with self._conexion() as conn:
+                self.vaciar(conn)
+        except Exception as e:
+            logger_accesos.warning('No se pudieron guardar los últimos accesos: %s', e)
+    
+    def iniciar(self, conexion):
+        """Arranca el hilo de vaciado; `conexion` devuelve un context manager con una conexión"""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._conexion = conexion
+        
+        def ciclo():
+            while not self._detener.is_set():
+                self._lleno.wait(self.intervalo)
+                self._vaciar_con_conexion()
+        
+        self._detener.clear()
+        self._hilo = threading.Thread(target=ciclo, name='accesos', daemon=True)
+        self._hilo.start()
+    
+    def detener(self, timeout=None):
+        """Detiene el hilo y guarda lo que quede pendiente"""
+        self._detener.set()
+        self._lleno.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        if self._conexion is not None:
+            self._vaciar_con_conexion()
+    
+    def estadisticas(self):
+        with self._lock:
+            pendientes = len(self._pendientes)
+        return {
+            'pendientes': pendientes,
+            'registrados': self.registrados,
+            'guardados': self.guardados,
+            'lotes': self.lotes,
+            'errores': self.errores
+        }
+
+buffer_accesos = BufferAccesos(Config.ACCESOS_MAXIMO_PENDIENTES, Config.ACCESOS_INTERVALO_SEGUNDOS)
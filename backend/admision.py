@@ -0,0 +1,175 @@
+# ============================================
+# CONTROL DE ADMISIÓN Y LÍMITES DE TASA
+# ============================================
+#
+# Login y registro calculan un hash de contraseña (decenas de ms de CPU a
+# propósito). Antes de llegar al handler, cada petición pasa por:
+#
+#   1. Cubetas de tokens por IP y por `id` de usuario, con un límite por clase
+#      de endpoint ("30/60" = ráfaga de 30 y 30 fichas cada 60 s). Sin fichas,
+#      429 inmediato con Retry-After.
+#   2. Un tope de peticiones simultáneas por worker para las rutas con hash:
+#      la petición espera como mucho ADMISION_HASH_ESPERA_SEGUNDOS un turno y
+#      si no lo obtiene se rechaza con 429 en vez de encolarse detrás de un
+#      ataque.
+#
+# El estado es de cada worker de gunicorn (el límite efectivo por IP es el
+# configurado por el número de workers).
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify
+from backend.config import Config
+
+def leer_limite(texto):
+    """Convierte "capacidad/segundos" en (capacidad, segundos), o None si está desactivado"""
+    if not texto or texto.strip().lower() in ('none', 'no'):
+        return None
+    capacidad, _, segundos = texto.partition('/')
+    return int(capacidad), float(segundos or 1)
+
+class LimitadorTasa:
+    """Cubetas de tokens por clave, con un máximo de claves recordadas (LRU)"""
+    
+    def __init__(self, capacidad, segundos, max_claves=100000):
+        self.capacidad = capacidad
+        self.por_segundo = capacidad / segundos
+        self.max_claves = max_claves
+        self._cubetas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def consumir(self, clave):
+        """Toma una ficha de la cubeta de `clave`; devuelve 0 o los segundos hasta la próxima ficha"""
+        ahora = time.monotonic()
+        with self._lock:
+            fichas, actualizada = self._cubetas.pop(clave, (self.capacidad, ahora))
+            fichas = min(self.capacidad, fichas + (ahora - actualizada) * self.por_segundo)
+            
+            if fichas >= 1:
+                espera = 0
+                fichas -= 1
+            else:
+                espera = (1 - fichas) / self.por_segundo
+            
+            self._cubetas[clave] = (fichas, ahora)
+            if len(self._cubetas) > self.max_claves:
+                # Las cubetas olvidadas vuelven llenas: solo se pierde la más antigua
+                self._cubetas.popitem(last=False)
+            return espera
+    
+    def claves(self):
+        with self._lock:
+            return len(self._cubetas)
+
+class ControlAdmision:
+    """Límites por clase de endpoint y tope de concurrencia de las rutas con hash"""
+    
+    def __init__(self, limites, concurrencia=4, espera=0.5, max_claves=100000):
+        # limites: {clase: {'ip': (capacidad, segundos) | None, 'usuario': ...}}
+        self.limitadores = {
+            (clase, tipo): LimitadorTasa(*limite, max_claves=max_claves)
+            for clase, por_tipo in limites.items()
+            for tipo, limite in por_tipo.items() if limite
+        }
+        self.concurrencia = concurrencia
+        self.espera = espera
+        self._turnos = threading.BoundedSemaphore(concurrencia)
+        self._lock = threading.Lock()
+        self.en_espera = 0
+        self.admitidas = 0
+        self.encoladas = 0
+        self.rechazadas_tasa = 0
+        self.rechazadas_concurrencia = 0
+    
+    def verificar_tasa(self, clase, ip, usuario_id=None):
+        """Devuelve 0 si la petición puede pasar o los segundos que debe esperar el cliente"""
+        espera = 0
+        for tipo, clave in (('ip', ip), ('usuario', usuario_id)):
+            limitador = self.limitadores.get((clase, tipo))
+            if limitador is not None and clave:
+                espera = max(espera, limitador.consumir(clave))
+        if espera:
+            with self._lock:
+                self.rechazadas_tasa += 1
+        return espera
+    
+    def tomar_turno(self):
+        """Espera un turno como mucho `espera` segundos; devuelve False si no lo obtuvo"""
+        obtenido = self._turnos.acquire(blocking=False)
+        if not obtenido:
+            with self._lock:
+                self.en_espera += 1
+                self.encoladas += 1
+            try:
+                obtenido = self._turnos.acquire(timeout=self.espera)
+            finally:
+                with self._lock:
+                    self.en_espera -= 1
+        
+        # Los contadores se actualizan bajo el lock: con varios hilos, `+= 1` pierde cuentas
+        with self._lock:
+            if obtenido:
+                self.admitidas += 1
+            else:
+                self.rechazadas_concurrencia += 1
+        return obtenido
+    
+    def liberar_turno(self):
+        self._turnos.release()
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'admitidas': self.admitidas,
+                'en_espera': self.en_espera,
+                'encoladas': self.encoladas,
+                'rechazadas_tasa': self.rechazadas_tasa,
+                'rechazadas_concurrencia': self.rechazadas_concurrencia,
+                'claves': sum(l.claves() for l in self.limitadores.values())
+            }
+
+def respuesta_saturado(segundos, mensaje='Demasiadas solicitudes, intenta más tarde', **datos):
+    """429 con Retry-After (en segundos enteros, como mínimo 1); `datos` se suman al cuerpo"""
+    respuesta = jsonify({'exito': False, 'mensaje': mensaje, **datos})
+    respuesta.status_code = 429
+    respuesta.headers['Retry-After'] = str(max(1, math.ceil(segundos)))
+    return respuesta
+
+control_admision = ControlAdmision(
+    {
+        'login': {'ip': leer_limite(Config.ADMISION_LOGIN_IP),
+                'usuario': leer_limite(Config.ADMISION_LOGIN_USUARIO)},
+        'registro': {'ip': leer_limite(Config.ADMISION_REGISTRO_IP),
+                    'usuario': leer_limite(Config.ADMISION_REGISTRO_USUARIO)}
+    },
+    concurrencia=Config.ADMISION_HASH_CONCURRENCIA,
+    espera=Config.ADMISION_HASH_ESPERA_SEGUNDOS,
+    max_claves=Config.ADMISION_MAX_CLAVES
+)
+
+def controlar_admision(clase):
+    """Aplica a una ruta con hash los límites de `clase` (por IP y por el `id`
+    del cuerpo JSON) y el tope de concurrencia.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            datos = request.get_json(silent=True)
+            usuario_id = datos.get('id') if isinstance(datos, dict) else None
+            
+            espera = control_admision.verificar_tasa(clase, request.remote_addr,
+                                                    str(usuario_id) if usuario_id else None)
+            if espera:
+                return respuesta_saturado(espera)
+            
+            if not control_admision.tomar_turno():
+                return respuesta_saturado(1, 'Servidor ocupado, intenta nuevamente')
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                control_admision.liberar_turno()
+        return envoltura
+    return decorador
@@ -3,18 +3,22 @@
 # ============================================
 
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from backend.utils import (
     validar_dni, validar_correo, validar_contrasena, 
     generar_token
 )
+from backend.hashing import pool_hashing, HashingSaturadoError
+from backend.accesos import buffer_accesos
+from backend.importacion import abrir_texto, importar_usuarios
+from backend.seguridad import requiere_token
+from backend.admision import controlar_admision, respuesta_saturado
 
-auth_bp = Blueprint('auth', __name__)
-
-def init_auth_routes(mysql, app):
+def init_auth_routes(db, app):
     """Inicializa las rutas de autenticación con las dependencias necesarias"""
+    auth_bp = Blueprint('auth', __name__)
     
     @auth_bp.route('/registro/profesor', methods=['POST'])
+    @controlar_admision('registro')
     def registro_profesor():
         """Registra un nuevo profesor"""
         try:
@@ -32,7 +36,7 @@ def init_auth_routes(mysql, app):
                 return jsonify({'exito': False, 'mensaje': mensaje}), 400
             
             # Verificar ID único
-            cur = mysql.connection.cursor()
+            cur = db.connection.cursor()
             cur.execute("SELECT id FROM usuarios WHERE id = %s", (datos['id'],))
             if cur.fetchone():
                 return jsonify({'exito': False, 'mensaje': 'Este ID ya está registrado'}), 400
@@ -43,7 +47,7 @@ def init_auth_routes(mysql, app):
                 return jsonify({'exito': False, 'mensaje': 'Este correo ya está registrado'}), 400
             
             # Hash de la contraseña
-            hash_contrasena = generate_password_hash(datos['contrasena'])
+            hash_contrasena = pool_hashing.generar(datos['contrasena'])
             
             # Insertar usuario
             cur.execute("""
@@ -58,7 +62,7 @@ def init_auth_routes(mysql, app):
                 VALUES (%s, %s)
             """, (datos['id'], datos.get('especialidad', '')))
             
-            mysql.connection.commit()
+            db.connection.commit()
             cur.close()
             
             return jsonify({
@@ -66,11 +70,14 @@ def init_auth_routes(mysql, app):
                 'mensaje': 'Registro exitoso. Ahora puedes iniciar sesión.'
             }), 201
             
+        except HashingSaturadoError:
+            return respuesta_saturado(1, 'Servidor ocupado, intenta nuevamente')
         except Exception as e:
             print(f"Error en registro_profesor: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
 
     @auth_bp.route('/registro/estudiante', methods=['POST'])
+    @controlar_admision('registro')
     def registro_estudiante():
         """Registra un nuevo estudiante"""
         try:
@@ -88,14 +95,14 @@ def init_auth_routes(mysql, app):
                 return jsonify({'exito': False, 'mensaje': mensaje}), 400
             
             # Verificar ID y correo únicos
-            cur = mysql.connection.cursor()
+            cur = db.connection.cursor()
             cur.execute("SELECT id FROM usuarios WHERE id = %s OR correo = %s", 
                     (datos['id'], datos['correo']))
             if cur.fetchone():
                 return jsonify({'exito': False, 'mensaje': 'ID o correo ya registrado'}), 400
             
             # Hash de la contraseña
-            hash_contrasena = generate_password_hash(datos['contrasena'])
+            hash_contrasena = pool_hashing.generar(datos['contrasena'])
             
             # Insertar usuario
             cur.execute("""
@@ -110,7 +117,7 @@ def init_auth_routes(mysql, app):
                 VALUES (%s, %s, %s)
             """, (datos['id'], datos.get('grado', ''), datos.get('seccion', '')))
             
-            mysql.connection.commit()
+            db.connection.commit()
             cur.close()
             
             return jsonify({
@@ -118,40 +125,85 @@ def init_auth_routes(mysql, app):
                 'mensaje': 'Registro exitoso. Ahora puedes iniciar sesión.'
             }), 201
             
+        except HashingSaturadoError:
+            return respuesta_saturado(1, 'Servidor ocupado, intenta nuevamente')
         except Exception as e:
             print(f"Error en registro_estudiante: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
 
+    @auth_bp.route('/registro/<any(estudiante, profesor):tipo>/lote', methods=['POST'])
+    @requiere_token(tipo='profesor')
+    @controlar_admision('registro')
+    def registro_lote(tipo):
+        """Registra estudiantes o profesores desde un CSV (subido como archivo o en el cuerpo)"""
+        try:
+            # El CSV se lee como stream; werkzeug guarda en disco las subidas grandes
+            if 'archivo' in request.files:
+                binario = request.files['archivo'].stream
+            else:
+                binario = request.stream
+            
+            try:
+                reporte = importar_usuarios(db.connection, abrir_texto(binario), tipo, pool_hashing,
+                                            app.config['IMPORTACION_TAMANO_LOTE'],
+                                            app.config['IMPORTACION_MAX_ERRORES'])
+            except UnicodeDecodeError:
+                return jsonify({'exito': False, 'mensaje': 'El CSV debe estar en UTF-8'}), 400
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
+            
+            resultado = reporte.como_dict()
+            if reporte.interrumpida:
+                # Los lotes guardados se conservan: el reporte dice desde qué fila reintentar
+                return respuesta_saturado(1, reporte.interrumpida, **resultado)
+            
+            return jsonify({
+                'exito': True,
+                'mensaje': f"{reporte.insertadas} usuarios registrados, {reporte.total_errores} filas rechazadas",
+                **resultado
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en registro_lote: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
     @auth_bp.route('/login', methods=['POST'])
+    @controlar_admision('login')
     def login():
         """Inicia sesión y devuelve un token"""
         try:
             datos = request.get_json()
             
-            cur = mysql.connection.cursor()
+            cur = db.connection.cursor()
             cur.execute("""
                 SELECT id, nombres, apellidos, correo, contrasena, tipo, fecha_registro
                 FROM usuarios WHERE id = %s
             """, (datos['id'],))
             
             usuario = cur.fetchone()
-            cur.close()
             
             if not usuario:
+                cur.close()
                 return jsonify({'exito': False, 'mensaje': 'Usuario no encontrado'}), 404
             
             # Verificar contraseña
-            if not check_password_hash(usuario['contrasena'], datos['contrasena']):
+            if not pool_hashing.verificar(usuario['contrasena'], datos['contrasena']):
+                cur.close()
                 return jsonify({'exito': False, 'mensaje': 'Contraseña incorrecta'}), 401
             
             # Generar token
-            token = generar_token(usuario['id'], usuario['tipo'], app.config['SECRET_KEY'])
-            
-            # Actualizar último acceso
-            cur = mysql.connection.cursor()
-            cur.execute("UPDATE usuarios SET ultimo_acceso = NOW() WHERE id = %s", (usuario['id'],))
-            mysql.connection.commit()
+            token = generar_token(usuario['id'], usuario['tipo'], app.config['SECRET_KEY'],
+                                app.config['JWT_EXPIRATION_HOURS'])
+            
+            # Solo se escribe si el hash está desactualizado; el último acceso
+            # se guarda después, por lotes
+            if pool_hashing.necesita_rehash(usuario['contrasena']):
+                nuevo_hash = pool_hashing.generar(datos['contrasena'])
+                cur.execute("UPDATE usuarios SET contrasena = %s WHERE id = %s",
+                            (nuevo_hash, usuario['id']))
+                db.connection.commit()
             cur.close()
+            buffer_accesos.registrar(usuario['id'])
             
             return jsonify({
                 'exito': True,
@@ -166,6 +218,8 @@ def init_auth_routes(mysql, app):
                 'mensaje': f"Bienvenido, {usuario['nombres']}!"
             }), 200
             
+        except HashingSaturadoError:
+            return respuesta_saturado(1, 'Servidor ocupado, intenta nuevamente')
         except Exception as e:
             print(f"Error en login: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
@@ -0,0 +1,113 @@
+# ============================================
+# BÚSQUEDA DE TAREAS (FULLTEXT + FILTROS)
+# ============================================
+#
+# La búsqueda por texto usa el índice FULLTEXT ft_tareas_texto (titulo,
+# descripcion) en modo lenguaje natural: MySQL resuelve las coincidencias en
+# el índice invertido y las ordena por relevancia, sin recorrer la tabla como
+# haría LIKE '%texto%'. Los filtros (curso, tipo, estado, fechas) se aplican
+# sobre ese conjunto. Sin texto, el listado filtrado se pagina por
+# (fecha_entrega, id) descendente sobre idx_tareas_estado_fecha.
+#
+# Con texto se ordena por relevancia e id; la relevancia se redondea a 6
+# decimales para que el cursor la represente exactamente y la condición
+# keyset (en HAVING, sobre el alias) compare el mismo valor en cada página.
+
+from datetime import date
+from backend.paginacion import condicion_keyset
+
+TIPOS = ('tarea', 'examen', 'proyecto')
+ESTADOS = ('activa', 'cerrada', 'archivada')
+LONGITUD_MAXIMA = 200
+
+SQL_RELEVANCIA = "ROUND(MATCH(t.titulo, t.descripcion) AGAINST (%s IN NATURAL LANGUAGE MODE), 6)"
+
+def leer_fecha(args, nombre):
+    valor = args.get(nombre)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f'{nombre} debe tener el formato AAAA-MM-DD')
+
+def leer_filtros(args):
+    """Lee el texto y los filtros de la query string; lanza ValueError si son inválidos"""
+    texto = ' '.join(args.get('q', '').split())
+    if len(texto) > LONGITUD_MAXIMA:
+        raise ValueError(f'La búsqueda admite como máximo {LONGITUD_MAXIMA} caracteres')
+    
+    tipo = args.get('tipo') or None
+    if tipo is not None and tipo not in TIPOS:
+        raise ValueError(f"Tipo inválido, debe ser uno de: {', '.join(TIPOS)}")
+    
+    estado = args.get('estado') or None
+    if estado is not None and estado not in ESTADOS:
+        raise ValueError(f"Estado inválido, debe ser uno de: {', '.join(ESTADOS)}")
+    
+    desde, hasta = leer_fecha(args, 'desde'), leer_fecha(args, 'hasta')
+    if desde and hasta and desde > hasta:
+        raise ValueError('desde no puede ser posterior a hasta')
+    
+    return {
+        'texto': texto or None,
+        'curso': args.get('curso') or None,
+        'tipo': tipo,
+        'estado': estado,
+        'desde': desde,
+        'hasta': hasta
+    }
+
+def sql_busqueda(filtros, columnas, despues_de=None, profesor_id=None):
+    """Arma la consulta de búsqueda (sin LIMIT).
+    
+    `columnas` es la lista SELECT de la tarea (alias t). Devuelve
+    (sql, parametros, claves_cursor); las filas incluyen `relevancia`
+    cuando hay texto.
+    """
+    condiciones, parametros = [], []
+    if filtros['texto']:
+        condiciones.append('MATCH(t.titulo, t.descripcion) AGAINST (%s IN NATURAL LANGUAGE MODE)')
+        parametros.append(filtros['texto'])
+    if profesor_id is not None:
+        condiciones.append('t.profesor_id = %s')
+        parametros.append(profesor_id)
+    if filtros['estado']:
+        condiciones.append('t.estado = %s')
+        parametros.append(filtros['estado'])
+    else:
+        condiciones.append("t.estado <> 'eliminada'")
+    for columna, operador, clave in (('t.curso', '=', 'curso'), ('t.tipo', '=', 'tipo'),
+                                    ('t.fecha_entrega', '>=', 'desde'),
+                                    ('t.fecha_entrega', '<=', 'hasta')):
+        if filtros[clave] is not None:
+            condiciones.append(f'{columna} {operador} %s')
+            parametros.append(filtros[clave])
+    
+    if filtros['texto']:
+        orden = ['relevancia', 'id']
+        seleccion = f'{columnas}, {SQL_RELEVANCIA} AS relevancia'
+        parametros = [filtros['texto']] + parametros
+    else:
+        orden = ['t.fecha_entrega', 't.id']
+        seleccion = columnas
+    
+    # Con texto el cursor se compara contra los alias del SELECT (HAVING)
+    posterior = ''
+    if despues_de:
+        condicion, valores = condicion_keyset(orden, despues_de, descendente=True)
+        if filtros['texto']:
+            posterior = f'HAVING {condicion}'
+        else:
+            condiciones.append(condicion)
+        parametros.extend(valores)
+    
+    sql = f"""
+        SELECT {seleccion}
+        FROM tareas t
+        LEFT JOIN usuarios u ON t.profesor_id = u.id
+        WHERE {' AND '.join(condiciones)}
+        {posterior}
+        ORDER BY {', '.join(c + ' DESC' for c in orden)}
+    """
+    return sql, parametros, ('relevancia', 'id') if filtros['texto'] else ('fecha_entrega', 'id')
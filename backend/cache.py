@@ -0,0 +1,154 @@
+# ============================================
+# CACHÉ DE RESPUESTAS POR USUARIO Y ETAGS
+# ============================================
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, g, make_response, request
+from backend.config import Config
+from backend.respuestas import compresor_respuestas
+
+class CacheRespuestas:
+    """Caché LRU de respuestas JSON con contadores de versión por ámbito.
+    
+    La clave de cada respuesta incluye las versiones de los ámbitos de los
+    que depende (p. ej. ('tareas',) o ('estudiante', id)); las rutas de
+    escritura incrementan esas versiones y las entradas anteriores dejan de
+    ser alcanzables. Las entradas caducan además a los `ttl` segundos, lo que
+    acota cuánto puede ver un worker de gunicorn las escrituras de otro.
+    """
+    
+    def __init__(self, capacidad=2048, ttl=10):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._versiones = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.no_modificadas = 0
+        self.expulsiones = 0
+        self.invalidaciones = 0
+    
+    def version(self, *ambito):
+        with self._lock:
+            return self._versiones.get(ambito, 0)
+    
+    def invalidar(self, *ambito):
+        """Incrementa la versión del ámbito, invalidando las respuestas que dependen de él"""
+        with self._lock:
+            self._versiones[ambito] = self._versiones.get(ambito, 0) + 1
+            self.invalidaciones += 1
+    
+    def obtener(self, clave):
+        """Devuelve (etag, cuerpo) si hay una entrada vigente, o None"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            
+            etag, cuerpo, creada = entrada
+            if time.monotonic() - creada > self.ttl:
+                del self._entradas[clave]
+                self.expulsiones += 1
+                self.fallos += 1
+                return None
+            
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return etag, cuerpo
+    
+    def guardar(self, clave, etag, cuerpo):
+        if self.capacidad <= 0:
+            return
+        
+        with self._lock:
+            self._entradas[clave] = (etag, cuerpo, time.monotonic())
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.expulsiones += 1
+    
+    def registrar_no_modificada(self):
+        with self._lock:
+            self.no_modificadas += 1
+    
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._versiones.clear()
+    
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'capacidad': self.capacidad,
+                'ttl_segundos': self.ttl,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0,
+                'no_modificadas': self.no_modificadas,
+                'expulsiones': self.expulsiones,
+                'invalidaciones': self.invalidaciones
+            }
+
+cache_respuestas = CacheRespuestas(Config.CACHE_RESPUESTAS_CAPACIDAD,
+                                Config.CACHE_RESPUESTAS_TTL_SEGUNDOS)
+
+def _coincide_etag(etag):
+    """If-None-Match con el ETag o con el de una de sus variantes comprimidas ("<etag>-gzip")"""
+    variantes = {etag} | {f'{etag}-{c}' for c in compresor_respuestas.codificaciones}
+    return any(variante in request.if_none_match for variante in variantes)
+
+def _respuesta_condicional(etag, cuerpo):
+    """Construye la respuesta 200 (con cuerpo) o 304 según If-None-Match"""
+    if _coincide_etag(etag):
+        cache_respuestas.registrar_no_modificada()
+        respuesta = Response(status=304)
+        # Con el tamaño, el compresor sabe qué variante tiene el cliente
+        respuesta.tamano_cuerpo = len(cuerpo)
+    else:
+        respuesta = Response(cuerpo, status=200, mimetype='application/json')
+    
+    respuesta.set_etag(etag)
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    respuesta.vary.add('Authorization')
+    return respuesta
+
+def respuesta_cacheada(dependencias):
+    """Cachea la respuesta JSON del listado por usuario y endpoint.
+    
+    `dependencias(usuario)` devuelve los ámbitos cuya versión invalida la
+    respuesta. Debe aplicarse debajo de @requiere_token. Si la entrada está
+    en caché y el cliente envía el mismo ETag se responde 304 sin consultar
+    la base de datos ni serializar JSON.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            versiones = tuple(
+                (ambito, cache_respuestas.version(*ambito))
+                for ambito in dependencias(g.usuario)
+            )
+            clave = (request.endpoint, g.usuario['usuario_id'],
+                    request.query_string, tuple(kwargs.items()), versiones)
+            
+            entrada = cache_respuestas.obtener(clave)
+            if entrada is not None:
+                return _respuesta_condicional(*entrada)
+            
+            respuesta = make_response(funcion(*args, **kwargs))
+            if respuesta.status_code != 200 or respuesta.is_streamed or not respuesta.is_json:
+                return respuesta
+            
+            cuerpo = respuesta.get_data()
+            etag = hashlib.sha256(cuerpo).hexdigest()[:32]
+            cache_respuestas.guardar(clave, etag, cuerpo)
+            return _respuesta_condicional(etag, cuerpo)
+        return envoltura
+    return decorador
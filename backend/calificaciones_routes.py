@@ -2,61 +2,150 @@
 # RUTAS DE CALIFICACIONES (PROFESORES)
 # ============================================
 
-from flask import Blueprint, request, jsonify
-from backend.utils import verificar_token
+from flask import Blueprint, request, jsonify, g
+from MySQLdb import IntegrityError
+from backend.seguridad import requiere_token
+from backend.cache import cache_respuestas
+from backend.eventos import canal_eventos
+from backend.ranking import indice_ranking
+from backend.estadisticas import leer_estadisticas_estudiante
+from backend.exportacion import FORMATOS, respuesta_libreta, xlsxwriter
+from backend.paginacion import (
+    leer_paginacion, condicion_keyset, separar_pagina, respuesta_ndjson
+)
 
-calificaciones_bp = Blueprint('calificaciones', __name__)
+# Upsert sobre unique_entrega (tarea_id, estudiante_id): una sola sentencia
+# multi-fila inserta las entregas nuevas y actualiza las existentes, sin SELECT previo.
+# El JOIN con tareas descarta en la misma escritura las filas de tareas inexistentes,
+# eliminadas o de otro profesor, y deja esas filas de tareas bloqueadas hasta el commit,
+# así que una eliminación concurrente espera en lugar de colarse entre la comprobación
+# y el upsert.
+# Las filas llegan como tabla derivada de SELECT ... UNION ALL y el UPDATE lee sus
+# columnas: funciona en MySQL 8.0 y MariaDB, a diferencia de VALUES ROW() con alias
+# de fila (solo MySQL 8.0.19+) o de VALUES(col) (obsoleto desde MySQL 8.0.20)
+SQL_UPSERT_CALIFICACIONES = """
+    INSERT INTO entregas (tarea_id, estudiante_id, nota, comentario,
+                        estado, fecha_calificacion)
+    SELECT t.id, nueva.estudiante_id, nueva.nota, nueva.comentario, 'calificada', NOW()
+    FROM ({filas}) AS nueva
+    JOIN tareas t ON t.id = nueva.tarea_id AND t.profesor_id = %s
+    WHERE t.estado <> 'eliminada'
+    ON DUPLICATE KEY UPDATE
+        nota = nueva.nota,
+        comentario = nueva.comentario,
+        estado = 'calificada',
+        fecha_calificacion = NOW()
+"""
+PRIMERA_FILA_UPSERT_CALIFICACION = "SELECT %s AS tarea_id, %s AS estudiante_id, %s AS nota, %s AS comentario"
+FILA_UPSERT_CALIFICACION = "SELECT %s, %s, %s, %s"
 
-def init_calificaciones_routes(mysql, app):
+def validar_calificacion(datos):
+    """Valida una calificación; devuelve el mensaje de error o None si es válida"""
+    if not isinstance(datos, dict):
+        return 'Formato de calificación inválido'
+    
+    for campo in ('tarea_id', 'estudiante_id', 'nota'):
+        if datos.get(campo) in (None, ''):
+            return f'Campo requerido: {campo}'
+    
+    try:
+        nota = float(datos['nota'])
+    except (TypeError, ValueError):
+        return 'Nota debe ser un número'
+    
+    if nota < 0 or nota > 20:
+        return 'Nota debe estar entre 0 y 20'
+    
+    return None
+
+def tareas_omitidas(cur, profesor_id, calificaciones):
+    """Tareas que el upsert omitió por no existir, estar eliminadas o ser de otro
+    profesor (como texto).
+    
+    Se consulta después de guardar_calificaciones, en la misma transacción:
+    las filas de tareas que leyó el upsert siguen bloqueadas, así que el
+    resultado coincide con lo que se escribió.
+    """
+    tareas = sorted({str(c['tarea_id']) for c in calificaciones})
+    marcadores = ', '.join(['%s'] * len(tareas))
+    cur.execute(f"""
+        SELECT id FROM tareas
+        WHERE id IN ({marcadores}) AND profesor_id = %s AND estado <> 'eliminada'
+    """, tareas + [profesor_id])
+    return set(tareas) - {str(fila['id']) for fila in cur.fetchall()}
+
+def guardar_calificaciones(cur, profesor_id, calificaciones):
+    """Guarda las calificaciones con un único upsert multi-fila (sin commit).
+    
+    Solo se califican tareas de `profesor_id`. Devuelve las filas afectadas:
+    1 por entrega nueva, 2 por entrega actualizada y 0 por fila omitida o sin cambios.
+    """
+    parametros = []
+    for c in calificaciones:
+        parametros.extend((c['tarea_id'], c['estudiante_id'],
+                        float(c['nota']), c.get('comentario', '')))
+    
+    filas = ' UNION ALL '.join([PRIMERA_FILA_UPSERT_CALIFICACION]
+                            + [FILA_UPSERT_CALIFICACION] * (len(calificaciones) - 1))
+    cur.execute(SQL_UPSERT_CALIFICACIONES.format(filas=filas), parametros + [profesor_id])
+    return cur.rowcount
+
+def invalidar_cache_calificaciones(profesor_id, calificaciones):
+    """Invalida los listados cacheados afectados por las notas guardadas"""
+    # Los listados del profesor cuentan las entregas calificadas de sus tareas;
+    # el upsert solo escribe en tareas de quien califica, así que no hace falta consultarlo
+    cache_respuestas.invalidar('profesor', profesor_id)
+    for estudiante_id in {c['estudiante_id'] for c in calificaciones}:
+        cache_respuestas.invalidar('estudiante', estudiante_id)
+
+def avisar_calificaciones(calificaciones):
+    """Despierta los streams de notificaciones de los estudiantes calificados"""
+    for estudiante_id in {str(c['estudiante_id']) for c in calificaciones}:
+        canal_eventos.publicar(estudiante_id, {'tipo': 'notificacion'})
+
+def despues_de_calificar(cur, profesor_id, calificaciones):
+    """Caché, avisos y ranking tras el commit: si fallan, las notas ya están guardadas.
+    
+    La caché caduca a los CACHE_RESPUESTAS_TTL_SEGUNDOS y el ranking se
+    reconstruye al vencer RANKING_TTL_SEGUNDOS, así que un fallo aquí solo
+    retrasa que se vean los cambios.
+    """
+    try:
+        invalidar_cache_calificaciones(profesor_id, calificaciones)
+        avisar_calificaciones(calificaciones)
+        # Los triggers ya recalcularon promedio_general: llevarlo al ranking
+        indice_ranking.refrescar_estudiantes(cur, {c['estudiante_id'] for c in calificaciones})
+    except Exception as e:
+        print(f"Aviso: calificaciones guardadas sin actualizar caché o ranking: {e}")
+
+def init_calificaciones_routes(db, app):
     """Inicializa las rutas de calificaciones con las dependencias necesarias"""
+    calificaciones_bp = Blueprint('calificaciones', __name__)
     
     @calificaciones_bp.route('', methods=['POST'])
+    @requiere_token(tipo='profesor')
     def asignar_calificacion():
         """Asigna o actualiza una calificación"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
-            
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload or payload['tipo'] != 'profesor':
-                return jsonify({'exito': False, 'mensaje': 'No autorizado'}), 403
-            
             datos = request.get_json()
             
             # Validar nota
-            nota = float(datos['nota'])
-            if nota < 0 or nota > 20:
-                return jsonify({'exito': False, 'mensaje': 'Nota debe estar entre 0 y 20'}), 400
-            
-            cur = mysql.connection.cursor()
-            
-            # Verificar si ya existe una entrega
-            cur.execute("""
-                SELECT id FROM entregas 
-                WHERE tarea_id = %s AND estudiante_id = %s
-            """, (datos['tarea_id'], datos['estudiante_id']))
-            
-            entrega = cur.fetchone()
-            
-            if entrega:
-                # Actualizar entrega existente
-                cur.execute("""
-                    UPDATE entregas 
-                    SET nota = %s, comentario = %s, estado = 'calificada',
-                        fecha_calificacion = NOW()
-                    WHERE id = %s
-                """, (nota, datos.get('comentario', ''), entrega['id']))
-            else:
-                # Crear nueva entrega
-                cur.execute("""
-                    INSERT INTO entregas (tarea_id, estudiante_id, nota, comentario, 
-                                        estado, fecha_calificacion)
-                    VALUES (%s, %s, %s, %s, 'calificada', NOW())
-                """, (datos['tarea_id'], datos['estudiante_id'], 
-                    nota, datos.get('comentario', '')))
-            
-            mysql.connection.commit()
+            error = validar_calificacion(datos)
+            if error:
+                return jsonify({'exito': False, 'mensaje': error}), 400
+            
+            profesor_id = g.usuario['usuario_id']
+            cur = db.connection.cursor()
+            # Sin filas afectadas la tarea no existe, está eliminada o es de otro profesor,
+            # salvo que se repita la misma nota en el mismo segundo: solo entonces se comprueba
+            if (guardar_calificaciones(cur, profesor_id, [datos]) == 0
+                    and tareas_omitidas(cur, profesor_id, [datos])):
+                db.connection.rollback()
+                cur.close()
+                return jsonify({'exito': False, 'mensaje': 'Tarea no encontrada'}), 404
+            
+            db.connection.commit()
+            despues_de_calificar(cur, profesor_id, [datos])
             cur.close()
             
             return jsonify({
@@ -68,78 +157,174 @@ def init_calificaciones_routes(mysql, app):
             print(f"Error en asignar_calificacion: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
 
+    @calificaciones_bp.route('/lote', methods=['POST'])
+    @requiere_token(tipo='profesor')
+    def asignar_calificaciones_lote():
+        """Asigna o actualiza varias calificaciones en una sola transacción"""
+        try:
+            datos = request.get_json()
+            calificaciones = datos.get('calificaciones') if isinstance(datos, dict) else datos
+            
+            if not isinstance(calificaciones, list) or not calificaciones:
+                return jsonify({'exito': False, 'mensaje': 'Se requiere una lista de calificaciones'}), 400
+            
+            if len(calificaciones) > app.config['LOTE_MAXIMO_CALIFICACIONES']:
+                return jsonify({
+                    'exito': False,
+                    'mensaje': f"Máximo {app.config['LOTE_MAXIMO_CALIFICACIONES']} calificaciones por lote"
+                }), 400
+            
+            # Validar todas las filas antes de escribir
+            resultados = []
+            for indice, calificacion in enumerate(calificaciones):
+                error = validar_calificacion(calificacion)
+                resultado = {'indice': indice, 'exito': error is None}
+                if isinstance(calificacion, dict):
+                    resultado['tarea_id'] = calificacion.get('tarea_id')
+                    resultado['estudiante_id'] = calificacion.get('estudiante_id')
+                if error:
+                    resultado['mensaje'] = error
+                resultados.append(resultado)
+            
+            if not all(r['exito'] for r in resultados):
+                return jsonify({
+                    'exito': False,
+                    'mensaje': 'Lote rechazado: hay calificaciones inválidas',
+                    'resultados': resultados
+                }), 400
+            
+            # Escribir todo el lote en una sola transacción; las filas de tareas
+            # inexistentes, eliminadas o de otro profesor se omiten y el lote entero se descarta
+            profesor_id = g.usuario['usuario_id']
+            cur = db.connection.cursor()
+            try:
+                guardar_calificaciones(cur, profesor_id, calificaciones)
+                omitidas = tareas_omitidas(cur, profesor_id, calificaciones)
+                if omitidas:
+                    db.connection.rollback()
+                else:
+                    db.connection.commit()
+            except IntegrityError:
+                db.connection.rollback()
+                cur.close()
+                return jsonify({
+                    'exito': False,
+                    'mensaje': 'Lote rechazado: tarea o estudiante inexistente'
+                }), 400
+            
+            if omitidas:
+                cur.close()
+                for resultado in resultados:
+                    if str(resultado['tarea_id']) in omitidas:
+                        resultado.update(exito=False, mensaje='Tarea no encontrada')
+                return jsonify({
+                    'exito': False,
+                    'mensaje': 'Lote rechazado: hay tareas inexistentes o eliminadas',
+                    'resultados': resultados
+                }), 400
+            
+            despues_de_calificar(cur, profesor_id, calificaciones)
+            cur.close()
+            
+            for resultado in resultados:
+                resultado['mensaje'] = 'Calificación asignada'
+            
+            return jsonify({
+                'exito': True,
+                'mensaje': f'{len(resultados)} calificaciones asignadas exitosamente',
+                'resultados': resultados
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en asignar_calificaciones_lote: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
     @calificaciones_bp.route('/tarea/<int:tarea_id>/entregas', methods=['GET'])
+    @requiere_token()
     def obtener_entregas(tarea_id):
-        """Obtiene todas las entregas de una tarea"""
+        """Obtiene las entregas de una tarea, paginadas por cursor o en NDJSON"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
-            
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload:
-                return jsonify({'exito': False, 'mensaje': 'Token inválido'}), 401
+            try:
+                limite, despues_de = leer_paginacion(request.args, 3)
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
             
-            cur = mysql.connection.cursor()
+            ndjson = request.args.get('formato') == 'ndjson'
+            condicion, parametros = '', [tarea_id]
+            if despues_de:
+                condicion, valores = condicion_keyset(
+                    ['u.apellidos', 'u.nombres', 'u.id'], despues_de)
+                condicion = 'AND ' + condicion
+                parametros += valores
             
-            # Obtener todos los estudiantes y sus entregas
-            cur.execute("""
+            # Estudiantes y sus entregas, en el orden de idx_usuarios_tipo_nombre
+            sql = f"""
                 SELECT u.id, u.nombres, u.apellidos,
                     e.nota, e.comentario, e.fecha_calificacion, e.estado
                 FROM usuarios u
                 LEFT JOIN entregas e ON u.id = e.estudiante_id AND e.tarea_id = %s
-                WHERE u.tipo = 'estudiante'
-                ORDER BY u.apellidos, u.nombres
-            """, (tarea_id,))
+                WHERE u.tipo = 'estudiante' {condicion}
+                ORDER BY u.apellidos, u.nombres, u.id
+            """
+            
+            if ndjson:
+                if 'limite' in request.args:
+                    sql += ' LIMIT %s'
+                    parametros.append(limite)
+                return respuesta_ndjson(db.connection, sql, parametros)
             
-            entregas = cur.fetchall()
+            cur = db.connection.cursor()
+            cur.execute(sql + ' LIMIT %s', parametros + [limite + 1])
+            entregas, siguiente = separar_pagina(
+                cur.fetchall(), limite, ('apellidos', 'nombres', 'id'))
             cur.close()
             
-            return jsonify({'exito': True, 'entregas': entregas}), 200
+            return jsonify({
+                'exito': True,
+                'entregas': entregas,
+                'siguiente_cursor': siguiente
+            }), 200
             
         except Exception as e:
             print(f"Error en obtener_entregas: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
 
-    @calificaciones_bp.route('/estudiante/estadisticas', methods=['GET'])
-    def obtener_estadisticas_estudiante():
-        """Obtiene estadísticas del estudiante"""
+    @calificaciones_bp.route('/exportar', methods=['GET'])
+    @requiere_token(tipo='profesor')
+    def exportar_libreta():
+        """Exporta la libreta (estudiantes × tareas) de un curso, por grado y sección"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
-            
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload:
-                return jsonify({'exito': False, 'mensaje': 'Token inválido'}), 401
+            curso = request.args.get('curso')
+            formato = request.args.get('formato', 'csv')
             
-            cur = mysql.connection.cursor()
+            if not curso:
+                return jsonify({'exito': False, 'mensaje': 'Se requiere el curso'}), 400
             
-            # Total de tareas
-            cur.execute("SELECT COUNT(*) as total FROM tareas")
-            total_tareas = cur.fetchone()['total']
+            if formato not in FORMATOS:
+                return jsonify({'exito': False, 'mensaje': 'Formato debe ser csv o xlsx'}), 400
             
-            # Tareas calificadas
-            cur.execute("""
-                SELECT COUNT(*) as calificadas, AVG(nota) as promedio
-                FROM entregas 
-                WHERE estudiante_id = %s AND nota IS NOT NULL
-            """, (payload['usuario_id'],))
-            stats = cur.fetchone()
+            if formato == 'xlsx' and xlsxwriter is None:
+                return jsonify({'exito': False, 'mensaje': 'Formato xlsx no disponible en el servidor'}), 400
             
-            # Tareas pendientes
-            pendientes = total_tareas - stats['calificadas']
+            return respuesta_libreta(db.connection, curso, request.args.get('grado'),
+                                    request.args.get('seccion'), formato)
             
+        except Exception as e:
+            print(f"Error en exportar_libreta: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
+    @calificaciones_bp.route('/estudiante/estadisticas', methods=['GET'])
+    @requiere_token()
+    def obtener_estadisticas_estudiante():
+        """Obtiene estadísticas del estudiante a partir de los agregados incrementales"""
+        try:
+            cur = db.connection.cursor()
+            estadisticas = leer_estadisticas_estudiante(cur, g.usuario['usuario_id'])
             cur.close()
             
             return jsonify({
                 'exito': True,
-                'estadisticas': {
-                    'total_tareas': total_tareas,
-                    'calificadas': stats['calificadas'],
-                    'pendientes': pendientes,
-                    'promedio': round(stats['promedio'], 2) if stats['promedio'] else 0
-                }
+                'estadisticas': estadisticas
             }), 200
             
         except Exception as e:
@@ -1,19 +1,143 @@
 # ============================================
 # CONFIGURACIÓN DE LA APLICACIÓN
 # ============================================
+#
+# Los valores se leen de las variables de entorno; si no están definidas se
+# cargan de `.env` y de `configuracion.env` en la raíz del proyecto (las
+# variables de entorno reales tienen prioridad) y, por último, se usan los
+# valores por defecto de abajo.
+
+import os
+from dotenv import load_dotenv
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+load_dotenv(os.path.join(RAIZ_PROYECTO, '.env'))
+load_dotenv(os.path.join(RAIZ_PROYECTO, 'configuracion.env'))
+
+def _texto(nombre, defecto):
+    return os.environ.get(nombre, defecto)
+
+def _entero(nombre, defecto):
+    valor = os.environ.get(nombre)
+    return int(valor) if valor not in (None, '') else defecto
+
+def _decimal(nombre, defecto):
+    valor = os.environ.get(nombre)
+    if valor is None:
+        return defecto
+    return float(valor) if valor.strip().lower() not in ('', 'none', 'no') else None
+
+def _booleano(nombre, defecto):
+    valor = os.environ.get(nombre)
+    if valor is None:
+        return defecto
+    return valor.strip().lower() in ('1', 'true', 'si', 'sí', 'yes', 'on')
 
 class Config:
     """Configuración base de la aplicación"""
-    SECRET_KEY = 'tu_clave_secreta_super_segura_123'
-    MYSQL_HOST = 'localhost'
-    MYSQL_USER = 'root'
-    MYSQL_PASSWORD = ''  # Cambiar por tu contraseña de MySQL
-    MYSQL_DB = 'colegio_miguel_grau'
+    SECRET_KEY = _texto('SECRET_KEY', 'tu_clave_secreta_super_segura_123')
+    MYSQL_HOST = _texto('MYSQL_HOST', 'localhost')
+    MYSQL_PORT = _entero('MYSQL_PORT', 3306)
+    MYSQL_USER = _texto('MYSQL_USER', 'root')
+    MYSQL_PASSWORD = _texto('MYSQL_PASSWORD', '')  # Definir en configuracion.env
+    MYSQL_DB = _texto('MYSQL_DB', 'colegio_miguel_grau')
     MYSQL_CURSORCLASS = 'DictCursor'
     
+    # Réplicas de lectura para las peticiones GET ("host[:puerto],host[:puerto]"; vacío = solo primaria)
+    MYSQL_REPLICAS = _texto('MYSQL_REPLICAS', '')
+    REPLICA_PRIMARIA_SEGUNDOS = _decimal('REPLICA_PRIMARIA_SEGUNDOS', 5)     # Lecturas en la primaria tras escribir
+    REPLICA_EXPULSION_SEGUNDOS = _decimal('REPLICA_EXPULSION_SEGUNDOS', 30)  # Réplica apartada tras un fallo
+    
+    # Pool de conexiones (por proceso: debe cubrir los hilos de cada worker)
+    POOL_MIN = _entero('POOL_MIN', 2)                               # Conexiones abiertas al iniciar
+    POOL_MAX = _entero('POOL_MAX', 10)                              # Máximo de conexiones por proceso
+    POOL_RECICLAR_SEGUNDOS = _entero('POOL_RECICLAR_SEGUNDOS', 1800) # Antigüedad máxima de una conexión
+    POOL_TIMEOUT_SEGUNDOS = _decimal('POOL_TIMEOUT_SEGUNDOS', 5)    # Espera máxima por una conexión libre
+    POOL_PRE_PING = _booleano('POOL_PRE_PING', True)                # Verificar la conexión antes de prestarla
+    
     # Configuración de tokens JWT
-    JWT_EXPIRATION_HOURS = 24
+    JWT_EXPIRATION_HOURS = _entero('JWT_EXPIRATION_HOURS', 24)
+    
+    # Hash de contraseñas (formato de werkzeug: 'scrypt:N:r:p' o 'pbkdf2:sha256:iteraciones').
+    # Los hashes con otro método o parámetros se actualizan en el siguiente login.
+    HASH_METODO = _texto('HASH_METODO', 'scrypt:32768:8:1')
+    HASH_PROCESOS = _entero('HASH_PROCESOS', 2)                     # Procesos dedicados al hash por worker
+    HASH_MAX_PENDIENTES = _entero('HASH_MAX_PENDIENTES', 32)        # Operaciones de hash en cola como máximo
+    HASH_TIMEOUT_SEGUNDOS = _decimal('HASH_TIMEOUT_SEGUNDOS', 10)   # Espera máxima por un lugar en la cola
+    
+    # Máximo de tokens verificados que se mantienen en caché (0 = desactivada)
+    TOKEN_CACHE_CAPACIDAD = _entero('TOKEN_CACHE_CAPACIDAD', 4096)
+    
+    # Máximo de calificaciones por petición en /api/calificaciones/lote
+    LOTE_MAXIMO_CALIFICACIONES = _entero('LOTE_MAXIMO_CALIFICACIONES', 1000)
+    
+    # Control de admisión de login y registro (por worker; "capacidad/segundos", none desactiva)
+    ADMISION_LOGIN_IP = _texto('ADMISION_LOGIN_IP', '30/60')
+    ADMISION_LOGIN_USUARIO = _texto('ADMISION_LOGIN_USUARIO', '10/60')
+    ADMISION_REGISTRO_IP = _texto('ADMISION_REGISTRO_IP', '10/60')
+    ADMISION_REGISTRO_USUARIO = _texto('ADMISION_REGISTRO_USUARIO', '3/60')
+    ADMISION_HASH_CONCURRENCIA = _entero('ADMISION_HASH_CONCURRENCIA', 4)          # Peticiones con hash a la vez
+    ADMISION_HASH_ESPERA_SEGUNDOS = _decimal('ADMISION_HASH_ESPERA_SEGUNDOS', 0.5)  # Espera por un turno antes del 429
+    ADMISION_MAX_CLAVES = _entero('ADMISION_MAX_CLAVES', 100000)                    # IPs/usuarios recordados por límite
+    PROXIES_CONFIABLES = _entero('PROXIES_CONFIABLES', 0)   # Proxies delante de la app (IP real en X-Forwarded-For)
+    
+    # Último acceso de los usuarios: se guarda por lotes, no en cada login
+    ACCESOS_INTERVALO_SEGUNDOS = _decimal('ACCESOS_INTERVALO_SEGUNDOS', 5)   # Cada cuánto se vacía el buffer
+    ACCESOS_MAXIMO_PENDIENTES = _entero('ACCESOS_MAXIMO_PENDIENTES', 500)   # Usuarios que adelantan el vaciado
+    
+    # Importación masiva de usuarios desde CSV
+    IMPORTACION_TAMANO_LOTE = _entero('IMPORTACION_TAMANO_LOTE', 500)   # Filas por transacción
+    IMPORTACION_MAX_ERRORES = _entero('IMPORTACION_MAX_ERRORES', 1000)  # Errores detallados en el reporte
+    
+    # Caché de respuestas de los listados (por usuario y endpoint)
+    CACHE_RESPUESTAS_CAPACIDAD = _entero('CACHE_RESPUESTAS_CAPACIDAD', 2048)
+    CACHE_RESPUESTAS_TTL_SEGUNDOS = _decimal('CACHE_RESPUESTAS_TTL_SEGUNDOS', 10)
+    
+    # Ranking de estudiantes en memoria (se reconstruye desde la BD tras este tiempo)
+    RANKING_TTL_SEGUNDOS = _decimal('RANKING_TTL_SEGUNDOS', 300)
+    RANKING_MAXIMO = _entero('RANKING_MAXIMO', 100)   # Máximo de estudiantes por consulta de top K
+    
+    # Planificador de trabajos en segundo plano (un solo worker a la vez)
+    PLANIFICADOR_INTERVALO_SEGUNDOS = _decimal('PLANIFICADOR_INTERVALO_SEGUNDOS', 30)  # None desactiva el hilo
+    CIERRE_LOTE = _entero('CIERRE_LOTE', 500)                       # Tareas vencidas cerradas por transacción
+    PURGA_LOTE = _entero('PURGA_LOTE', 200)                         # Entregas de tareas eliminadas por transacción
+    PURGA_PAUSA_SEGUNDOS = _decimal('PURGA_PAUSA_SEGUNDOS', 0.05)   # Pausa entre lotes de la purga
+    
+    # Paginación por cursor de los listados
+    PAGINA_TAMANO = _entero('PAGINA_TAMANO', 50)
+    PAGINA_MAXIMA = _entero('PAGINA_MAXIMA', 500)
+    
+    # Stream de notificaciones (Server-Sent Events)
+    SSE_LATIDO_SEGUNDOS = _decimal('SSE_LATIDO_SEGUNDOS', 15)                   # Comentario de latido y relectura
+    SSE_DURACION_MAXIMA_SEGUNDOS = _decimal('SSE_DURACION_MAXIMA_SEGUNDOS', 300)  # El cliente se reconecta al cerrarse
+    SSE_MAX_CONEXIONES = _entero('SSE_MAX_CONEXIONES', 4)                       # Streams por proceso (< hilos de gunicorn)
+    SSE_SONDEO_SEGUNDOS = _entero('SSE_SONDEO_SEGUNDOS', 60)     # Sin stream libre (429): el cliente consulta cada N s
+    SSE_TOKEN_SEGUNDOS = _entero('SSE_TOKEN_SEGUNDOS', 60)       # Vigencia del token de stream (va en la URL)
+    
+    # Recursos estáticos construidos con `python -m backend.recursos` (huella + gzip/brotli)
+    RECURSOS_DIRECTORIO = _texto('RECURSOS_DIRECTORIO', os.path.join(RAIZ_PROYECTO, 'publico'))
+    
+    # Derivados responsivos de las imágenes (backend/imagenes.py, requiere Pillow)
+    IMAGENES_DIRECTORIO = _texto('IMAGENES_DIRECTORIO', os.path.join(RAIZ_PROYECTO, 'images'))
+    IMAGENES_ANCHOS = _texto('IMAGENES_ANCHOS', '160,320,640,1024,1600')  # Anchos de srcset, en píxeles
+    IMAGENES_CACHE_DIRECTORIO = _texto('IMAGENES_CACHE_DIRECTORIO', os.path.join(RAIZ_PROYECTO, 'cache_imagenes'))
+    IMAGENES_CACHE_MAX_BYTES = _entero('IMAGENES_CACHE_MAX_BYTES', 200 * 1024 * 1024)  # Se expulsan los menos usados
+    
+    # Codificación de las respuestas de la API (backend/respuestas.py)
+    JSON_CODIFICADOR = _texto('JSON_CODIFICADOR', 'orjson')         # orjson (si está instalado) o json
+    COMPRESION_MINIMO_BYTES = _entero('COMPRESION_MINIMO_BYTES', 1024)  # Cuerpos menores van sin comprimir
+    COMPRESION_NIVEL_GZIP = _entero('COMPRESION_NIVEL_GZIP', 6)
+    COMPRESION_CALIDAD_BROTLI = _entero('COMPRESION_CALIDAD_BROTLI', 4)  # 11 es demasiado lento por petición
+    COMPRESION_VARIANTES = _entero('COMPRESION_VARIANTES', 256)      # Respuestas cacheadas ya comprimidas
+    
+    # Acceso a /api/metrics: IPs permitidas (separadas por comas) o Authorization: Bearer <token>
+    METRICAS_IPS = _texto('METRICAS_IPS', '127.0.0.1,::1')
+    METRICAS_TOKEN = _texto('METRICAS_TOKEN', '')   # Vacío = solo por IP
+    
+    # Registro de consultas lentas (segundos; None desactiva el registro)
+    CONSULTA_LENTA_SEGUNDOS = _decimal('CONSULTA_LENTA_SEGUNDOS', 0.5)
     
     # Configuración de la aplicación
-    DEBUG = True
-    PORT = 5000
+    DEBUG = _booleano('DEBUG', False)
+    PORT = _entero('PORT', 5000)
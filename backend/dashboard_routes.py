@@ -0,0 +1,95 @@
+# ============================================
+# RUTAS DEL DASHBOARD DEL ESTUDIANTE
+# ============================================
+#
+# La vista del estudiante se arma con una sola petición y una sola
+# consulta: las tareas activas con la entrega del estudiante, unidas al
+# contador de tareas y a sus agregados de notas (una fila constante cada
+# uno). Totales, pendientes, promedio y próximas entregas se calculan en
+# una pasada sobre ese resultado.
+
+from flask import Blueprint, jsonify, g
+from backend.seguridad import requiere_token
+from backend.cache import respuesta_cacheada
+
+PROXIMAS_ENTREGAS = 5
+
+# contadores y agregados_estudiante son filas constantes: con LEFT JOIN la
+# fila sale aunque no haya tareas activas (t.id NULL), y tareas se recorre
+# en el orden de idx_tareas_estado_fecha
+SQL_DASHBOARD_ESTUDIANTE = """
+    SELECT c.valor AS total_tareas,
+        IFNULL(a.calificadas, 0) AS calificadas,
+        IFNULL(a.suma_notas, 0) AS suma_notas,
+        t.id, t.titulo, t.descripcion, t.curso, t.tipo, t.fecha_entrega,
+        t.puntos, t.estado, t.profesor_id,
+        u.nombres AS profesor_nombres,
+        u.apellidos AS profesor_apellidos,
+        e.nota, e.comentario, e.estado AS estado_entrega,
+        DATEDIFF(t.fecha_entrega, CURDATE()) AS dias_restantes
+    FROM contadores c
+    LEFT JOIN agregados_estudiante a ON a.estudiante_id = %s
+    LEFT JOIN tareas t ON t.estado = 'activa'
+    LEFT JOIN usuarios u ON t.profesor_id = u.id
+    LEFT JOIN entregas e ON t.id = e.tarea_id AND e.estudiante_id = %s
+    WHERE c.nombre = 'total_tareas'
+    ORDER BY t.fecha_entrega, t.id
+"""
+
+COLUMNAS_RESUMEN = ('total_tareas', 'calificadas', 'suma_notas')
+
+def resumir_dashboard(filas):
+    """Tareas activas, estadísticas y próximas entregas en una sola pasada"""
+    total_tareas = calificadas = suma_notas = 0
+    tareas, proximas, pendientes = [], [], 0
+    for fila in filas:
+        total_tareas = int(fila['total_tareas'])
+        calificadas = int(fila['calificadas'])
+        suma_notas = float(fila['suma_notas'])
+        if fila['id'] is None:
+            continue
+        
+        tarea = {clave: valor for clave, valor in fila.items() if clave not in COLUMNAS_RESUMEN}
+        tareas.append(tarea)
+        if tarea['nota'] is None:
+            pendientes += 1
+            # Filas en orden de fecha: las primeras sin vencer son las próximas
+            if tarea['dias_restantes'] >= 0 and len(proximas) < PROXIMAS_ENTREGAS:
+                proximas.append({clave: tarea[clave] for clave in
+                                ('id', 'titulo', 'curso', 'tipo', 'fecha_entrega', 'dias_restantes')})
+    
+    return {
+        'tareas': tareas,
+        'estadisticas': {
+            'total_tareas': total_tareas,
+            'activas': len(tareas),
+            'pendientes': pendientes,
+            'calificadas': calificadas,
+            'promedio': round(suma_notas / calificadas, 2) if calificadas else 0
+        },
+        'proximas_entregas': proximas
+    }
+
+def init_dashboard_routes(db, app):
+    """Inicializa las rutas del dashboard con las dependencias necesarias"""
+    dashboard_bp = Blueprint('dashboard', __name__)
+    
+    @dashboard_bp.route('/estudiante', methods=['GET'])
+    @requiere_token(tipo='estudiante')
+    @respuesta_cacheada(lambda usuario: [('tareas',), ('estudiante', usuario['usuario_id'])])
+    def obtener_dashboard_estudiante():
+        """Tareas activas, estadísticas y próximas entregas del estudiante (una consulta)"""
+        try:
+            estudiante_id = g.usuario['usuario_id']
+            cur = db.connection.cursor()
+            cur.execute(SQL_DASHBOARD_ESTUDIANTE, (estudiante_id, estudiante_id))
+            dashboard = resumir_dashboard(cur.fetchall())
+            cur.close()
+            
+            return jsonify({'exito': True, **dashboard}), 200
+            
+        except Exception as e:
+            print(f"Error en obtener_dashboard_estudiante: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+    
+    return dashboard_bp
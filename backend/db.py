@@ -0,0 +1,483 @@
+# ============================================
+# POOL DE CONEXIONES MYSQL
+# ============================================
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+import MySQLdb
+import MySQLdb.cursors
+from flask import g, request
+from backend.metricas import DictCursorInstrumentado, SSDictCursorInstrumentado
+
+# Clases de cursor instrumentadas (métricas por sentencia) según MYSQL_CURSORCLASS
+CURSORES = {
+    'DictCursor': DictCursorInstrumentado,
+    'SSDictCursor': SSDictCursorInstrumentado
+}
+
+# Métodos HTTP que se pueden atender desde una réplica
+METODOS_LECTURA = ('GET', 'HEAD')
+
+# Cabecera con la que el cliente pide leer de la primaria tras escribir (ms epoch)
+CABECERA_PRIMARIA = 'X-Leer-Primaria-Hasta'
+
+# OperationalError que indican que se perdió el servidor y no un problema de la
+# consulta (bloqueos, timeouts de espera): errores del cliente (CR_*, 2000-2999),
+# demasiadas conexiones, servidor apagándose y desconexión por inactividad
+ERRORES_SERVIDOR = (1040, 1053, 4031)
+
+def es_fallo_de_servidor(error):
+    """Indica si un OperationalError deja inservible la conexión"""
+    if not isinstance(error, MySQLdb.OperationalError):
+        return False
+    codigo = error.args[0] if error.args and isinstance(error.args[0], int) else None
+    return codigo is None or 2000 <= codigo < 3000 or codigo in ERRORES_SERVIDOR
+
+class PoolAgotadoError(Exception):
+    """No se liberó ninguna conexión dentro del tiempo de espera"""
+
+class PoolConexiones:
+    """Pool de conexiones MySQLdb reutilizables entre peticiones.
+    
+    Mantiene entre `minimo` y `maximo` conexiones abiertas, recicla las que
+    superan `reciclar_segundos`, hace un ping al prestarlas y espera como
+    máximo `timeout` segundos cuando todas están en uso.
+    """
+    
+    def __init__(self, parametros, minimo=2, maximo=10, reciclar_segundos=1800,
+                timeout=5, pre_ping=True):
+        self.parametros = parametros
+        self.minimo = minimo
+        self.maximo = maximo
+        self.reciclar_segundos = reciclar_segundos
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        
+        self._cond = threading.Condition()
+        self._reiniciar_estado()
+    
+    def _reiniciar_estado(self):
+        self._pid = os.getpid()
+        self._inactivas = []
+        self._total = 0
+        self.esperas = 0
+        self.tiempo_espera = 0.0
+        self.timeouts = 0
+        self.creadas = 0
+        self.recicladas = 0
+        self.fallos_ping = 0
+        self.fallos_conexion = 0
+        self._fallos_consecutivos = 0
+    
+    def _verificar_proceso(self):
+        # Tras un fork (workers de gunicorn) las conexiones del proceso padre
+        # no se pueden compartir: se olvidan sin cerrarlas y se abren nuevas
+        if self._pid != os.getpid():
+            self._reiniciar_estado()
+    
+    def _crear(self):
+        try:
+            conn = MySQLdb.connect(**self.parametros)
+        except Exception:
+            with self._cond:
+                self.fallos_conexion += 1
+                self._fallos_consecutivos += 1
+            raise
+        with self._cond:
+            self.creadas += 1
+            self._fallos_consecutivos = 0
+        conn.creada_en = time.monotonic()
+        conn.fallo_operacional = None
+        return conn
+    
+    @staticmethod
+    def _cerrar(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _es_utilizable(self, conn):
+        if time.monotonic() - conn.creada_en > self.reciclar_segundos:
+            with self._cond:
+                self.recicladas += 1
+            return False
+        
+        if self.pre_ping:
+            try:
+                conn.ping()
+            except Exception:
+                with self._cond:
+                    self.fallos_ping += 1
+                return False
+        
+        return True
+    
+    def calentar(self):
+        """Abre conexiones hasta alcanzar el mínimo configurado"""
+        with self._cond:
+            self._verificar_proceso()
+            faltantes = max(0, self.minimo - self._total)
+            self._total += faltantes
+        
+        nuevas = []
+        try:
+            for _ in range(faltantes):
+                nuevas.append(self._crear())
+        finally:
+            with self._cond:
+                self._total -= faltantes - len(nuevas)
+                self._inactivas.extend(nuevas)
+                self._cond.notify_all()
+    
+    def obtener(self, timeout=None):
+        """Presta una conexión del pool"""
+        timeout = self.timeout if timeout is None else timeout
+        limite = time.monotonic() + timeout
+        
+        while True:
+            with self._cond:
+                self._verificar_proceso()
+                
+                if not self._inactivas and self._total >= self.maximo:
+                    self.esperas += 1
+                    inicio = time.monotonic()
+                    while not self._inactivas and self._total >= self.maximo:
+                        restante = limite - time.monotonic()
+                        if restante <= 0:
+                            self.timeouts += 1
+                            self.tiempo_espera += time.monotonic() - inicio
+                            raise PoolAgotadoError(
+                                f'No hay conexiones libres tras {timeout} s')
+                        self._cond.wait(restante)
+                    self.tiempo_espera += time.monotonic() - inicio
+                
+                if self._inactivas:
+                    conn = self._inactivas.pop()
+                else:
+                    # Reservar el lugar y abrir la conexión fuera del lock
+                    conn = None
+                    self._total += 1
+            
+            if conn is None:
+                try:
+                    return self._crear()
+                except Exception:
+                    self._liberar_lugar()
+                    raise
+            
+            if self._es_utilizable(conn):
+                return conn
+            
+            self._cerrar(conn)
+            self._liberar_lugar()
+    
+    def devolver(self, conn, descartar=False):
+        """Devuelve una conexión prestada, deshaciendo lo que no se confirmó.
+        
+        Se descarta también si un cursor perdió el servidor durante el préstamo
+        (ver CursorInstrumentado), aunque nadie haya propagado el error.
+        """
+        if self._pid != os.getpid():
+            return
+        
+        descartar = descartar or es_fallo_de_servidor(getattr(conn, 'fallo_operacional', None))
+        conn.fallo_operacional = None
+        if not descartar:
+            try:
+                conn.rollback()
+            except Exception:
+                descartar = True
+        
+        if descartar:
+            self._cerrar(conn)
+            self._liberar_lugar()
+            return
+        
+        with self._cond:
+            self._inactivas.append(conn)
+            self._cond.notify()
+    
+    def _liberar_lugar(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+    
+    @contextmanager
+    def conexion(self, timeout=None):
+        """Presta una conexión durante el bloque `with`"""
+        conn = self.obtener(timeout)
+        descartar = False
+        try:
+            yield conn
+        except MySQLdb.OperationalError:
+            descartar = True
+            raise
+        finally:
+            self.devolver(conn, descartar)
+    
+    def cerrar(self):
+        """Cierra todas las conexiones inactivas"""
+        with self._cond:
+            inactivas, self._inactivas = self._inactivas, []
+            self._total -= len(inactivas)
+        for conn in inactivas:
+            self._cerrar(conn)
+    
+    def saludable(self):
+        """Indica si la última conexión abierta contra la base de datos tuvo éxito"""
+        return self._fallos_consecutivos == 0
+    
+    def estadisticas(self):
+        """Devuelve el estado actual del pool"""
+        with self._cond:
+            self._verificar_proceso()
+            inactivas = len(self._inactivas)
+            return {
+                'en_uso': self._total - inactivas,
+                'inactivas': inactivas,
+                'total': self._total,
+                'minimo': self.minimo,
+                'maximo': self.maximo,
+                'esperas': self.esperas,
+                'tiempo_espera_total': round(self.tiempo_espera, 4),
+                'timeouts': self.timeouts,
+                'creadas': self.creadas,
+                'recicladas': self.recicladas,
+                'fallos_ping': self.fallos_ping,
+                'fallos_conexion': self.fallos_conexion
+            }
+
+class SelectorReplicas:
+    """Reparte las lecturas entre las réplicas por turnos (round-robin).
+    
+    Una réplica que no acepta conexiones o falla en medio de una petición
+    queda apartada durante `expulsion_segundos`; si ninguna está disponible
+    la lectura va a la primaria.
+    """
+    
+    def __init__(self, pools, expulsion_segundos=30):
+        self.pools = pools
+        self.expulsion_segundos = expulsion_segundos
+        self._turno = itertools.count()
+        self._expulsadas = {}
+        self._lock = threading.Lock()
+        self.lecturas = 0
+        self.expulsiones = 0
+        self.sin_replica = 0
+    
+    def _disponible(self, indice):
+        with self._lock:
+            hasta = self._expulsadas.get(indice)
+            if hasta is None:
+                return True
+            if time.monotonic() >= hasta:
+                del self._expulsadas[indice]
+                return True
+            return False
+    
+    def expulsar(self, pool):
+        """Aparta la réplica del reparto durante expulsion_segundos"""
+        indice = self.pools.index(pool)
+        with self._lock:
+            if indice not in self._expulsadas:
+                self.expulsiones += 1
+            self._expulsadas[indice] = time.monotonic() + self.expulsion_segundos
+    
+    def obtener(self):
+        """Presta una conexión de la siguiente réplica disponible.
+        
+        Devuelve (pool, conexion), o None si ninguna réplica responde.
+        """
+        inicio = next(self._turno)
+        for paso in range(len(self.pools)):
+            pool = self.pools[(inicio + paso) % len(self.pools)]
+            if not self._disponible(self.pools.index(pool)):
+                continue
+            try:
+                conn = pool.obtener()
+            except PoolAgotadoError:
+                # Ocupada, no caída: se prueba la siguiente sin apartarla
+                continue
+            except Exception:
+                self.expulsar(pool)
+                continue
+            with self._lock:
+                self.lecturas += 1
+            return pool, conn
+        
+        with self._lock:
+            self.sin_replica += 1
+        return None
+    
+    def calentar(self):
+        for pool in self.pools:
+            try:
+                pool.calentar()
+            except Exception:
+                self.expulsar(pool)
+    
+    def cerrar(self):
+        for pool in self.pools:
+            pool.cerrar()
+    
+    def estadisticas(self):
+        with self._lock:
+            expulsadas = len(self._expulsadas)
+        return {
+            'replicas': len(self.pools),
+            'disponibles': len(self.pools) - expulsadas,
+            'lecturas': self.lecturas,
+            'expulsiones': self.expulsiones,
+            'sin_replica': self.sin_replica
+        }
+
+def leer_replicas(valor):
+    """Convierte "host[:puerto],host[:puerto]" en [(host, puerto), ...]"""
+    replicas = []
+    for parte in (valor or '').split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        host, _, puerto = parte.partition(':')
+        replicas.append((host, int(puerto) if puerto else 3306))
+    return replicas
+
+def parametros_conexion(config, host=None, puerto=None):
+    """Construye los parámetros de MySQLdb.connect a partir de la configuración"""
+    return {
+        'host': host or config['MYSQL_HOST'],
+        'port': int(puerto or config.get('MYSQL_PORT', 3306)),
+        'user': config['MYSQL_USER'],
+        'passwd': config['MYSQL_PASSWORD'],
+        'db': config['MYSQL_DB'],
+        'charset': 'utf8mb4',
+        'use_unicode': True,
+        'cursorclass': CURSORES[config.get('MYSQL_CURSORCLASS', 'DictCursor')],
+        'connect_timeout': int(config.get('MYSQL_CONNECT_TIMEOUT', 10))
+    }
+
+def conectar(config_clase):
+    """Abre una conexión directa (sin pool) a partir de una clase de configuración.
+    
+    Pensada para comandos de consola y tareas de mantenimiento.
+    """
+    config = {clave: getattr(config_clase, clave) for clave in dir(config_clase) if clave.isupper()}
+    return MySQLdb.connect(**parametros_conexion(config))
+
+class BaseDatos:
+    """Acceso a MySQL para los blueprints a través del pool de conexiones.
+    
+    `db.connection` presta una conexión la primera vez que se usa en la
+    petición y la devuelve al pool al terminar el contexto de la aplicación.
+    
+    Si hay réplicas configuradas (MYSQL_REPLICAS), las peticiones GET/HEAD
+    leen de una réplica y el resto usa la primaria. Tras una escritura, el
+    usuario lee de la primaria durante REPLICA_PRIMARIA_SEGUNDOS para ver
+    sus propios cambios: en este proceso se recuerda por usuario, y para
+    los demás workers la respuesta incluye la cabecera X-Leer-Primaria-Hasta,
+    que el cliente reenvía en sus siguientes peticiones.
+    """
+    
+    def __init__(self, app=None):
+        self.pool = None
+        self.replicas = None
+        self._primaria_hasta = {}
+        self._lock = threading.Lock()
+        self.peticiones_primaria = 0
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        config = app.config
+        opciones = dict(
+            minimo=config['POOL_MIN'],
+            maximo=config['POOL_MAX'],
+            reciclar_segundos=config['POOL_RECICLAR_SEGUNDOS'],
+            timeout=config['POOL_TIMEOUT_SEGUNDOS'],
+            pre_ping=config['POOL_PRE_PING']
+        )
+        self.pool = PoolConexiones(parametros_conexion(config), **opciones)
+        self.replicas = SelectorReplicas(
+            [PoolConexiones(parametros_conexion(config, host, puerto), **opciones)
+             for host, puerto in leer_replicas(config['MYSQL_REPLICAS'])],
+            config['REPLICA_EXPULSION_SEGUNDOS']
+        )
+        self.ventana_primaria = config['REPLICA_PRIMARIA_SEGUNDOS']
+        
+        app.after_request(self._recordar_escritura)
+        app.teardown_appcontext(self._liberar)
+        app.extensions['base_datos'] = self
+    
+    def _debe_leer_primaria(self):
+        if not self.replicas.pools or request.method not in METODOS_LECTURA:
+            return True
+        
+        # Ventana pedida por el cliente (acotada: no puede fijar la primaria para siempre)
+        try:
+            hasta = int(request.headers.get(CABECERA_PRIMARIA, 0)) / 1000
+        except ValueError:
+            hasta = 0
+        if time.time() < hasta <= time.time() + self.ventana_primaria:
+            return True
+        
+        usuario = g.get('usuario')
+        if usuario is not None:
+            with self._lock:
+                return time.monotonic() < self._primaria_hasta.get(usuario['usuario_id'], 0)
+        return False
+    
+    def _recordar_escritura(self, respuesta):
+        """Tras una petición de escritura exitosa, fija la primaria para las lecturas del usuario"""
+        if (not self.replicas.pools or request.method in METODOS_LECTURA
+                or respuesta.status_code >= 400):
+            return respuesta
+        
+        usuario = g.get('usuario')
+        if usuario is not None:
+            with self._lock:
+                if len(self._primaria_hasta) > 10000:
+                    ahora = time.monotonic()
+                    self._primaria_hasta = {u: h for u, h in self._primaria_hasta.items() if h > ahora}
+                self._primaria_hasta[usuario['usuario_id']] = time.monotonic() + self.ventana_primaria
+        respuesta.headers[CABECERA_PRIMARIA] = str(int((time.time() + self.ventana_primaria) * 1000))
+        return respuesta
+    
+    @property
+    def connection(self):
+        """Conexión prestada para la petición actual (réplica o primaria)"""
+        if 'db_conexion' not in g:
+            prestada = None if self._debe_leer_primaria() else self.replicas.obtener()
+            if prestada is None:
+                prestada = self.pool, self.pool.obtener()
+                with self._lock:
+                    self.peticiones_primaria += 1
+            g.db_pool, g.db_conexion = prestada
+        return g.db_conexion
+    
+    def conexion(self, timeout=None):
+        """Context manager para usar una conexión de la primaria fuera de una petición"""
+        return self.pool.conexion(timeout)
+    
+    def _liberar(self, error):
+        conn = g.pop('db_conexion', None)
+        pool = g.pop('db_pool', self.pool)
+        if conn is not None:
+            # Las rutas capturan sus excepciones y responden 500, así que el fallo
+            # suele llegar anotado en la conexión y no como `error`
+            descartar = (isinstance(error, MySQLdb.OperationalError)
+                        or es_fallo_de_servidor(getattr(conn, 'fallo_operacional', None)))
+            if descartar and pool is not self.pool:
+                self.replicas.expulsar(pool)
+            pool.devolver(conn, descartar=descartar)
+    
+    def estadisticas(self):
+        return self.pool.estadisticas()
+    
+    def estadisticas_replicas(self):
+        with self._lock:
+            peticiones_primaria = self.peticiones_primaria
+        return dict(self.replicas.estadisticas(), peticiones_primaria=peticiones_primaria)
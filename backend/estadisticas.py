@@ -0,0 +1,156 @@
+# ============================================
+# AGREGADOS INCREMENTALES DE CALIFICACIONES
+# ============================================
+#
+# Los triggers de BD.sql mantienen en O(1) la suma y la cantidad de notas
+# por estudiante (agregados_estudiante) y por curso (agregados_curso), y el
+# total de tareas (contadores). Este módulo los lee y permite detectar y
+# reparar desviaciones respecto a la tabla entregas:
+#
+#   python -m backend.estadisticas verificar
+#   python -m backend.estadisticas reparar
+
+import sys
+from backend.config import Config
+from backend.db import conectar
+
+def leer_estadisticas_estudiante(cur, estudiante_id):
+    """Estadísticas del estudiante leídas de los agregados (una sola consulta)"""
+    cur.execute("""
+        SELECT c.valor AS total_tareas,
+            IFNULL(a.calificadas, 0) AS calificadas,
+            IFNULL(a.suma_notas, 0) AS suma_notas
+        FROM contadores c
+        LEFT JOIN agregados_estudiante a ON a.estudiante_id = %s
+        WHERE c.nombre = 'total_tareas'
+    """, (estudiante_id,))
+    fila = cur.fetchone()
+    
+    total_tareas = int(fila['total_tareas']) if fila else 0
+    calificadas = int(fila['calificadas']) if fila else 0
+    promedio = float(fila['suma_notas']) / calificadas if calificadas else 0
+    
+    return {
+        'total_tareas': total_tareas,
+        'calificadas': calificadas,
+        'pendientes': max(total_tareas - calificadas, 0),
+        'promedio': round(promedio, 2)
+    }
+
+# Valores reales calculados desde entregas/tareas
+SQL_REAL_ESTUDIANTES = """
+    SELECT estudiante_id, SUM(nota) AS suma_notas, COUNT(nota) AS calificadas
+    FROM entregas
+    WHERE nota IS NOT NULL
+    GROUP BY estudiante_id
+"""
+
+SQL_REAL_CURSOS = """
+    SELECT t.curso, SUM(e.nota) AS suma_notas, COUNT(e.nota) AS calificadas
+    FROM entregas e
+    JOIN tareas t ON t.id = e.tarea_id
+    WHERE e.nota IS NOT NULL
+    GROUP BY t.curso
+"""
+
+SQL_REAL_TOTAL_TAREAS = "SELECT COUNT(*) FROM tareas WHERE estado <> 'eliminada'"
+
+def verificar(cur):
+    """Compara los agregados con los valores reales; devuelve las desviaciones"""
+    desviaciones = []
+    
+    for tabla, clave, sql_real in (
+        ('agregados_estudiante', 'estudiante_id', SQL_REAL_ESTUDIANTES),
+        ('agregados_curso', 'curso', SQL_REAL_CURSOS),
+    ):
+        cur.execute(f"""
+            SELECT r.{clave} AS clave, a.suma_notas, a.calificadas,
+                r.suma_notas AS suma_real, r.calificadas AS calificadas_real
+            FROM ({sql_real}) r
+            LEFT JOIN {tabla} a ON a.{clave} = r.{clave}
+            WHERE a.{clave} IS NULL
+                OR a.suma_notas <> r.suma_notas OR a.calificadas <> r.calificadas
+            UNION ALL
+            SELECT a.{clave}, a.suma_notas, a.calificadas, 0, 0
+            FROM {tabla} a
+            LEFT JOIN ({sql_real}) r ON r.{clave} = a.{clave}
+            WHERE r.{clave} IS NULL AND (a.suma_notas <> 0 OR a.calificadas <> 0)
+        """)
+        for fila in cur.fetchall():
+            desviaciones.append({'tabla': tabla, **fila})
+    
+    cur.execute(f"""
+        SELECT c.valor, ({SQL_REAL_TOTAL_TAREAS}) AS valor_real
+        FROM contadores c WHERE c.nombre = 'total_tareas'
+    """)
+    fila = cur.fetchone()
+    if fila is None or fila['valor'] != fila['valor_real']:
+        desviaciones.append({
+            'tabla': 'contadores',
+            'clave': 'total_tareas',
+            'valor': fila['valor'] if fila else None,
+            'valor_real': fila['valor_real'] if fila else None
+        })
+    
+    return desviaciones
+
+def reconstruir(conn):
+    """Recalcula todos los agregados desde entregas y tareas en una transacción"""
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM agregados_estudiante")
+        cur.execute(f"""
+            INSERT INTO agregados_estudiante (estudiante_id, suma_notas, calificadas)
+            {SQL_REAL_ESTUDIANTES}
+        """)
+        
+        cur.execute("DELETE FROM agregados_curso")
+        cur.execute(f"""
+            INSERT INTO agregados_curso (curso, suma_notas, calificadas)
+            {SQL_REAL_CURSOS}
+        """)
+        
+        cur.execute(f"""
+            INSERT INTO contadores (nombre, valor)
+            SELECT * FROM (SELECT 'total_tareas' AS nombre, ({SQL_REAL_TOTAL_TAREAS}) AS total) AS nuevo
+            ON DUPLICATE KEY UPDATE valor = nuevo.total
+        """)
+        
+        cur.execute("""
+            UPDATE estudiantes e
+            LEFT JOIN agregados_estudiante a ON a.estudiante_id = e.usuario_id
+            SET e.promedio_general = IF(a.calificadas > 0, a.suma_notas / a.calificadas, 0),
+                e.tareas_completadas = IFNULL(a.calificadas, 0)
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def main(argv):
+    if len(argv) != 1 or argv[0] not in ('verificar', 'reparar'):
+        print("Uso: python -m backend.estadisticas [verificar|reparar]")
+        return 2
+    
+    conn = conectar(Config)
+    try:
+        cur = conn.cursor()
+        desviaciones = verificar(cur)
+        cur.close()
+        
+        for d in desviaciones:
+            print(f"Desviación: {d}")
+        print(f"{len(desviaciones)} desviaciones encontradas")
+        
+        if argv[0] == 'reparar' and desviaciones:
+            reconstruir(conn)
+            print("Agregados reconstruidos")
+        
+        return 1 if desviaciones and argv[0] == 'verificar' else 0
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
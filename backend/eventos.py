@@ -0,0 +1,111 @@
+# ============================================
+# DIFUSIÓN DE EVENTOS EN PROCESO (PUB/SUB)
+# ============================================
+
+import queue
+import threading
+
+class Suscripcion:
+    """Cola de eventos de un cliente conectado (p. ej. un stream SSE)"""
+    
+    def __init__(self, canal, usuario_id, tipo_usuario, capacidad):
+        self.canal = canal
+        self.usuario_id = usuario_id
+        self.tipo_usuario = tipo_usuario
+        self.cola = queue.Queue(maxsize=capacidad)
+    
+    def esperar(self, timeout):
+        """Devuelve el siguiente evento o None si no llegó ninguno en `timeout` segundos"""
+        try:
+            return self.cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def cancelar(self):
+        self.canal.cancelar(self)
+
+class CanalEventos:
+    """Reparte eventos a los clientes conectados a este proceso.
+    
+    Los eventos solo avisan de que hay algo nuevo: la fuente de verdad
+    sigue siendo la base de datos, así que si la cola de un cliente lento
+    se llena el evento se descarta sin perder información.
+    """
+    
+    def __init__(self, capacidad_cola=100):
+        self.capacidad_cola = capacidad_cola
+        self._por_usuario = {}
+        self._conexiones = 0
+        self._lock = threading.Lock()
+        self.publicados = 0
+        self.entregados = 0
+        self.descartados = 0
+        self.rechazadas = 0
+    
+    def suscribir(self, usuario_id, tipo_usuario, maximo=None):
+        """Registra una conexión; con `maximo`, devuelve None si ya hay tantas abiertas.
+        
+        El recuento y el alta ocurren bajo el mismo lock, así que varias
+        conexiones simultáneas nunca superan el máximo.
+        """
+        suscripcion = Suscripcion(self, usuario_id, tipo_usuario, self.capacidad_cola)
+        with self._lock:
+            if maximo is not None and self._conexiones >= maximo:
+                self.rechazadas += 1
+                return None
+            self._por_usuario.setdefault(usuario_id, set()).add(suscripcion)
+            self._conexiones += 1
+        return suscripcion
+    
+    def cancelar(self, suscripcion):
+        with self._lock:
+            suscripciones = self._por_usuario.get(suscripcion.usuario_id)
+            if suscripciones is not None and suscripcion in suscripciones:
+                suscripciones.discard(suscripcion)
+                self._conexiones -= 1
+                if not suscripciones:
+                    del self._por_usuario[suscripcion.usuario_id]
+    
+    def _entregar(self, suscripciones, evento):
+        # Las colas se llenan fuera del lock; los contadores se suman una vez al final
+        entregados = descartados = 0
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.cola.put_nowait(evento)
+                entregados += 1
+            except queue.Full:
+                descartados += 1
+        with self._lock:
+            self.entregados += entregados
+            self.descartados += descartados
+    
+    def publicar(self, usuario_id, evento):
+        """Envía el evento a todas las conexiones de un usuario"""
+        with self._lock:
+            self.publicados += 1
+            suscripciones = list(self._por_usuario.get(usuario_id, ()))
+        self._entregar(suscripciones, evento)
+    
+    def publicar_a_tipo(self, tipo_usuario, evento):
+        """Envía el evento a todas las conexiones de usuarios de un tipo"""
+        with self._lock:
+            self.publicados += 1
+            suscripciones = [s for grupo in self._por_usuario.values()
+                            for s in grupo if s.tipo_usuario == tipo_usuario]
+        self._entregar(suscripciones, evento)
+    
+    def conexiones(self):
+        with self._lock:
+            return self._conexiones
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'conexiones': self._conexiones,
+                'publicados': self.publicados,
+                'entregados': self.entregados,
+                'descartados': self.descartados,
+                'rechazadas': self.rechazadas
+            }
+
+canal_eventos = CanalEventos()
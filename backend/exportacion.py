@@ -0,0 +1,144 @@
+# ============================================
+# EXPORTACIÓN DE LIBRETAS DE CALIFICACIONES (CSV / XLSX)
+# ============================================
+#
+# La libreta de un curso es la matriz estudiantes × tareas. Una consulta
+# pequeña lee las tareas del curso (las columnas) y luego las notas se
+# recorren en una sola pasada sobre un cursor del lado del servidor,
+# ordenado por estudiante: solo se mantiene en memoria la fila del
+# estudiante actual.
+
+import csv
+import io
+import tempfile
+from flask import Response, stream_with_context
+from werkzeug.utils import secure_filename
+from backend.metricas import SSDictCursorInstrumentado
+
+try:
+    import xlsxwriter
+except ImportError:  # Opcional: solo necesario para formato=xlsx
+    xlsxwriter = None
+
+FORMATOS = ('csv', 'xlsx')
+TIPOS_MIME = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+BLOQUE_ARCHIVO = 64 * 1024
+
+SQL_TAREAS_CURSO = """
+    SELECT id, titulo FROM tareas
+    WHERE curso = %s AND estado <> 'eliminada'
+    ORDER BY fecha_entrega, id
+"""
+
+def sql_notas_curso(grado=None, seccion=None):
+    """Consulta de estudiantes y sus notas del curso, agrupada por estudiante"""
+    condiciones, parametros = [], []
+    if grado:
+        condiciones.append('s.grado = %s')
+        parametros.append(grado)
+    if seccion:
+        condiciones.append('s.seccion = %s')
+        parametros.append(seccion)
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    
+    sql = f"""
+        SELECT u.id AS estudiante_id, u.apellidos, u.nombres, s.grado, s.seccion,
+            e.tarea_id, e.nota
+        FROM estudiantes s
+        JOIN usuarios u ON u.id = s.usuario_id
+        LEFT JOIN (entregas e JOIN tareas t
+                ON t.id = e.tarea_id AND t.curso = %s AND t.estado <> 'eliminada')
+            ON e.estudiante_id = s.usuario_id
+        {donde}
+        ORDER BY s.grado, s.seccion, u.apellidos, u.nombres, u.id
+    """
+    return sql, parametros
+
+def encabezado_libreta(tareas):
+    return (['ID', 'Apellidos', 'Nombres', 'Grado', 'Sección']
+            + [t['titulo'] for t in tareas] + ['Promedio'])
+
+def filas_libreta(cur, tareas):
+    """Pivota las filas (estudiante, tarea, nota) en una fila por estudiante"""
+    posiciones = {t['id']: i for i, t in enumerate(tareas)}
+    actual, notas = None, None
+    
+    def cerrar_fila():
+        calificadas = [n for n in notas if n is not None]
+        promedio = round(sum(calificadas) / len(calificadas), 2) if calificadas else None
+        return [actual['estudiante_id'], actual['apellidos'], actual['nombres'],
+                actual['grado'], actual['seccion']] + notas + [promedio]
+    
+    for fila in iter(cur.fetchone, None):
+        if actual is None or fila['estudiante_id'] != actual['estudiante_id']:
+            if actual is not None:
+                yield cerrar_fila()
+            actual, notas = fila, [None] * len(tareas)
+        if fila['tarea_id'] is not None:
+            notas[posiciones[fila['tarea_id']]] = fila['nota']
+    
+    if actual is not None:
+        yield cerrar_fila()
+
+def generar_csv(encabezado, filas):
+    """Escribe el CSV fila a fila, sin acumular el archivo"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    
+    # BOM para que Excel reconozca el UTF-8
+    escritor.writerow(encabezado)
+    yield '\ufeff' + buffer.getvalue()
+    
+    for fila in filas:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerow(fila)
+        yield buffer.getvalue()
+
+def generar_xlsx(encabezado, filas):
+    """Escribe el XLSX en modo constant_memory a un archivo temporal y lo envía por bloques.
+    
+    El formato XLSX es un ZIP que solo queda completo al cerrarlo, así que el
+    archivo se termina de escribir antes de enviar el primer byte.
+    """
+    with tempfile.TemporaryFile() as archivo:
+        libro = xlsxwriter.Workbook(archivo, {'constant_memory': True})
+        hoja = libro.add_worksheet('Calificaciones')
+        hoja.write_row(0, 0, encabezado, libro.add_format({'bold': True}))
+        for numero, fila in enumerate(filas, start=1):
+            hoja.write_row(numero, 0, fila)
+        libro.close()
+        
+        archivo.seek(0)
+        for bloque in iter(lambda: archivo.read(BLOQUE_ARCHIVO), b''):
+            yield bloque
+
+def respuesta_libreta(conn, curso, grado=None, seccion=None, formato='csv'):
+    """Respuesta en streaming con la libreta del curso en el formato pedido"""
+    # Ambas consultas corren en la misma transacción (misma instantánea): toda
+    # tarea que aparezca en las notas está en `tareas`, así que filas_libreta
+    # encuentra siempre su columna
+    cur = conn.cursor()
+    cur.execute(SQL_TAREAS_CURSO, (curso,))
+    tareas = cur.fetchall()
+    cur.close()
+    
+    sql, parametros = sql_notas_curso(grado, seccion)
+    cur = conn.cursor(SSDictCursorInstrumentado)
+    cur.execute(sql, [curso] + parametros)
+    
+    generador = generar_xlsx if formato == 'xlsx' else generar_csv
+    
+    def generar():
+        try:
+            yield from generador(encabezado_libreta(tareas), filas_libreta(cur, tareas))
+        finally:
+            cur.close()
+    
+    nombre = secure_filename('_'.join(p for p in ('libreta', curso, grado, seccion) if p))
+    return Response(stream_with_context(generar()), mimetype=TIPOS_MIME[formato], headers={
+        'Content-Disposition': f'attachment; filename="{nombre}.{formato}"'
+    })
@@ -0,0 +1,121 @@
+# ============================================
+# HASH DE CONTRASEÑAS EN UN POOL DE PROCESOS
+# ============================================
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from backend.config import Config
+
+class HashingSaturadoError(Exception):
+    """Hay demasiadas operaciones de hash pendientes"""
+
+def _generar(contrasena, metodo):
+    return generate_password_hash(contrasena, method=metodo)
+
+def _verificar(hash_contrasena, contrasena):
+    if hash_contrasena.startswith(('$2a$', '$2b$', '$2y$')):
+        # Hashes bcrypt heredados (datos iniciales de BD.sql)
+        try:
+            import bcrypt
+        except ImportError:
+            return False
+        return bcrypt.checkpw(contrasena.encode('utf-8'), hash_contrasena.encode('utf-8'))
+    return check_password_hash(hash_contrasena, contrasena)
+
+class PoolHashing:
+    """Ejecuta el hash y la verificación de contraseñas fuera del hilo de la petición.
+    
+    scrypt/pbkdf2/bcrypt son costosos a propósito: corren en un pool de
+    `procesos` procesos y como máximo `max_pendientes` operaciones pueden
+    estar en cola a la vez; el resto espera `timeout` segundos y luego se
+    rechaza con HashingSaturadoError.
+    """
+    
+    def __init__(self, procesos=2, max_pendientes=32, metodo='scrypt:32768:8:1', timeout=10):
+        self.procesos = procesos
+        self.max_pendientes = max_pendientes
+        self.metodo = metodo
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pendientes = threading.BoundedSemaphore(max_pendientes)
+        self.rechazadas = 0
+    
+    def _obtener_executor(self):
+        with self._lock:
+            # Cada proceso (p. ej. cada worker de gunicorn) tiene su propio pool
+            if self._executor is None or self._pid != os.getpid():
+                contexto = multiprocessing.get_context('spawn')
+                self._executor = ProcessPoolExecutor(self.procesos, mp_context=contexto)
+                self._pid = os.getpid()
+            return self._executor
+    
+    def _ejecutar(self, funcion, *args):
+        if not self._pendientes.acquire(timeout=self.timeout):
+            self.rechazadas += 1
+            raise HashingSaturadoError('Demasiadas operaciones de hash pendientes')
+        try:
+            return self._obtener_executor().submit(funcion, *args).result()
+        finally:
+            self._pendientes.release()
+    
+    def generar(self, contrasena):
+        """Genera el hash de la contraseña con el método configurado"""
+        return self._ejecutar(_generar, contrasena, self.metodo)
+    
+    def generar_lote(self, contrasenas):
+        """Genera los hashes de varias contraseñas en paralelo, en el mismo orden.
+        
+        Cada hash ocupa un lugar de la cola igual que una operación suelta,
+        así que un lote grande no deja sin turno a los logins.
+        """
+        executor = self._obtener_executor()
+        futuros = []
+        try:
+            for contrasena in contrasenas:
+                if not self._pendientes.acquire(timeout=self.timeout):
+                    self.rechazadas += 1
+                    raise HashingSaturadoError('Demasiadas operaciones de hash pendientes')
+                try:
+                    futuro = executor.submit(_generar, contrasena, self.metodo)
+                except Exception:
+                    self._pendientes.release()
+                    raise
+                futuro.add_done_callback(lambda _: self._pendientes.release())
+                futuros.append(futuro)
+            return [futuro.result() for futuro in futuros]
+        except Exception:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    
+    def verificar(self, hash_contrasena, contrasena):
+        """Comprueba la contraseña contra su hash"""
+        return self._ejecutar(_verificar, hash_contrasena, contrasena)
+    
+    def necesita_rehash(self, hash_contrasena):
+        """Indica si el hash se generó con un método o parámetros distintos a los actuales"""
+        return hash_contrasena.split('$', 1)[0] != self.metodo
+    
+    def calentar(self):
+        """Arranca los procesos del pool antes de la primera petición"""
+        executor = self._obtener_executor()
+        for futuro in [executor.submit(os.getpid) for _ in range(self.procesos)]:
+            futuro.result()
+    
+    def cerrar(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=True)
+            self._executor = None
+
+pool_hashing = PoolHashing(
+    procesos=Config.HASH_PROCESOS,
+    max_pendientes=Config.HASH_MAX_PENDIENTES,
+    metodo=Config.HASH_METODO,
+    timeout=Config.HASH_TIMEOUT_SEGUNDOS
+)
@@ -0,0 +1,318 @@
+# ============================================
+# IMÁGENES RESPONSIVAS (DERIVADOS POR ANCHO Y FORMATO)
+# ============================================
+#
+# Uso: python -m backend.imagenes   (genera de antemano todos los derivados)
+#
+# Cada imagen de IMAGENES_DIRECTORIO se ofrece reducida a los anchos de
+# IMAGENES_ANCHOS (nunca más ancha que el original) en AVIF, WebP y JPEG
+# (PNG si tiene transparencia). El formato se elige por petición según la
+# cabecera Accept; los derivados que faltan se generan en la primera
+# petición.
+#
+# Los derivados se guardan en IMAGENES_CACHE_DIRECTORIO con el hash del
+# original y de los parámetros como nombre, así que nunca se invalidan: un
+# original nuevo produce otros nombres. Cuando la caché supera
+# IMAGENES_CACHE_MAX_BYTES se borran los derivados usados hace más tiempo.
+#
+# python -m backend.recursos agrega srcset/sizes a los <img> de los HTML
+# que apuntan a estas imágenes (ver CatalogoImagenes.atributos).
+
+import argparse
+import hashlib
+import io
+import os
+import threading
+import time
+from backend.config import Config
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Opcional: sin Pillow las imágenes se sirven sin derivados
+    Image = None
+
+EXTENSIONES_IMAGEN = ('.png', '.jpg', '.jpeg', '.webp')
+TIPOS_IMAGEN = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+OPCIONES_FORMATO = {
+    'avif': {'quality': 55, 'speed': 6},
+    'webp': {'quality': 78, 'method': 5},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True}
+}
+VERSION_DERIVADOS = 1   # Cambiarla regenera todos los derivados
+LONGITUD_HUELLA = 10
+
+def leer_anchos(texto):
+    """Anchos de IMAGENES_ANCHOS ("160,320,640") ordenados de menor a mayor"""
+    return sorted({int(ancho) for ancho in texto.split(',') if ancho.strip()})
+
+def formatos_disponibles():
+    """Formatos modernos que la instalación de Pillow sabe codificar, en orden de preferencia"""
+    return tuple(f for f in ('avif', 'webp') if features.check(f))
+
+def elegir_formato(aceptados, modernos, base):
+    """Primer formato moderno que el cliente menciona en Accept; si no, el formato base.
+    
+    Solo cuenta la mención explícita: casi todos los navegadores envían
+    */* y eso no significa que sepan decodificar AVIF.
+    """
+    mencionados = {valor for valor, calidad in aceptados if calidad > 0}
+    for formato in modernos:
+        if TIPOS_IMAGEN[formato] in mencionados:
+            return formato
+    return base
+
+def derivar(contenido, ancho, formato):
+    """Reduce la imagen a `ancho` (manteniendo la proporción) y la codifica en `formato`"""
+    with Image.open(io.BytesIO(contenido)) as original:
+        imagen = ImageOps.exif_transpose(original)
+        if imagen.width > ancho:
+            alto = max(1, round(imagen.height * ancho / imagen.width))
+            imagen = imagen.resize((ancho, alto), Image.Resampling.LANCZOS)
+        if formato == 'jpeg' and imagen.mode != 'RGB':
+            imagen = imagen.convert('RGB')
+        elif imagen.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            imagen = imagen.convert('RGBA' if 'transparency' in imagen.info else 'RGB')
+        salida = io.BytesIO()
+        imagen.save(salida, format=formato.upper(), **OPCIONES_FORMATO[formato])
+        return salida.getvalue()
+
+class CacheImagenes:
+    """Caché en disco de derivados, direccionada por contenido y acotada en bytes.
+    
+    Cada acierto actualiza la fecha de modificación del archivo; al superar
+    el máximo se borran los más antiguos hasta bajar al 90 %. El recuento de
+    bytes es por proceso y se corrige releyendo el directorio al expulsar,
+    así varios workers pueden compartir el mismo directorio.
+    
+    Dentro del proceso cada derivado se genera una sola vez: los hilos que
+    lo piden mientras otro lo genera esperan su lock y sirven el archivo.
+    """
+    
+    def __init__(self, directorio, max_bytes):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._bytes = None
+        self._lock = threading.Lock()
+        self._generando = {}   # ruta -> Lock del hilo que genera el derivado
+        self.aciertos = 0
+        self.generadas = 0
+        self.expulsadas = 0
+    
+    def ruta(self, clave, formato):
+        return os.path.join(self.directorio, clave[:2], f'{clave}.{formato}')
+    
+    def _archivos(self):
+        """(modificación, bytes, ruta) de cada derivado guardado"""
+        archivos = []
+        if not os.path.isdir(self.directorio):
+            return archivos
+        for carpeta in os.scandir(self.directorio):
+            if not carpeta.is_dir():
+                continue
+            for archivo in os.scandir(carpeta.path):
+                if archivo.is_file() and not archivo.name.endswith('.tmp'):
+                    estado = archivo.stat()
+                    archivos.append((estado.st_mtime, estado.st_size, archivo.path))
+        return archivos
+    
+    def obtener(self, clave, formato, generar):
+        """Ruta del derivado; si no existe lo genera con generar() y lo guarda"""
+        ruta = self.ruta(clave, formato)
+        with self._lock:
+            if self._bytes is None:
+                # Primera petición del proceso: tamaño actual del directorio compartido
+                self._bytes = sum(tamano for _, tamano, _ in self._archivos())
+                if self._bytes > self.max_bytes:
+                    self._expulsar(conservar=None)
+        if self._tocar(ruta):
+            return ruta
+        
+        with self._lock:
+            generando = self._generando.setdefault(ruta, threading.Lock())
+        try:
+            with generando:
+                # Si otro hilo lo generó mientras se esperaba el lock, ya está en disco
+                if self._tocar(ruta):
+                    return ruta
+                self._generar(ruta, generar)
+        finally:
+            with self._lock:
+                if self._generando.get(ruta) is generando:
+                    del self._generando[ruta]
+        return ruta
+    
+    def _tocar(self, ruta):
+        """Marca el derivado como usado; False si no está en disco"""
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self.aciertos += 1
+        return True
+    
+    def _generar(self, ruta, generar):
+        contenido = generar()
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)  # Atómico: otro worker nunca lee un archivo a medias
+        
+        with self._lock:
+            self.generadas += 1
+            self._bytes += len(contenido)
+            if self._bytes > self.max_bytes:
+                self._expulsar(conservar=ruta)
+    
+    def _expulsar(self, conservar):
+        """Borra los derivados menos usados hasta quedar por debajo del 90 % del máximo"""
+        archivos = sorted(self._archivos())
+        total = sum(tamano for _, tamano, _ in archivos)
+        limite = self.max_bytes * 0.9
+        for _, tamano, ruta in archivos:
+            if total <= limite:
+                break
+            if ruta == conservar:
+                continue
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass  # Ya lo expulsó otro worker
+            total -= tamano
+            self.expulsadas += 1
+        self._bytes = total
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'generadas': self.generadas,
+                'expulsadas': self.expulsadas,
+                'bytes': self._bytes or 0,
+                'max_bytes': self.max_bytes
+            }
+
+class CatalogoImagenes:
+    """Originales de IMAGENES_DIRECTORIO con sus anchos y formatos derivados"""
+    
+    def __init__(self, directorio, cache, anchos, modernos):
+        self.directorio = directorio
+        self.cache = cache
+        self.anchos_base = anchos
+        self.modernos = modernos
+        self.imagenes = {}
+        self._lock = threading.Lock()
+        self.servidas = {formato: 0 for formato in TIPOS_IMAGEN}
+        for carpeta, _, nombres in os.walk(directorio):
+            for nombre in sorted(nombres):
+                if os.path.splitext(nombre)[1].lower() in EXTENSIONES_IMAGEN:
+                    ruta = os.path.join(carpeta, nombre)
+                    self.imagenes[os.path.relpath(ruta, directorio).replace(os.sep, '/')] = self._describir(ruta)
+    
+    @classmethod
+    def cargar(cls, directorio=None, cache_directorio=None, max_bytes=None, anchos=None):
+        """Devuelve el catálogo, o None si Pillow no está instalado o no hay imágenes"""
+        directorio = directorio or Config.IMAGENES_DIRECTORIO
+        if Image is None or not os.path.isdir(directorio):
+            return None
+        cache = CacheImagenes(cache_directorio or Config.IMAGENES_CACHE_DIRECTORIO,
+                            max_bytes if max_bytes is not None else Config.IMAGENES_CACHE_MAX_BYTES)
+        return cls(directorio, cache, leer_anchos(anchos or Config.IMAGENES_ANCHOS), formatos_disponibles())
+    
+    @staticmethod
+    def _describir(ruta):
+        with open(ruta, 'rb') as archivo:
+            huella = hashlib.sha256(archivo.read()).hexdigest()
+        with Image.open(ruta) as imagen:
+            ancho, alto = ImageOps.exif_transpose(imagen).size
+            alfa = imagen.mode in ('RGBA', 'LA', 'PA') or 'transparency' in imagen.info
+        return {'ruta': ruta, 'huella': huella, 'ancho': ancho, 'alto': alto,
+                'base': 'png' if alfa else 'jpeg', 'modificada': os.path.getmtime(ruta)}
+    
+    def anchos(self, nombre):
+        """Anchos ofrecidos para la imagen: los configurados menores que el original y el original"""
+        original = self.imagenes[nombre]['ancho']
+        return [ancho for ancho in self.anchos_base if ancho < original] + [original]
+    
+    def url(self, nombre, ancho):
+        return f"/imagenes/{self.imagenes[nombre]['huella'][:LONGITUD_HUELLA]}/{ancho}/{nombre}"
+    
+    def atributos(self, nombre):
+        """src, srcset, width y height para un <img> de la imagen"""
+        imagen, anchos = self.imagenes[nombre], self.anchos(nombre)
+        return {
+            'src': self.url(nombre, anchos[-1]),
+            'srcset': ', '.join(f'{self.url(nombre, ancho)} {ancho}w' for ancho in anchos),
+            'width': str(imagen['ancho']),
+            'height': str(imagen['alto'])
+        }
+    
+    def formatos(self, nombre):
+        return self.modernos + (self.imagenes[nombre]['base'],)
+    
+    def derivado(self, nombre, ancho, formato):
+        """Ruta en disco del derivado (lo genera si falta)"""
+        imagen = self.imagenes[nombre]
+        opciones = sorted(OPCIONES_FORMATO[formato].items())
+        clave = hashlib.sha256(
+            f"{imagen['huella']}:{ancho}:{formato}:{opciones}:{VERSION_DERIVADOS}".encode('utf-8')
+        ).hexdigest()[:32]
+        
+        def generar():
+            with open(imagen['ruta'], 'rb') as archivo:
+                return derivar(archivo.read(), ancho, formato)
+        
+        return self.cache.obtener(clave, formato, generar)
+    
+    def elegir(self, nombre, aceptados):
+        """Formato a servir según Accept, contado en las estadísticas"""
+        formato = elegir_formato(aceptados, self.modernos, self.imagenes[nombre]['base'])
+        with self._lock:
+            self.servidas[formato] += 1
+        return formato
+    
+    def pregenerar(self):
+        """Genera todos los derivados; devuelve {formato: bytes} sumando todas las imágenes y anchos"""
+        totales = {}
+        for nombre in self.imagenes:
+            for ancho in self.anchos(nombre):
+                for formato in self.formatos(nombre):
+                    ruta = self.derivado(nombre, ancho, formato)
+                    totales[formato] = totales.get(formato, 0) + os.path.getsize(ruta)
+        return totales
+    
+    def estadisticas(self):
+        with self._lock:
+            servidas = dict(self.servidas)
+        return {
+            'imagenes': len(self.imagenes),
+            **{f'servidas_{formato}': n for formato, n in servidas.items()},
+            **self.cache.estadisticas()
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera los derivados responsivos de las imágenes')
+    parser.add_argument('--origen', default=Config.IMAGENES_DIRECTORIO)
+    parser.add_argument('--cache', default=Config.IMAGENES_CACHE_DIRECTORIO)
+    args = parser.parse_args()
+    
+    catalogo = CatalogoImagenes.cargar(args.origen, args.cache)
+    if catalogo is None:
+        print("Sin derivados: instalar Pillow y revisar IMAGENES_DIRECTORIO")
+        return
+    
+    inicio = time.perf_counter()
+    totales = catalogo.pregenerar()
+    originales = sum(os.path.getsize(imagen['ruta']) for imagen in catalogo.imagenes.values())
+    print(f"{len(catalogo.imagenes)} imágenes en {catalogo.cache.directorio} "
+        f"({time.perf_counter() - inicio:.1f} s)")
+    print(f"  {'originales':<12} {originales:>10} bytes")
+    for formato, total in totales.items():
+        print(f"  {formato:<12} {total:>10} bytes (todos los anchos)")
+    for nombre in catalogo.imagenes:
+        print(f"  {nombre}: {', '.join(str(ancho) for ancho in catalogo.anchos(nombre))}")
+
+if __name__ == '__main__':
+    main()
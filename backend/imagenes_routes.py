@@ -0,0 +1,38 @@
+# ============================================
+# RUTAS DE LAS IMÁGENES RESPONSIVAS
+# ============================================
+#
+# /imagenes/<huella>/<ancho>/<nombre> envía el derivado de la imagen en el
+# formato que el cliente acepta (AVIF, WebP o JPEG/PNG), con Vary: Accept.
+# Solo se sirven los anchos del catálogo, para que nadie pueda llenar la
+# caché pidiendo tamaños arbitrarios. Si la huella es la del original
+# actual la respuesta es inmutable; una huella vieja recibe la imagen
+# nueva pero debe revalidarse.
+
+import os
+from flask import Blueprint, abort, request, send_file
+from backend.imagenes import LONGITUD_HUELLA, TIPOS_IMAGEN
+from backend.recursos_routes import CACHE_INMUTABLE, CACHE_REVALIDAR
+
+def init_imagenes_routes(catalogo, app):
+    """Inicializa las rutas de las imágenes responsivas a partir del catálogo"""
+    imagenes_bp = Blueprint('imagenes', __name__)
+    
+    @imagenes_bp.route('/imagenes/<huella>/<int:ancho>/<path:nombre>', methods=['GET'])
+    def servir_imagen(huella, ancho, nombre):
+        """Envía el derivado del ancho pedido en el mejor formato que acepta el cliente"""
+        imagen = catalogo.imagenes.get(nombre)
+        if imagen is None or ancho not in catalogo.anchos(nombre):
+            abort(404)
+        
+        formato = catalogo.elegir(nombre, request.accept_mimetypes)
+        ruta = catalogo.derivado(nombre, ancho, formato)
+        # El nombre del derivado ya es el hash de su contenido: sirve de ETag estable
+        respuesta = send_file(ruta, mimetype=TIPOS_IMAGEN[formato], conditional=True,
+                            etag=os.path.basename(ruta), last_modified=imagen['modificada'])
+        respuesta.vary.add('Accept')
+        vigente = huella == imagen['huella'][:LONGITUD_HUELLA]
+        respuesta.headers['Cache-Control'] = CACHE_INMUTABLE if vigente else CACHE_REVALIDAR
+        return respuesta
+    
+    return imagenes_bp
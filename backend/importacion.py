@@ -0,0 +1,260 @@
+# ============================================
+# IMPORTACIÓN MASIVA DE USUARIOS DESDE CSV
+# ============================================
+#
+# Lee el CSV como stream y lo procesa por lotes de IMPORTACION_TAMANO_LOTE
+# filas: valida cada fila, busca los ID/DNI/correos ya registrados con una
+# sola consulta por lote, genera los hashes en paralelo y guarda el lote con
+# INSERT multi-fila en una transacción. La memoria usada depende del tamaño
+# del lote, no del archivo.
+#
+#   python -m backend.importacion estudiante alumnos.csv
+#   python -m backend.importacion profesor docentes.csv
+
+import csv
+import io
+import os
+import sys
+from MySQLdb import IntegrityError
+from backend.config import Config
+from backend.db import conectar
+from backend.hashing import PoolHashing, HashingSaturadoError
+from backend.utils import validar_dni, validar_correo, validar_contrasena
+
+OBLIGATORIAS = ('id', 'nombres', 'apellidos', 'dni', 'correo', 'contrasena')
+
+# Tabla de perfil y columnas opcionales de cada tipo de usuario
+PERFILES = {
+    'estudiante': ('estudiantes', ('grado', 'seccion')),
+    'profesor': ('profesores', ('especialidad',))
+}
+
+# Mensajes por columna única, para duplicados en el archivo y en la base de datos
+REPETIDOS = {
+    'id': 'ID repetido en el archivo',
+    'dni': 'DNI repetido en el archivo',
+    'correo': 'Correo repetido en el archivo'
+}
+REGISTRADOS = {
+    'id': 'Este ID ya está registrado',
+    'dni': 'Este DNI ya está registrado',
+    'correo': 'Este correo ya está registrado'
+}
+
+class ReporteImportacion:
+    """Resultado de una importación, con el detalle de las filas rechazadas"""
+    
+    def __init__(self, max_errores=1000):
+        self.max_errores = max_errores
+        self.procesadas = 0
+        self.insertadas = 0
+        self.total_errores = 0
+        self.errores = []
+        self.interrumpida = None
+    
+    def error(self, numero_fila, fila, mensaje):
+        self.total_errores += 1
+        if len(self.errores) < self.max_errores:
+            self.errores.append({'fila': numero_fila, 'id': fila.get('id'), 'mensaje': mensaje})
+    
+    def como_dict(self):
+        return {
+            'procesadas': self.procesadas,
+            'insertadas': self.insertadas,
+            'rechazadas': self.total_errores,
+            'errores': self.errores,
+            'errores_omitidos': self.total_errores - len(self.errores),
+            'interrumpida': self.interrumpida
+        }
+
+def abrir_texto(binario):
+    """Envuelve un stream binario (subida o archivo) para leerlo como texto UTF-8"""
+    if not isinstance(binario, io.BufferedIOBase):
+        binario = io.BufferedReader(binario)
+    return io.TextIOWrapper(binario, encoding='utf-8-sig', newline='')
+
+def leer_lotes(archivo, tamano_lote):
+    """Genera lotes de (numero_fila, fila) leyendo el CSV de forma incremental.
+    
+    Lanza ValueError si faltan columnas obligatorias en la cabecera.
+    """
+    lector = csv.DictReader(archivo)
+    columnas = {(c or '').strip().lower() for c in (lector.fieldnames or [])}
+    faltantes = [c for c in OBLIGATORIAS if c not in columnas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+    
+    lote = []
+    for fila in lector:
+        fila = {(c or '').strip().lower(): (v or '').strip()
+                for c, v in fila.items() if isinstance(v, str)}
+        lote.append((lector.line_num, fila))
+        if len(lote) == tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def validar_fila(fila):
+    """Valida una fila con las mismas reglas del registro individual"""
+    faltantes = [c for c in OBLIGATORIAS if not fila.get(c)]
+    if faltantes:
+        return f"Campos vacíos: {', '.join(faltantes)}"
+    
+    if not validar_dni(fila['dni']):
+        return 'DNI inválido'
+    
+    if not validar_correo(fila['correo']):
+        return 'Correo debe ser de Gmail'
+    
+    valido, mensaje = validar_contrasena(fila['contrasena'])
+    if not valido:
+        return mensaje
+    
+    return None
+
+def buscar_existentes(cur, filas):
+    """ID, DNI y correos del lote que ya están registrados (una sola consulta).
+    
+    Se comparan en minúsculas, como la collation de la tabla.
+    """
+    ids = [f['id'] for f in filas]
+    dnis = [f['dni'] for f in filas]
+    correos = [f['correo'] for f in filas]
+    marcadores = ', '.join(['%s'] * len(filas))
+    
+    cur.execute(f"""
+        SELECT id, dni, correo FROM usuarios
+        WHERE id IN ({marcadores}) OR dni IN ({marcadores}) OR correo IN ({marcadores})
+    """, ids + dnis + correos)
+    
+    existentes = {clave: set() for clave in REGISTRADOS}
+    for fila in cur.fetchall():
+        for clave in existentes:
+            existentes[clave].add(fila[clave].lower())
+    return existentes
+
+def insertar_lote(cur, tipo, filas, hashes):
+    """Inserta los usuarios y sus perfiles con dos INSERT multi-fila (sin commit)"""
+    parametros = []
+    for fila, hash_contrasena in zip(filas, hashes):
+        parametros.extend((fila['id'], fila['nombres'], fila['apellidos'],
+                        fila['dni'], fila['correo'], hash_contrasena, tipo))
+    valores = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(filas))
+    cur.execute(f"""
+        INSERT INTO usuarios (id, nombres, apellidos, dni, correo, contrasena, tipo)
+        VALUES {valores}
+    """, parametros)
+    
+    tabla, opcionales = PERFILES[tipo]
+    parametros = []
+    for fila in filas:
+        parametros.append(fila['id'])
+        parametros.extend(fila.get(c, '') for c in opcionales)
+    marcadores = ', '.join(['%s'] * (len(opcionales) + 1))
+    valores = ', '.join([f'({marcadores})'] * len(filas))
+    cur.execute(f"""
+        INSERT INTO {tabla} (usuario_id, {', '.join(opcionales)})
+        VALUES {valores}
+    """, parametros)
+
+def importar_usuarios(conn, archivo, tipo, hashing, tamano_lote=500, max_errores=1000):
+    """Importa usuarios de un CSV de texto; cada lote es una transacción.
+    
+    Las filas inválidas o duplicadas se omiten y quedan en el reporte; los
+    lotes ya guardados se conservan aunque la importación se interrumpa.
+    """
+    reporte = ReporteImportacion(max_errores)
+    
+    for lote in leer_lotes(archivo, tamano_lote):
+        # Validar y descartar duplicados dentro del propio lote
+        validas = []
+        vistos = {clave: set() for clave in REPETIDOS}
+        for numero, fila in lote:
+            reporte.procesadas += 1
+            error = validar_fila(fila)
+            if not error:
+                error = next((REPETIDOS[clave] for clave in REPETIDOS
+                            if fila[clave].lower() in vistos[clave]), None)
+            if error:
+                reporte.error(numero, fila, error)
+                continue
+            for clave in vistos:
+                vistos[clave].add(fila[clave].lower())
+            validas.append((numero, fila))
+        
+        if not validas:
+            continue
+        
+        cur = conn.cursor()
+        try:
+            existentes = buscar_existentes(cur, [fila for _, fila in validas])
+            nuevas = []
+            for numero, fila in validas:
+                error = next((REGISTRADOS[clave] for clave in REGISTRADOS
+                            if fila[clave].lower() in existentes[clave]), None)
+                if error:
+                    reporte.error(numero, fila, error)
+                else:
+                    nuevas.append((numero, fila))
+            
+            if not nuevas:
+                conn.rollback()
+                continue
+            
+            try:
+                hashes = hashing.generar_lote([fila['contrasena'] for _, fila in nuevas])
+            except HashingSaturadoError:
+                conn.rollback()
+                reporte.interrumpida = f'Servidor ocupado en la fila {nuevas[0][0]}, reintenta desde ahí'
+                break
+            
+            try:
+                insertar_lote(cur, tipo, [fila for _, fila in nuevas], hashes)
+                conn.commit()
+                reporte.insertadas += len(nuevas)
+            except IntegrityError:
+                # Otro registro con el mismo ID/DNI/correo se creó durante la importación
+                conn.rollback()
+                for numero, fila in nuevas:
+                    reporte.error(numero, fila, 'Conflicto con un registro creado durante la importación')
+        finally:
+            cur.close()
+    
+    return reporte
+
+def main(argv):
+    if len(argv) != 2 or argv[0] not in PERFILES:
+        print("Uso: python -m backend.importacion [estudiante|profesor] archivo.csv")
+        return 2
+    
+    tipo, ruta = argv
+    # Fuera del servidor se usan todos los núcleos para los hashes
+    procesos = os.cpu_count() or 1
+    hashing = PoolHashing(procesos=procesos, max_pendientes=procesos * 4,
+                        metodo=Config.HASH_METODO, timeout=None)
+    conn = conectar(Config)
+    try:
+        with open(ruta, 'rb') as binario:
+            reporte = importar_usuarios(conn, abrir_texto(binario), tipo, hashing,
+                                        Config.IMPORTACION_TAMANO_LOTE,
+                                        Config.IMPORTACION_MAX_ERRORES)
+    except ValueError as e:
+        print(e)
+        return 2
+    finally:
+        conn.close()
+        hashing.cerrar()
+    
+    for error in reporte.errores:
+        print(f"Fila {error['fila']} ({error['id']}): {error['mensaje']}")
+    if reporte.total_errores > len(reporte.errores):
+        print(f"... y {reporte.total_errores - len(reporte.errores)} errores más")
+    if reporte.interrumpida:
+        print(reporte.interrumpida)
+    print(f"{reporte.procesadas} filas procesadas, {reporte.insertadas} usuarios importados, "
+        f"{reporte.total_errores} rechazadas")
+    return 1 if reporte.total_errores or reporte.interrumpida else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,276 @@
+# ============================================
+# MÉTRICAS (FORMATO DE TEXTO DE PROMETHEUS)
+# ============================================
+#
+# Registra, por ruta, latencia, códigos de estado, tiempo en base de datos
+# frente a tiempo en Python, y por sentencia SQL la latencia y las filas
+# afectadas. Se exponen en /api/metrics. Cada proceso (worker de gunicorn)
+# tiene su propio registro.
+#
+# /api/metrics revela rutas y el estado del pool, las réplicas y la admisión:
+# solo responde a las IPs de METRICAS_IPS o a quien envíe
+# `Authorization: Bearer <METRICAS_TOKEN>`.
+
+import hmac
+import logging
+import threading
+import time
+import MySQLdb
+import MySQLdb.cursors
+from flask import Response, g, has_request_context, jsonify, request
+
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0)
+
+logger_consultas_lentas = logging.getLogger('colegio.consultas_lentas')
+
+def _formatear_etiquetas(nombres, valores, extra=''):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Contador:
+    """Contador monótono con etiquetas"""
+    
+    tipo = 'counter'
+    
+    def __init__(self, nombre, descripcion, etiquetas=()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = etiquetas
+        self._valores = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *valores_etiquetas, cantidad=1):
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0) + cantidad
+    
+    def exponer(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        for etiquetas, valor in valores:
+            yield f'{self.nombre}{_formatear_etiquetas(self.etiquetas, etiquetas)} {valor}'
+
+class Histograma:
+    """Histograma acumulativo con etiquetas"""
+    
+    tipo = 'histogram'
+    
+    def __init__(self, nombre, descripcion, etiquetas=(), buckets=BUCKETS_LATENCIA):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observar(self, valor, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+    
+    def exponer(self):
+        with self._lock:
+            series = [(e, list(s[0]), s[1], s[2]) for e, s in self._series.items()]
+        for etiquetas, conteos, suma, total in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                le = _formatear_etiquetas(self.etiquetas, etiquetas, f'le="{limite}"')
+                yield f'{self.nombre}_bucket{le} {acumulado}'
+            le = _formatear_etiquetas(self.etiquetas, etiquetas, 'le="+Inf"')
+            yield f'{self.nombre}_bucket{le} {total}'
+            yield f'{self.nombre}_sum{_formatear_etiquetas(self.etiquetas, etiquetas)} {suma}'
+            yield f'{self.nombre}_count{_formatear_etiquetas(self.etiquetas, etiquetas)} {total}'
+
+class Registro:
+    """Conjunto de métricas y colectores de estado que se exponen juntos"""
+    
+    def __init__(self):
+        self._metricas = []
+        self._colectores = {}
+    
+    def contador(self, *args, **kwargs):
+        metrica = Contador(*args, **kwargs)
+        self._metricas.append(metrica)
+        return metrica
+    
+    def histograma(self, *args, **kwargs):
+        metrica = Histograma(*args, **kwargs)
+        self._metricas.append(metrica)
+        return metrica
+    
+    def registrar_colector(self, prefijo, funcion):
+        """Expone como gauges los valores numéricos del dict que devuelve funcion()"""
+        self._colectores[prefijo] = funcion
+    
+    def exponer(self):
+        lineas = []
+        for metrica in self._metricas:
+            lineas.append(f'# HELP {metrica.nombre} {metrica.descripcion}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            lineas.extend(metrica.exponer())
+        
+        for prefijo, funcion in self._colectores.items():
+            try:
+                valores = funcion()
+            except Exception:
+                continue
+            for clave, valor in valores.items():
+                if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                    continue
+                nombre = f'{prefijo}_{clave}'
+                lineas.append(f'# TYPE {nombre} gauge')
+                lineas.append(f'{nombre} {valor}')
+        
+        return '\n'.join(lineas) + '\n'
+
+registro = Registro()
+
+peticiones_total = registro.contador(
+    'http_peticiones_total', 'Peticiones HTTP por ruta, método y código de estado',
+    ('ruta', 'metodo', 'estado'))
+errores_total = registro.contador(
+    'http_errores_total', 'Respuestas de error (4xx/5xx) por ruta y código de estado',
+    ('ruta', 'estado'))
+duracion_peticion = registro.histograma(
+    'http_duracion_segundos', 'Latencia de las peticiones HTTP', ('ruta', 'metodo'))
+tiempo_db_peticion = registro.histograma(
+    'http_tiempo_db_segundos', 'Tiempo de cada petición dentro de la base de datos', ('ruta',))
+tiempo_python_peticion = registro.histograma(
+    'http_tiempo_python_segundos', 'Tiempo de cada petición fuera de la base de datos', ('ruta',))
+duracion_consulta = registro.histograma(
+    'db_consulta_duracion_segundos', 'Latencia de las sentencias SQL', ('ruta', 'operacion'))
+filas_consulta = registro.contador(
+    'db_filas_total', 'Filas devueltas o afectadas por las sentencias SQL', ('ruta', 'operacion'))
+errores_consulta = registro.contador(
+    'db_errores_total', 'Sentencias SQL que terminaron con error', ('ruta', 'operacion'))
+
+# Umbral del registro de consultas lentas (None = desactivado); lo fija init_metricas
+umbral_consulta_lenta = None
+
+def _ruta_actual():
+    if has_request_context():
+        return request.endpoint or 'desconocida'
+    return 'fuera_de_peticion'
+
+def registrar_consulta(sql, duracion, filas, error=False):
+    """Registra una sentencia SQL ejecutada"""
+    sql = sql.decode('utf-8', 'replace') if isinstance(sql, bytes) else sql
+    partes = sql.split(None, 1)
+    operacion = partes[0].upper() if partes else '-'
+    ruta = _ruta_actual()
+    
+    duracion_consulta.observar(duracion, ruta, operacion)
+    if error:
+        errores_consulta.inc(ruta, operacion)
+    elif filas and filas > 0:
+        filas_consulta.inc(ruta, operacion, cantidad=filas)
+    
+    if has_request_context():
+        g.tiempo_db = g.get('tiempo_db', 0.0) + duracion
+    
+    if umbral_consulta_lenta is not None and duracion >= umbral_consulta_lenta:
+        logger_consultas_lentas.warning('Consulta lenta (%.3f s) en %s: %s',
+                                        duracion, ruta, ' '.join(sql.split()))
+
+class CursorInstrumentado:
+    """Mixin que mide cada execute/executemany del cursor.
+    
+    Un OperationalError queda anotado en la conexión (`fallo_operacional`):
+    aunque la ruta capture la excepción, el pool decide al devolverla si la
+    conexión (o la réplica) quedó inservible.
+    """
+    
+    def _medir(self, metodo, query, args):
+        inicio = time.perf_counter()
+        error = False
+        try:
+            return metodo(query, args)
+        except MySQLdb.OperationalError as e:
+            error = True
+            if self.connection is not None:
+                self.connection.fallo_operacional = e
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            registrar_consulta(query, time.perf_counter() - inicio, self.rowcount, error)
+    
+    def execute(self, query, args=None):
+        return self._medir(super().execute, query, args)
+    
+    def executemany(self, query, args):
+        return self._medir(super().executemany, query, args)
+
+class DictCursorInstrumentado(CursorInstrumentado, MySQLdb.cursors.DictCursor):
+    pass
+
+class SSDictCursorInstrumentado(CursorInstrumentado, MySQLdb.cursors.SSDictCursor):
+    pass
+
+def _inicio_peticion():
+    g.inicio_peticion = time.perf_counter()
+    g.tiempo_db = 0.0
+
+def _fin_peticion(respuesta):
+    inicio = g.get('inicio_peticion')
+    if inicio is None:
+        return respuesta
+    
+    duracion = time.perf_counter() - inicio
+    tiempo_db = g.get('tiempo_db', 0.0)
+    ruta = request.endpoint or 'desconocida'
+    estado = respuesta.status_code
+    
+    peticiones_total.inc(ruta, request.method, estado)
+    if estado >= 400:
+        errores_total.inc(ruta, estado)
+    duracion_peticion.observar(duracion, ruta, request.method)
+    tiempo_db_peticion.observar(tiempo_db, ruta)
+    tiempo_python_peticion.observar(max(duracion - tiempo_db, 0.0), ruta)
+    return respuesta
+
+def leer_ips(texto):
+    """IPs de una lista separada por comas ("127.0.0.1,::1")"""
+    return {ip.strip() for ip in (texto or '').split(',') if ip.strip()}
+
+def acceso_metricas_permitido(ip, autorizacion, ips_permitidas, token):
+    """La IP está en la lista permitida o la cabecera Authorization lleva el token"""
+    if token and autorizacion:
+        # Comparación en tiempo constante: el token no se adivina por partes
+        if hmac.compare_digest(autorizacion.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            return True
+    return ip in ips_permitidas
+
+def init_metricas(app):
+    """Instrumenta todas las rutas de la aplicación y expone /api/metrics"""
+    global umbral_consulta_lenta
+    umbral = app.config.get('CONSULTA_LENTA_SEGUNDOS')
+    umbral_consulta_lenta = umbral if umbral else None
+    
+    app.before_request(_inicio_peticion)
+    app.after_request(_fin_peticion)
+    
+    ips_permitidas = leer_ips(app.config.get('METRICAS_IPS'))
+    token = app.config.get('METRICAS_TOKEN')
+    
+    @app.route('/api/metrics', methods=['GET'])
+    def metricas():
+        """Métricas en formato de texto de Prometheus (solo IPs permitidas o con token)"""
+        if not acceso_metricas_permitido(request.remote_addr, request.headers.get('Authorization'),
+                                        ips_permitidas, token):
+            return jsonify({'exito': False, 'mensaje': 'No autorizado'}), 403
+        return Response(registro.exponer(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,258 @@
+# ============================================
+# RUTAS DE NOTIFICACIONES (LISTADO Y STREAM SSE)
+# ============================================
+
+import time
+from flask import Blueprint, Response, request, jsonify, g, current_app, stream_with_context
+from backend.seguridad import requiere_token
+from backend.eventos import canal_eventos
+from backend.admision import respuesta_saturado
+from backend.utils import generar_token_stream
+from backend.paginacion import leer_paginacion, separar_pagina
+
+SQL_NOTIFICACIONES_NUEVAS = """
+    SELECT id, tipo, titulo, mensaje, leida, fecha_creacion
+    FROM notificaciones
+    WHERE usuario_id = %s AND id > %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+def formato_sse(datos, evento=None, id_evento=None):
+    """Serializa un mensaje con el formato de Server-Sent Events"""
+    lineas = []
+    if id_evento is not None:
+        lineas.append(f'id: {id_evento}')
+    if evento:
+        lineas.append(f'event: {evento}')
+    lineas.append(f'data: {current_app.json.dumps(datos)}')
+    return '\n'.join(lineas) + '\n\n'
+
+def leer_ultimo_id(args, headers):
+    """Id desde el que reanudar el stream (Last-Event-ID o ?desde=), o None"""
+    valor = headers.get('Last-Event-ID') or args.get('desde')
+    if valor is None:
+        return None
+    try:
+        return max(int(valor), 0)
+    except ValueError:
+        raise ValueError('Last-Event-ID inválido')
+
+def init_notificaciones_routes(db, app):
+    """Inicializa las rutas de notificaciones con las dependencias necesarias"""
+    notificaciones_bp = Blueprint('notificaciones', __name__)
+    
+    @notificaciones_bp.route('', methods=['GET'])
+    @requiere_token()
+    def obtener_notificaciones():
+        """Obtiene las notificaciones del usuario, de la más reciente a la más antigua"""
+        try:
+            try:
+                limite, cursor = leer_paginacion(request.args, 1)
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
+            
+            usuario_id = g.usuario['usuario_id']
+            solo_no_leidas = request.args.get('no_leidas', '').lower() in ('1', 'true', 'si')
+            
+            condiciones = ['usuario_id = %s']
+            parametros = [usuario_id]
+            if solo_no_leidas:
+                condiciones.append('leida = FALSE')
+            if cursor:
+                condiciones.append('id < %s')
+                parametros.extend(cursor)
+            
+            # Se resuelve con el índice (usuario_id, leida) / idx_usuario, que ya incluyen el id
+            cur = db.connection.cursor()
+            cur.execute(f"""
+                SELECT id, tipo, titulo, mensaje, leida, fecha_creacion
+                FROM notificaciones
+                WHERE {' AND '.join(condiciones)}
+                ORDER BY id DESC
+                LIMIT %s
+            """, parametros + [limite + 1])
+            filas = cur.fetchall()
+            
+            cur.execute("""
+                SELECT COUNT(*) AS no_leidas
+                FROM notificaciones
+                WHERE usuario_id = %s AND leida = FALSE
+            """, (usuario_id,))
+            no_leidas = cur.fetchone()['no_leidas']
+            cur.close()
+            
+            notificaciones, siguiente = separar_pagina(filas, limite, ['id'])
+            
+            return jsonify({
+                'exito': True,
+                'notificaciones': notificaciones,
+                'no_leidas': no_leidas,
+                'siguiente_cursor': siguiente
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en obtener_notificaciones: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
+    @notificaciones_bp.route('/leidas', methods=['POST'])
+    @requiere_token()
+    def marcar_leidas():
+        """Marca como leídas varias notificaciones (por ids o hasta un id)"""
+        try:
+            datos = request.get_json(silent=True) or {}
+            ids = datos.get('ids')
+            hasta_id = datos.get('hasta_id')
+            
+            condiciones = ['usuario_id = %s', 'leida = FALSE']
+            parametros = [g.usuario['usuario_id']]
+            
+            if ids is not None:
+                if (not isinstance(ids, list) or not ids
+                        or not all(isinstance(i, int) for i in ids)):
+                    return jsonify({'exito': False, 'mensaje': 'ids debe ser una lista de enteros'}), 400
+                if len(ids) > current_app.config['PAGINA_MAXIMA']:
+                    return jsonify({
+                        'exito': False,
+                        'mensaje': f"Máximo {current_app.config['PAGINA_MAXIMA']} ids por petición"
+                    }), 400
+                condiciones.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+                parametros.extend(ids)
+            elif hasta_id is not None:
+                if not isinstance(hasta_id, int):
+                    return jsonify({'exito': False, 'mensaje': 'hasta_id debe ser un entero'}), 400
+                condiciones.append('id <= %s')
+                parametros.append(hasta_id)
+            else:
+                return jsonify({'exito': False, 'mensaje': 'Se requiere ids o hasta_id'}), 400
+            
+            cur = db.connection.cursor()
+            cur.execute(f"""
+                UPDATE notificaciones SET leida = TRUE
+                WHERE {' AND '.join(condiciones)}
+            """, parametros)
+            actualizadas = cur.rowcount
+            db.connection.commit()
+            cur.close()
+            
+            return jsonify({
+                'exito': True,
+                'actualizadas': actualizadas,
+                'mensaje': f'{actualizadas} notificaciones marcadas como leídas'
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en marcar_leidas: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
+    @notificaciones_bp.route('/stream/token', methods=['POST'])
+    @requiere_token()
+    def token_stream():
+        """Entrega un token de corta duración para abrir el stream (va en la URL)"""
+        segundos = app.config['SSE_TOKEN_SEGUNDOS']
+        token = generar_token_stream(g.usuario['usuario_id'], g.usuario['tipo'],
+                                    app.config['SECRET_KEY'], segundos)
+        return jsonify({
+            'exito': True,
+            'token': token,
+            'expira_en': segundos,
+            'sondeo_segundos': app.config['SSE_SONDEO_SEGUNDOS']
+        }), 200
+
+    @notificaciones_bp.route('/stream', methods=['GET'])
+    @requiere_token(desde_query=True)
+    def stream_notificaciones():
+        """Envía las notificaciones nuevas del usuario como Server-Sent Events.
+        
+        Los eventos del proceso solo despiertan al stream; las notificaciones
+        se leen siempre de la tabla (id > último enviado), así que reanudar
+        con Last-Event-ID no pierde ninguna. Cada lectura toma una conexión
+        del pool y la devuelve enseguida: un cliente en espera no ocupa
+        ninguna conexión a MySQL.
+        
+        Cada stream ocupa un hilo del worker; sin lugar libre se responde 429
+        y el cliente pasa a consultar cada SSE_SONDEO_SEGUNDOS.
+        """
+        try:
+            ultimo_id = leer_ultimo_id(request.args, request.headers)
+        except ValueError as e:
+            return jsonify({'exito': False, 'mensaje': str(e)}), 400
+        
+        usuario_id = g.usuario['usuario_id']
+        latido = app.config['SSE_LATIDO_SEGUNDOS']
+        duracion_maxima = app.config['SSE_DURACION_MAXIMA_SEGUNDOS']
+        lote = app.config['PAGINA_TAMANO']
+        
+        # Reservar el lugar (atómico) y suscribirse antes de la primera lectura
+        # para no perder avisos intermedios
+        suscripcion = canal_eventos.suscribir(usuario_id, g.usuario['tipo'],
+                                            maximo=app.config['SSE_MAX_CONEXIONES'])
+        if suscripcion is None:
+            return respuesta_saturado(app.config['SSE_SONDEO_SEGUNDOS'],
+                                    'Demasiadas conexiones abiertas, consulta periódicamente')
+        
+        try:
+            if ultimo_id is None:
+                # Conexión nueva: solo interesan las notificaciones posteriores
+                with db.conexion() as conn:
+                    cur = conn.cursor()
+                    cur.execute("""
+                        SELECT IFNULL(MAX(id), 0) AS ultimo
+                        FROM notificaciones WHERE usuario_id = %s
+                    """, (usuario_id,))
+                    ultimo_id = cur.fetchone()['ultimo']
+                    cur.close()
+        except Exception as e:
+            suscripcion.cancelar()
+            print(f"Error en stream_notificaciones: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+        
+        def leer_nuevas(desde):
+            with db.conexion() as conn:
+                cur = conn.cursor()
+                cur.execute(SQL_NOTIFICACIONES_NUEVAS, (usuario_id, desde, lote))
+                filas = cur.fetchall()
+                cur.close()
+            return filas
+        
+        def generar():
+            nonlocal ultimo_id
+            fin = time.monotonic() + duracion_maxima
+            try:
+                yield f'retry: {int(latido * 1000)}\n\n'
+                pendiente = True
+                while time.monotonic() < fin:
+                    # Leer hasta vaciar lo pendiente (por lotes de PAGINA_TAMANO)
+                    while pendiente:
+                        filas = leer_nuevas(ultimo_id)
+                        for fila in filas:
+                            ultimo_id = fila['id']
+                            yield formato_sse(fila, 'notificacion', fila['id'])
+                        pendiente = len(filas) == lote
+                    
+                    evento = suscripcion.esperar(min(latido, max(fin - time.monotonic(), 0)))
+                    if evento is None:
+                        # Latido: mantiene viva la conexión y recoge lo escrito por otros workers
+                        yield ': latido\n\n'
+                        pendiente = True
+                    elif evento['tipo'] == 'notificacion':
+                        pendiente = True
+                    else:
+                        # Avisos efímeros (p. ej. tarea nueva): sin id, no se reanudan
+                        yield formato_sse(evento, evento['tipo'])
+                # El token de la URL ya caducó: el cliente pide otro y se reconecta
+                yield formato_sse({'ultimo_id': ultimo_id}, 'reconectar')
+            except Exception as e:
+                print(f"Error en stream_notificaciones: {e}")
+            finally:
+                suscripcion.cancelar()
+        
+        respuesta = Response(stream_with_context(generar()), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        # Libera el lugar aunque el cliente se vaya antes de recibir el primer byte
+        respuesta.call_on_close(suscripcion.cancelar)
+        return respuesta
+    
+    return notificaciones_bp
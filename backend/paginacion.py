@@ -0,0 +1,90 @@
+# ============================================
+# PAGINACIÓN POR CURSOR (KEYSET) Y RESPUESTAS NDJSON
+# ============================================
+
+import base64
+import json
+from datetime import date, datetime
+from flask import Response, current_app, stream_with_context
+from backend.config import Config
+from backend.metricas import SSDictCursorInstrumentado
+
+def codificar_cursor(valores):
+    """Convierte los valores de la clave de orden en un cursor opaco"""
+    valores = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+    crudo = json.dumps(valores, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor, cantidad):
+    """Recupera los valores de un cursor opaco; lanza ValueError si no es válido"""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except Exception:
+        raise ValueError('Cursor inválido')
+    
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise ValueError('Cursor inválido')
+    return valores
+
+def leer_paginacion(args, cantidad_claves):
+    """Lee `limite` y `cursor` de la query string.
+    
+    Devuelve (limite, valores_cursor); lanza ValueError si son inválidos.
+    """
+    try:
+        limite = int(args.get('limite', Config.PAGINA_TAMANO))
+    except ValueError:
+        raise ValueError('Límite inválido')
+    
+    if limite < 1 or limite > Config.PAGINA_MAXIMA:
+        raise ValueError(f'El límite debe estar entre 1 y {Config.PAGINA_MAXIMA}')
+    
+    cursor = args.get('cursor')
+    valores = decodificar_cursor(cursor, cantidad_claves) if cursor else None
+    return limite, valores
+
+def condicion_keyset(columnas, valores, descendente=False):
+    """Condición SQL "fila posterior al cursor" para un ORDER BY ascendente
+    (o descendente en todas las columnas).
+    
+    Para (a, b, c) genera: a > %s OR (a = %s AND (b > %s OR (b = %s AND c > %s)))
+    que el optimizador resuelve como rango sobre el índice de orden.
+    """
+    operador = '<' if descendente else '>'
+    columna, valor = columnas[-1], valores[-1]
+    sql, parametros = f"{columna} {operador} %s", [valor]
+    
+    for columna, valor in zip(reversed(columnas[:-1]), reversed(valores[:-1])):
+        sql = f"{columna} {operador} %s OR ({columna} = %s AND ({sql}))"
+        parametros = [valor, valor] + parametros
+    
+    return f"({sql})", parametros
+
+def separar_pagina(filas, limite, claves):
+    """Recorta las filas (se piden limite + 1) y calcula el siguiente cursor"""
+    if len(filas) <= limite:
+        return filas, None
+    
+    filas = filas[:limite]
+    ultima = filas[-1]
+    return filas, codificar_cursor([ultima[clave] for clave in claves])
+
+def respuesta_ndjson(conn, sql, parametros):
+    """Transmite el resultado fila a fila (NDJSON) con un cursor del lado del servidor.
+    
+    Las filas se leen de MySQL a medida que se envían, así que la memoria
+    usada no depende del tamaño del resultado.
+    """
+    cur = conn.cursor(SSDictCursorInstrumentado)
+    cur.execute(sql, parametros)
+    dumps = current_app.json.dumps
+    
+    def generar():
+        try:
+            for fila in iter(cur.fetchone, None):
+                yield dumps(fila) + '\n'
+        finally:
+            cur.close()
+    
+    return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
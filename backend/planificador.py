@@ -0,0 +1,199 @@
+# ============================================
+# PLANIFICADOR DE TRABAJOS EN SEGUNDO PLANO
+# ============================================
+#
+# Cada worker de gunicorn arranca un hilo que cada PLANIFICADOR_INTERVALO_SEGUNDOS
+# abre su propia conexión y pide el candado GET_LOCK('colegio_planificador'):
+# solo el worker que lo obtiene ejecuta los trabajos, en orden, y lo libera al
+# terminar. Si ese worker muere, MySQL libera el candado al cerrarse su
+# conexión y otro worker toma el relevo en el siguiente ciclo.
+#
+# Trabajos:
+#   cierre  cierra las tareas activas cuya fecha de entrega ya pasó
+#   purga   borra por lotes las entregas de las tareas eliminadas
+#
+# También pueden ejecutarse a mano (todos o los indicados):
+#
+#   python -m backend.planificador [cierre] [purga]
+
+import logging
+import sys
+import threading
+import MySQLdb
+from backend.config import Config
+from backend.db import conectar
+from backend.cache import cache_respuestas
+from backend.purga import purgador
+
+logger_planificador = logging.getLogger('colegio.planificador')
+
+NOMBRE_CANDADO = 'colegio_planificador'
+
+class CierreTareas:
+    """Pasa a 'cerrada' las tareas activas vencidas, por lotes"""
+    
+    def __init__(self, lote=500):
+        self.lote = lote
+        self.cerradas = 0
+    
+    def cerrar_vencidas(self, conn, detener):
+        """Cierra las tareas con fecha_entrega anterior a hoy; devuelve cuántas cerró.
+        
+        Cada UPDATE recorre como rango el índice idx_tareas_estado_fecha
+        (estado = 'activa' AND fecha_entrega < hoy) y cierra como máximo
+        `lote` tareas en su propia transacción.
+        """
+        cerradas = 0
+        cur = conn.cursor()
+        try:
+            while not detener.is_set():
+                cur.execute("""
+                    UPDATE tareas SET estado = 'cerrada'
+                    WHERE estado = 'activa' AND fecha_entrega < CURDATE()
+                    ORDER BY fecha_entrega
+                    LIMIT %s
+                """, (self.lote,))
+                cantidad = cur.rowcount
+                conn.commit()
+                cerradas += cantidad
+                if cantidad < self.lote:
+                    break
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        
+        if cerradas:
+            self.cerradas += cerradas
+            logger_planificador.info('%s tareas vencidas cerradas', cerradas)
+            # Los demás workers lo ven al vencer su caché (CACHE_RESPUESTAS_TTL_SEGUNDOS)
+            cache_respuestas.invalidar('tareas')
+            cache_respuestas.invalidar('cierre')
+        return cerradas
+    
+    def estadisticas(self):
+        return {'tareas_cerradas': self.cerradas}
+
+def ejecutar_como_lider(conn, funcion):
+    """Ejecuta funcion() solo si obtiene el candado; devuelve None si otro proceso lo tiene"""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK(%s, 0) AS obtenido", (NOMBRE_CANDADO,))
+        if not cur.fetchone()['obtenido']:
+            return None
+        try:
+            return funcion()
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (NOMBRE_CANDADO,))
+            cur.fetchall()
+    finally:
+        cur.close()
+
+class Planificador:
+    """Ejecuta periódicamente los trabajos registrados en un solo worker a la vez"""
+    
+    def __init__(self):
+        self._trabajos = {}
+        self._detener = threading.Event()
+        self._hilo = None
+        self.ciclos = 0
+        self.ciclos_como_lider = 0
+        self.errores = 0
+    
+    def agregar(self, nombre, funcion):
+        """Registra funcion(conn, detener) como trabajo"""
+        self._trabajos[nombre] = funcion
+    
+    def trabajos(self):
+        return list(self._trabajos)
+    
+    def ejecutar(self, conn, nombres=None):
+        """Ejecuta los trabajos indicados (todos por defecto) como líder.
+        
+        Devuelve {nombre: resultado}, o None si otro proceso tiene el candado.
+        El error de un trabajo se registra y no impide ejecutar los siguientes.
+        """
+        def ejecutar_trabajos():
+            resultados = {}
+            for nombre in nombres or self._trabajos:
+                if self._detener.is_set():
+                    break
+                try:
+                    resultados[nombre] = self._trabajos[nombre](conn, self._detener)
+                except Exception as e:
+                    self.errores += 1
+                    logger_planificador.warning('Error en el trabajo %s: %s', nombre, e)
+                    resultados[nombre] = None
+            return resultados
+        
+        self.ciclos += 1
+        resultados = ejecutar_como_lider(conn, ejecutar_trabajos)
+        if resultados is not None:
+            self.ciclos_como_lider += 1
+        return resultados
+    
+    def iniciar(self, parametros, intervalo):
+        """Arranca el hilo que intenta ejecutar los trabajos cada `intervalo` segundos"""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        
+        def ciclo():
+            while not self._detener.wait(intervalo):
+                try:
+                    # Conexión propia: los trabajos no ocupan conexiones del pool
+                    conn = MySQLdb.connect(**parametros)
+                    try:
+                        self.ejecutar(conn)
+                    finally:
+                        conn.close()
+                except Exception as e:
+                    self.errores += 1
+                    logger_planificador.warning('Error en el planificador: %s', e)
+        
+        self._detener.clear()
+        self._hilo = threading.Thread(target=ciclo, name='planificador', daemon=True)
+        self._hilo.start()
+    
+    def detener(self, timeout=None):
+        """Pide al hilo que termine tras el lote en curso y lo espera"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+    
+    def estadisticas(self):
+        return {
+            'ciclos': self.ciclos,
+            'ciclos_como_lider': self.ciclos_como_lider,
+            'errores': self.errores
+        }
+
+cierre_tareas = CierreTareas(lote=Config.CIERRE_LOTE)
+
+planificador = Planificador()
+planificador.agregar('cierre', cierre_tareas.cerrar_vencidas)
+planificador.agregar('purga', purgador.purgar_pendientes)
+
+def main(argv):
+    desconocidos = [n for n in argv if n not in planificador.trabajos()]
+    if desconocidos:
+        print(f"Uso: python -m backend.planificador [{'] ['.join(planificador.trabajos())}]")
+        return 2
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    conn = conectar(Config)
+    try:
+        resultados = planificador.ejecutar(conn, argv)
+    finally:
+        conn.close()
+    
+    if resultados is None:
+        print("Otro proceso está ejecutando los trabajos; intenta más tarde")
+        return 1
+    for nombre, resultado in resultados.items():
+        print(f"{nombre}: {'error' if resultado is None else resultado}")
+    return 1 if None in resultados.values() else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,98 @@
+# ============================================
+# PURGA EN SEGUNDO PLANO DE TAREAS ELIMINADAS
+# ============================================
+#
+# eliminar_tarea solo marca la tarea como 'eliminada' (borrado lógico). El
+# purgador borra después sus entregas en lotes de PURGA_LOTE filas
+# (DELETE ... LIMIT sobre idx_tarea), con una transacción corta por lote y
+# una pausa entre lotes para no bloquear a quienes están calificando, y al
+# final borra la tarea. El avance vive en la base de datos (estado de la
+# tarea y entregas que quedan), así que tras una caída basta volver a
+# ejecutarlo para que continúe donde quedó.
+#
+# Lo ejecuta el planificador (backend/planificador.py), un solo worker a la vez.
+
+import logging
+import time
+from backend.config import Config
+
+logger_purga = logging.getLogger('colegio.purga')
+
+class Purgador:
+    """Borra por lotes las entregas y las filas de las tareas eliminadas"""
+    
+    def __init__(self, lote=200, pausa=0.05):
+        self.lote = lote
+        self.pausa = pausa
+        self.tareas_purgadas = 0
+        self.entregas_borradas = 0
+        self.tarea_actual = None
+        self.pendientes = 0
+    
+    def purgar_tarea(self, conn, tarea_id, detener):
+        """Borra las entregas de la tarea por lotes y luego la tarea.
+        
+        Devuelve False si se pidió detener antes de terminar.
+        """
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT COUNT(*) AS total FROM entregas WHERE tarea_id = %s", (tarea_id,))
+            total = cur.fetchone()['total']
+            conn.commit()
+            self.tarea_actual, self.pendientes = tarea_id, total
+            
+            borradas = 0
+            while True:
+                if detener.is_set():
+                    return False
+                
+                cur.execute("DELETE FROM entregas WHERE tarea_id = %s LIMIT %s",
+                            (tarea_id, self.lote))
+                cantidad = cur.rowcount
+                conn.commit()
+                
+                borradas += cantidad
+                self.entregas_borradas += cantidad
+                self.pendientes = max(total - borradas, 0)
+                logger_purga.info('Tarea %s: %s/%s entregas borradas', tarea_id, borradas, total)
+                
+                if cantidad < self.lote:
+                    break
+                time.sleep(self.pausa)
+            
+            cur.execute("DELETE FROM tareas WHERE id = %s AND estado = 'eliminada'", (tarea_id,))
+            conn.commit()
+            self.tareas_purgadas += 1
+            logger_purga.info('Tarea %s purgada', tarea_id)
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            self.tarea_actual, self.pendientes = None, 0
+    
+    def purgar_pendientes(self, conn, detener):
+        """Purga todas las tareas eliminadas, de la más antigua a la más reciente"""
+        terminadas = 0
+        while not detener.is_set():
+            cur = conn.cursor()
+            cur.execute("SELECT id FROM tareas WHERE estado = 'eliminada' ORDER BY id LIMIT 1")
+            fila = cur.fetchone()
+            cur.close()
+            conn.commit()
+            
+            if not fila or not self.purgar_tarea(conn, fila['id'], detener):
+                break
+            terminadas += 1
+        return terminadas
+    
+    def estadisticas(self):
+        return {
+            'tareas_purgadas': self.tareas_purgadas,
+            'entregas_borradas': self.entregas_borradas,
+            'tarea_actual': self.tarea_actual,
+            'pendientes_tarea_actual': self.pendientes
+        }
+
+purgador = Purgador(lote=Config.PURGA_LOTE, pausa=Config.PURGA_PAUSA_SEGUNDOS)
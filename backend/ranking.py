@@ -0,0 +1,317 @@
+# ============================================
+# RANKING DE ESTUDIANTES EN MEMORIA
+# ============================================
+#
+# promedio_general es DECIMAL(4,2) entre 0 y 20, así que cabe en 2001
+# cubetas (centésimas). Cada ámbito (global, grado, grado + sección) guarda
+# un árbol de Fenwick con la cantidad de estudiantes por cubeta: el puesto
+# de un estudiante se obtiene en O(log cubetas) y el top K en O(K log cubetas),
+# sin recorrer a todos los estudiantes como RANK() OVER en la vista
+# ranking_estudiantes. Cada cubeta guarda a sus empatados ya ordenados por
+# apellidos y nombres, así que un empate grande no se ordena en cada consulta.
+#
+# Igual que la vista, solo entran los estudiantes con promedio_general > 0 y
+# los empates comparten puesto. El índice se reconstruye desde la base de
+# datos al arrancar cada worker y cada RANKING_TTL_SEGUNDOS (para recoger los
+# cambios hechos por otros workers), y se actualiza al calificar.
+
+import threading
+import time
+from bisect import bisect_left, insort
+from decimal import Decimal
+from backend.config import Config
+
+ESCALA = 100
+CUBETAS = 20 * ESCALA + 1
+
+SQL_RANKING = """
+    SELECT e.usuario_id, u.nombres, u.apellidos, e.grado, e.seccion,
+        e.promedio_general, e.tareas_completadas
+    FROM estudiantes e
+    JOIN usuarios u ON e.usuario_id = u.id
+"""
+
+class ArbolFenwick:
+    """Sumas de prefijos con actualización puntual, ambas en O(log n)"""
+    
+    def __init__(self, tamano):
+        self.tamano = tamano
+        self._arbol = [0] * (tamano + 1)
+    
+    @classmethod
+    def desde_conteos(cls, conteos):
+        """Construye el árbol a partir de los conteos por posición en O(n)"""
+        arbol = cls(len(conteos))
+        arbol._arbol[1:] = conteos
+        for i in range(1, arbol.tamano + 1):
+            padre = i + (i & -i)
+            if padre <= arbol.tamano:
+                arbol._arbol[padre] += arbol._arbol[i]
+        return arbol
+    
+    def sumar(self, indice, delta):
+        i = indice + 1
+        while i <= self.tamano:
+            self._arbol[i] += delta
+            i += i & -i
+    
+    def prefijo(self, indice):
+        """Suma de las posiciones 0..indice (0 si indice < 0)"""
+        total, i = 0, indice + 1
+        while i > 0:
+            total += self._arbol[i]
+            i -= i & -i
+        return total
+    
+    def buscar(self, k):
+        """Menor índice cuyo prefijo alcanza k (k >= 1)"""
+        posicion, paso = 0, 1 << self.tamano.bit_length()
+        while paso:
+            siguiente = posicion + paso
+            if siguiente <= self.tamano and self._arbol[siguiente] < k:
+                posicion = siguiente
+                k -= self._arbol[siguiente]
+            paso >>= 1
+        return posicion
+
+class RankingAmbito:
+    """Ranking de un ámbito: las posiciones van del mejor promedio (0) al peor.
+    
+    `miembros` guarda por posición la lista ordenada de las claves
+    (apellidos, nombres, usuario_id) de los empatados.
+    """
+    
+    def __init__(self):
+        self.arbol = ArbolFenwick(CUBETAS)
+        self.miembros = {}
+        self.total = 0
+    
+    @classmethod
+    def desde_miembros(cls, miembros):
+        """Construye el ranking a partir de {posicion: claves}"""
+        ranking = cls()
+        conteos = [0] * CUBETAS
+        for posicion, grupo in miembros.items():
+            grupo.sort()
+            conteos[posicion] = len(grupo)
+        ranking.arbol = ArbolFenwick.desde_conteos(conteos)
+        ranking.miembros = miembros
+        ranking.total = sum(conteos)
+        return ranking
+    
+    def insertar(self, clave, posicion):
+        self.arbol.sumar(posicion, 1)
+        insort(self.miembros.setdefault(posicion, []), clave)
+        self.total += 1
+    
+    def quitar(self, clave, posicion):
+        self.arbol.sumar(posicion, -1)
+        grupo = self.miembros[posicion]
+        del grupo[bisect_left(grupo, clave)]
+        if not grupo:
+            del self.miembros[posicion]
+        self.total -= 1
+    
+    def puesto(self, posicion):
+        """Puesto con empates (como RANK()): 1 + estudiantes con mejor promedio"""
+        return self.arbol.prefijo(posicion - 1) + 1
+    
+    def primeros(self, k):
+        """Genera (puesto, posicion, claves) en orden hasta cubrir k estudiantes"""
+        cubiertos = 0
+        while cubiertos < min(k, self.total):
+            posicion = self.arbol.buscar(cubiertos + 1)
+            grupo = self.miembros[posicion]
+            yield cubiertos + 1, posicion, grupo
+            cubiertos += len(grupo)
+
+class IndiceRanking:
+    """Rankings global, por grado y por sección, actualizables en O(log n)"""
+    
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._reconstruyendo = threading.Lock()
+        self._ambitos = {}
+        self._estudiantes = {}
+        self._durante_reconstruccion = {}
+        self.construido_en = None
+        self.reconstrucciones = 0
+        self.actualizaciones = 0
+    
+    @staticmethod
+    def ambitos_de(estudiante):
+        return [('global',), ('grado', estudiante['grado']),
+                ('seccion', estudiante['grado'], estudiante['seccion'])]
+    
+    @staticmethod
+    def posicion_de(promedio):
+        return CUBETAS - 1 - int(round(Decimal(promedio) * ESCALA))
+    
+    @staticmethod
+    def clave_de(estudiante):
+        """Orden de los empatados dentro de un mismo puesto"""
+        return estudiante['apellidos'], estudiante['nombres'], estudiante['usuario_id']
+    
+    def _insertar(self, fila):
+        if not fila['promedio_general'] or fila['promedio_general'] <= 0:
+            return
+        estudiante = dict(fila, posicion=self.posicion_de(fila['promedio_general']))
+        self._estudiantes[fila['usuario_id']] = estudiante
+        for ambito in self.ambitos_de(estudiante):
+            self._ambitos.setdefault(ambito, RankingAmbito()).insertar(
+                self.clave_de(estudiante), estudiante['posicion'])
+    
+    def _quitar(self, usuario_id):
+        estudiante = self._estudiantes.pop(usuario_id, None)
+        if estudiante is None:
+            return
+        for ambito in self.ambitos_de(estudiante):
+            ranking = self._ambitos[ambito]
+            ranking.quitar(self.clave_de(estudiante), estudiante['posicion'])
+            if not ranking.total:
+                del self._ambitos[ambito]
+    
+    def _vencido(self):
+        return (self.construido_en is None
+                or time.monotonic() - self.construido_en > self.ttl)
+    
+    def reconstruir(self, filas):
+        """Reemplaza el índice por uno construido con las filas de SQL_RANKING.
+        
+        El índice nuevo se arma aparte y se intercambia al final, así que las
+        lecturas no esperan a la reconstrucción.
+        """
+        estudiantes, ambitos = {}, {}
+        for fila in filas:
+            if not fila['promedio_general'] or fila['promedio_general'] <= 0:
+                continue
+            estudiante = dict(fila, posicion=self.posicion_de(fila['promedio_general']))
+            estudiantes[fila['usuario_id']] = estudiante
+            for ambito in self.ambitos_de(estudiante):
+                miembros = ambitos.setdefault(ambito, {})
+                miembros.setdefault(estudiante['posicion'], []).append(self.clave_de(estudiante))
+        
+        # Cada árbol se arma de una vez con los conteos por cubeta
+        for ambito, miembros in ambitos.items():
+            ambitos[ambito] = RankingAmbito.desde_miembros(miembros)
+        
+        with self._lock:
+            self._ambitos, self._estudiantes = ambitos, estudiantes
+            # Reaplicar lo calificado mientras se leía la base de datos
+            for fila in self._durante_reconstruccion.values():
+                self._quitar(fila['usuario_id'])
+                self._insertar(fila)
+            self._durante_reconstruccion = {}
+            self.construido_en = time.monotonic()
+            self.reconstrucciones += 1
+    
+    def reconstruir_desde(self, conn):
+        """Lee todos los estudiantes con promedio y reconstruye el índice"""
+        cur = conn.cursor()
+        cur.execute(SQL_RANKING + " WHERE e.promedio_general > 0")
+        filas = cur.fetchall()
+        cur.close()
+        self.reconstruir(filas)
+    
+    def asegurar(self, conexion):
+        """Reconstruye el índice si nunca se construyó o si venció su TTL.
+        
+        `conexion` devuelve un context manager con una conexión. Solo un hilo
+        reconstruye; mientras tanto los demás siguen leyendo el índice anterior
+        (la primera vez sí esperan).
+        """
+        if not self._vencido():
+            return
+        
+        if not self._reconstruyendo.acquire(blocking=self.construido_en is None):
+            return
+        try:
+            if self._vencido():
+                with conexion() as conn:
+                    self.reconstruir_desde(conn)
+        finally:
+            self._reconstruyendo.release()
+    
+    def actualizar(self, filas):
+        """Aplica los promedios actuales de algunos estudiantes (filas de SQL_RANKING)"""
+        with self._lock:
+            for fila in filas:
+                self._quitar(fila['usuario_id'])
+                self._insertar(fila)
+                if self._reconstruyendo.locked():
+                    self._durante_reconstruccion[fila['usuario_id']] = fila
+                self.actualizaciones += 1
+    
+    def refrescar_estudiantes(self, cur, estudiantes):
+        """Relee de la base de datos el promedio de los estudiantes indicados"""
+        estudiantes = sorted(set(estudiantes))
+        if not estudiantes:
+            return
+        marcadores = ', '.join(['%s'] * len(estudiantes))
+        cur.execute(SQL_RANKING + f" WHERE e.usuario_id IN ({marcadores})", estudiantes)
+        filas = {f['usuario_id']: f for f in cur.fetchall()}
+        
+        # Los que ya no existen salen del ranking
+        self.actualizar([filas.get(e, {'usuario_id': e, 'promedio_general': None})
+                        for e in estudiantes])
+    
+    @staticmethod
+    def _publico(estudiante, puesto):
+        return {
+            'usuario_id': estudiante['usuario_id'],
+            'nombres': estudiante['nombres'],
+            'apellidos': estudiante['apellidos'],
+            'grado': estudiante['grado'],
+            'seccion': estudiante['seccion'],
+            'promedio_general': estudiante['promedio_general'],
+            'tareas_completadas': estudiante['tareas_completadas'],
+            'ranking': puesto
+        }
+    
+    def top(self, ambito, k):
+        """Los k mejores del ámbito: (estudiantes, total, empatados_restantes).
+        
+        Nunca devuelve más de k. Si el último puesto devuelto es un empate que
+        no cabe entero, se devuelven los primeros por apellidos y nombres y
+        `empatados_restantes` cuenta los que quedaron fuera.
+        """
+        with self._lock:
+            ranking = self._ambitos.get(ambito)
+            if ranking is None:
+                return [], 0, 0
+            
+            resultado, restantes = [], 0
+            for puesto, _, grupo in ranking.primeros(k):
+                empatados = grupo[:k - len(resultado)]
+                resultado.extend(self._publico(self._estudiantes[clave[2]], puesto)
+                                for clave in empatados)
+                restantes = len(grupo) - len(empatados)
+            return resultado, ranking.total, restantes
+    
+    def posicion(self, usuario_id):
+        """Puesto del estudiante en cada uno de sus ámbitos, o None si no está rankeado"""
+        with self._lock:
+            estudiante = self._estudiantes.get(usuario_id)
+            if estudiante is None:
+                return None
+            
+            puestos = {}
+            for ambito in self.ambitos_de(estudiante):
+                ranking = self._ambitos[ambito]
+                puestos[ambito[0]] = {
+                    'ranking': ranking.puesto(estudiante['posicion']),
+                    'total': ranking.total
+                }
+            return dict(self._publico(estudiante, puestos['global']['ranking']), puestos=puestos)
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'estudiantes': len(self._estudiantes),
+                'ambitos': len(self._ambitos),
+                'reconstrucciones': self.reconstrucciones,
+                'actualizaciones': self.actualizaciones
+            }
+
+indice_ranking = IndiceRanking(Config.RANKING_TTL_SEGUNDOS)
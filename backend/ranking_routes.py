@@ -0,0 +1,79 @@
+# ============================================
+# RUTAS DE RANKING DE ESTUDIANTES
+# ============================================
+
+from flask import Blueprint, request, jsonify, g
+from backend.seguridad import requiere_token
+from backend.ranking import indice_ranking
+
+def init_ranking_routes(db, app):
+    """Inicializa las rutas de ranking con las dependencias necesarias"""
+    ranking_bp = Blueprint('ranking', __name__)
+    
+    @ranking_bp.route('', methods=['GET'])
+    @requiere_token()
+    def obtener_ranking():
+        """Obtiene los K mejores promedios, global o por grado o sección"""
+        try:
+            alcance = request.args.get('ambito', 'global')
+            grado = request.args.get('grado')
+            seccion = request.args.get('seccion')
+            
+            if alcance == 'global':
+                ambito = ('global',)
+            elif alcance == 'grado' and grado:
+                ambito = ('grado', grado)
+            elif alcance == 'seccion' and grado and seccion:
+                ambito = ('seccion', grado, seccion)
+            else:
+                return jsonify({
+                    'exito': False,
+                    'mensaje': 'ambito debe ser global, grado (con grado) o seccion (con grado y seccion)'
+                }), 400
+            
+            try:
+                limite = int(request.args.get('limite', 10))
+            except ValueError:
+                return jsonify({'exito': False, 'mensaje': 'Límite inválido'}), 400
+            
+            if limite < 1 or limite > app.config['RANKING_MAXIMO']:
+                return jsonify({
+                    'exito': False,
+                    'mensaje': f"El límite debe estar entre 1 y {app.config['RANKING_MAXIMO']}"
+                }), 400
+            
+            indice_ranking.asegurar(db.conexion)
+            ranking, total, empatados_restantes = indice_ranking.top(ambito, limite)
+            
+            return jsonify({
+                'exito': True,
+                'ranking': ranking,
+                'total': total,
+                'empatados_restantes': empatados_restantes
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en obtener_ranking: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
+    @ranking_bp.route('/estudiante/<estudiante_id>', methods=['GET'])
+    @requiere_token()
+    def obtener_puesto_estudiante(estudiante_id):
+        """Obtiene el puesto de un estudiante en los rankings global, de grado y de sección"""
+        try:
+            # Los estudiantes solo pueden consultar su propio puesto
+            if g.usuario['tipo'] == 'estudiante' and g.usuario['usuario_id'] != estudiante_id:
+                return jsonify({'exito': False, 'mensaje': 'No autorizado'}), 403
+            
+            indice_ranking.asegurar(db.conexion)
+            posicion = indice_ranking.posicion(estudiante_id)
+            if posicion is None:
+                return jsonify({'exito': False, 'mensaje': 'El estudiante aún no tiene promedio'}), 404
+            
+            return jsonify({'exito': True, 'estudiante': posicion}), 200
+            
+        except Exception as e:
+            print(f"Error en obtener_puesto_estudiante: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+    
+    return ranking_bp
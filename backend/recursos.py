@@ -0,0 +1,293 @@
+# ============================================
+# RECURSOS ESTÁTICOS (HUELLA, MINIFICADO Y PRECOMPRESIÓN)
+# ============================================
+#
+# Uso: python -m backend.recursos [--destino DIR]
+#
+# Genera en RECURSOS_DIRECTORIO una copia del frontend lista para servir:
+#
+#   1. CSS y JS se minifican de forma conservadora (sin comentarios ni
+#      sangría) y, como las imágenes, se copian con el hash del contenido en
+#      el nombre: styles/style.css -> styles/style.1a2b3c4d5e.css.
+#   2. Las referencias href/src de los HTML y url() de los CSS se reescriben
+#      a esos nombres. Los HTML conservan su ruta.
+#   3. Los archivos de texto se comprimen una sola vez con gzip (y brotli si
+#      el paquete está instalado): .gz y .br junto al original.
+#   4. Si Pillow está instalado, los <img> de images/ pasan a los derivados
+#      responsivos de backend/imagenes.py (srcset por ancho, formato por Accept).
+#   5. manifest.json lista cada archivo con su tipo, si es inmutable y sus
+#      variantes comprimidas, para backend/recursos_routes.py o un proxy.
+#
+# Un archivo con huella no cambia nunca: se sirve con Cache-Control
+# immutable por un año y la próxima versión tendrá otro nombre. Los HTML
+# se revalidan en cada visita (no-cache + ETag), así que una visita
+# repetida solo transfiere respuestas 304.
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from backend.config import Config, RAIZ_PROYECTO
+from backend.imagenes import CatalogoImagenes
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli solo se generan variantes gzip
+    brotli = None
+
+DIRECTORIOS_RECURSOS = ('images', 'styles', 'javascript')
+DIRECTORIOS_PAGINAS = ('.', 'pages')
+COMPRIMIBLES = ('.css', '.js', '.html', '.svg', '.json', '.txt')
+EXTENSIONES_CODIFICACION = {'br': '.br', 'gzip': '.gz'}
+MANIFIESTO = 'manifest.json'
+LONGITUD_HUELLA = 10
+
+# Cadenas entre comillas (se respetan) o comentarios /* */ (se eliminan)
+_CADENA_O_COMENTARIO = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+_REFERENCIA_HTML = re.compile(r'(\b(?:href|src)\s*=\s*)(["\'])([^"\']*)\2()', re.I)
+_REFERENCIA_CSS = re.compile(r'(url\(\s*)(["\']?)([^"\')]*)\2(\s*\))', re.I)
+_ETIQUETA_IMG = re.compile(r'<img\b[^>]*>', re.I)
+_ATRIBUTO = re.compile(r'\s([a-z-]+)\s*=\s*(["\'])(.*?)\2', re.I | re.S)
+
+def minificar_css(texto):
+    """Quita comentarios y espacios sobrantes sin tocar las cadenas"""
+    partes = []
+    for fragmento in re.split(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')',
+                            _CADENA_O_COMENTARIO.sub(lambda m: m.group(1) or ' ', texto)):
+        if fragmento[:1] in ('"', "'"):
+            partes.append(fragmento)
+        else:
+            fragmento = re.sub(r'\s+', ' ', fragmento)
+            fragmento = re.sub(r'\s*([{};,])\s*', r'\1', fragmento)
+            partes.append(re.sub(r':\s+', ':', fragmento))
+    return ''.join(partes).replace(';}', '}').strip()
+
+def minificar_js(texto):
+    """Quita sangría, líneas vacías y comentarios de línea completa.
+    
+    No une líneas ni toca el interior de las sentencias, para no depender
+    de la inserción automática de punto y coma ni de las expresiones
+    regulares literales; el resto lo gana la compresión.
+    """
+    lineas, en_comentario = [], False
+    for linea in texto.splitlines():
+        linea = linea.strip()
+        if en_comentario:
+            en_comentario = '*/' not in linea
+            continue
+        if linea.startswith('/*'):
+            en_comentario = '*/' not in linea
+            continue
+        if linea and not linea.startswith('//'):
+            lineas.append(linea)
+    return '\n'.join(lineas) + '\n'
+
+def _resolver(referencia, origen):
+    """Ruta relativa a la raíz de una referencia, o None si es externa"""
+    if not referencia or re.match(r'^(?:[a-z][a-z0-9+.-]*:|//|#)', referencia, re.I):
+        return None
+    ruta = re.split(r'[?#]', referencia, maxsplit=1)[0]
+    if ruta.startswith('/'):
+        return posixpath.normpath(ruta.lstrip('/'))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(origen), ruta))
+
+def reescribir(texto, origen, huellas, patron):
+    """Cambia las referencias a recursos conocidos por su ruta absoluta con huella"""
+    def cambiar(m):
+        ruta = _resolver(m.group(3), origen)
+        if ruta not in huellas:
+            return m.group(0)
+        sufijo = m.group(3)[len(re.split(r'[?#]', m.group(3), maxsplit=1)[0]):]
+        return m.group(1) + m.group(2) + '/' + huellas[ruta] + sufijo + m.group(2) + m.group(4)
+    return patron.sub(cambiar, texto)
+
+def agregar_srcset(texto, origen, imagenes, prefijo):
+    """Apunta los <img> de imágenes del catálogo a sus derivados responsivos.
+    
+    Agrega srcset, width, height y sizes (100vw si el HTML no lo indica);
+    los <img> que ya tienen srcset no se tocan.
+    """
+    def cambiar(m):
+        etiqueta = m.group(0)
+        atributos = {nombre.lower(): valor for nombre, _, valor in _ATRIBUTO.findall(etiqueta)}
+        ruta = _resolver(atributos.get('src', ''), origen) or ''
+        nombre = ruta[len(prefijo):] if ruta.startswith(prefijo) else None
+        if 'srcset' in atributos or nombre not in imagenes.imagenes:
+            return etiqueta
+        nuevos = {clave: valor for clave, valor in imagenes.atributos(nombre).items()
+                if clave == 'src' or clave not in atributos}
+        if 'sizes' not in atributos:
+            nuevos['sizes'] = '100vw'
+        sin_src = re.sub(r'\ssrc\s*=\s*(["\']).*?\1', '', etiqueta, count=1, flags=re.I | re.S)
+        return '<img' + ''.join(f' {clave}="{valor}"' for clave, valor in nuevos.items()) + sin_src[4:]
+    return _ETIQUETA_IMG.sub(cambiar, texto)
+
+def con_huella(ruta, contenido):
+    base, extension = posixpath.splitext(ruta)
+    return f'{base}.{hashlib.sha256(contenido).hexdigest()[:LONGITUD_HUELLA]}{extension}'
+
+def comprimir(contenido):
+    """Variantes comprimidas que resultan más chicas que el original"""
+    variantes = {}
+    if brotli is not None:
+        variantes['br'] = brotli.compress(contenido, quality=11)
+    variantes['gzip'] = gzip.compress(contenido, compresslevel=9, mtime=0)
+    return {c: datos for c, datos in variantes.items() if len(datos) < len(contenido)}
+
+class ConstructorRecursos:
+    """Construye el directorio de recursos y su manifiesto"""
+    
+    def __init__(self, origen=RAIZ_PROYECTO, destino=None, imagenes=None):
+        self.origen = origen
+        self.destino = destino or Config.RECURSOS_DIRECTORIO
+        self.imagenes = imagenes  # CatalogoImagenes para los srcset, o None
+        self.huellas = {}
+        self.archivos = {}
+        self.bytes_originales = 0
+    
+    def _listar(self, directorio, recursivo=True):
+        base = os.path.join(self.origen, directorio)
+        if not os.path.isdir(base):
+            return []
+        if not recursivo:
+            return sorted(posixpath.normpath(posixpath.join(directorio, n)) for n in os.listdir(base)
+                        if os.path.isfile(os.path.join(base, n)))
+        rutas = []
+        for carpeta, _, nombres in os.walk(base):
+            relativa = os.path.relpath(carpeta, self.origen).replace(os.sep, '/')
+            rutas.extend(posixpath.join(relativa, n) for n in nombres)
+        return sorted(rutas)
+    
+    def _leer(self, ruta):
+        with open(os.path.join(self.origen, ruta), 'rb') as archivo:
+            contenido = archivo.read()
+        self.bytes_originales += len(contenido)
+        return contenido
+    
+    def _escribir(self, ruta, contenido, inmutable):
+        extension = posixpath.splitext(ruta)[1].lower()
+        variantes = comprimir(contenido) if extension in COMPRIMIBLES else {}
+        destino = os.path.join(self.destino, *ruta.split('/'))
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, 'wb') as archivo:
+            archivo.write(contenido)
+        for codificacion, datos in variantes.items():
+            with open(destino + EXTENSIONES_CODIFICACION[codificacion], 'wb') as archivo:
+                archivo.write(datos)
+        self.archivos[ruta] = {
+            'tipo': mimetypes.guess_type(ruta)[0] or 'application/octet-stream',
+            'inmutable': inmutable,
+            'bytes': len(contenido),
+            'codificaciones': {c: len(d) for c, d in variantes.items()}
+        }
+    
+    def _agregar_recurso(self, ruta, contenido):
+        destino = con_huella(ruta, contenido)
+        self.huellas[ruta] = destino
+        self._escribir(destino, contenido, inmutable=True)
+    
+    def construir(self):
+        """Regenera el directorio destino y devuelve el manifiesto"""
+        if os.path.isdir(self.destino):
+            shutil.rmtree(self.destino)
+        os.makedirs(self.destino)
+        
+        # Primero lo que otros archivos referencian: imágenes, luego CSS y JS
+        por_tipo = {'.css': [], '.js': [], 'otros': []}
+        for directorio in DIRECTORIOS_RECURSOS:
+            for ruta in self._listar(directorio):
+                extension = posixpath.splitext(ruta)[1].lower()
+                por_tipo.get(extension, por_tipo['otros']).append(ruta)
+        for ruta in por_tipo['otros']:
+            self._agregar_recurso(ruta, self._leer(ruta))
+        for ruta in por_tipo['.css']:
+            texto = reescribir(self._leer(ruta).decode('utf-8'), ruta, self.huellas, _REFERENCIA_CSS)
+            self._agregar_recurso(ruta, minificar_css(texto).encode('utf-8'))
+        for ruta in por_tipo['.js']:
+            self._agregar_recurso(ruta, minificar_js(self._leer(ruta).decode('utf-8')).encode('utf-8'))
+        
+        for directorio in DIRECTORIOS_PAGINAS:
+            for ruta in self._listar(directorio, recursivo=False):
+                if ruta.endswith('.html'):
+                    texto = self._leer(ruta).decode('utf-8')
+                    if self.imagenes is not None:
+                        prefijo = os.path.relpath(self.imagenes.directorio, self.origen).replace(os.sep, '/')
+                        texto = agregar_srcset(texto, ruta, self.imagenes, prefijo + '/')
+                    texto = reescribir(texto, ruta, self.huellas, _REFERENCIA_HTML)
+                    self._escribir(ruta, texto.encode('utf-8'), inmutable=False)
+        
+        manifiesto = {'recursos': self.huellas, 'archivos': self.archivos}
+        with open(os.path.join(self.destino, MANIFIESTO), 'w', encoding='utf-8') as archivo:
+            json.dump(manifiesto, archivo, indent=2, sort_keys=True)
+        return manifiesto
+    
+    def resumen(self):
+        return {
+            'archivos': len(self.archivos),
+            'bytes_originales': self.bytes_originales,
+            'bytes': sum(a['bytes'] for a in self.archivos.values()),
+            **{f'bytes_{c}': sum(a['codificaciones'].get(c, a['bytes']) for a in self.archivos.values())
+                for c in EXTENSIONES_CODIFICACION if c != 'br' or brotli is not None}
+        }
+
+class CatalogoRecursos:
+    """Manifiesto cargado en memoria para servir los recursos construidos"""
+    
+    def __init__(self, directorio, archivos):
+        self.directorio = directorio
+        self.archivos = archivos
+        self.servidos = {'identidad': 0, **{c: 0 for c in EXTENSIONES_CODIFICACION}}
+    
+    @classmethod
+    def cargar(cls, directorio):
+        """Devuelve el catálogo o None si los recursos no se construyeron"""
+        try:
+            with open(os.path.join(directorio, MANIFIESTO), encoding='utf-8') as archivo:
+                return cls(directorio, json.load(archivo)['archivos'])
+        except FileNotFoundError:
+            return None
+    
+    def raices(self):
+        """Primer segmento de cada ruta: directorios y archivos de la raíz"""
+        return sorted({ruta.split('/', 1)[0] + ('/' if '/' in ruta else '') for ruta in self.archivos})
+    
+    def elegir_codificacion(self, ruta, aceptadas):
+        """Variante precomprimida preferida por el cliente (Accept-Encoding), o None"""
+        disponibles = self.archivos[ruta]['codificaciones']
+        calidad, elegida = max(((aceptadas.quality(c), c) for c in EXTENSIONES_CODIFICACION
+                                if c in disponibles), default=(0, None))
+        elegida = elegida if calidad > 0 else None
+        self.servidos[elegida or 'identidad'] += 1
+        return elegida
+    
+    def estadisticas(self):
+        return {
+            'archivos': len(self.archivos),
+            **{f'servidos_{c}': n for c, n in self.servidos.items()}
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Construye los recursos estáticos del frontend')
+    parser.add_argument('--destino', default=Config.RECURSOS_DIRECTORIO)
+    args = parser.parse_args()
+    
+    imagenes = CatalogoImagenes.cargar()
+    constructor = ConstructorRecursos(destino=args.destino, imagenes=imagenes)
+    constructor.construir()
+    resumen = constructor.resumen()
+    print(f"{resumen['archivos']} archivos en {constructor.destino}")
+    for clave, valor in resumen.items():
+        if clave.startswith('bytes'):
+            print(f"  {clave:<18} {valor:>10}")
+    if brotli is None:
+        print("  (instalar el paquete brotli para generar también variantes .br)")
+    if imagenes is None:
+        print("  (instalar Pillow para agregar srcset con los derivados de las imágenes)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# ============================================
+# RUTAS DE LOS RECURSOS ESTÁTICOS DEL FRONTEND
+# ============================================
+#
+# Sirve el directorio generado por `python -m backend.recursos`. Solo se
+# registran las rutas que aparecen en el manifiesto (sin comodín que tape
+# los 404 de la API). Si el cliente acepta br o gzip se envía la variante
+# precomprimida, sin comprimir nada por petición.
+
+from flask import Blueprint, abort, request, send_from_directory
+from backend.recursos import EXTENSIONES_CODIFICACION
+
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+def init_recursos_routes(catalogo, app):
+    """Inicializa las rutas de los recursos estáticos a partir del catálogo"""
+    recursos_bp = Blueprint('recursos', __name__)
+
+    def servir_recurso(resto, prefijo=''):
+        """Envía un archivo construido con su variante comprimida y su política de caché"""
+        ruta = prefijo + resto
+        archivo = catalogo.archivos.get(ruta)
+        if archivo is None:
+            abort(404)
+        
+        codificacion = catalogo.elegir_codificacion(ruta, request.accept_encodings)
+        nombre = ruta + EXTENSIONES_CODIFICACION[codificacion] if codificacion else ruta
+        respuesta = send_from_directory(catalogo.directorio, nombre, mimetype=archivo['tipo'],
+                                        conditional=True, etag=True)
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        if archivo['codificaciones']:
+            respuesta.vary.add('Accept-Encoding')
+        respuesta.headers['Cache-Control'] = CACHE_INMUTABLE if archivo['inmutable'] else CACHE_REVALIDAR
+        return respuesta
+    
+    # Una regla por directorio del manifiesto y una por archivo de la raíz
+    for raiz in catalogo.raices():
+        if raiz.endswith('/'):
+            recursos_bp.add_url_rule(f'/{raiz}<path:resto>', 'servir_recurso', servir_recurso,
+                                    defaults={'prefijo': raiz}, methods=['GET'])
+        else:
+            recursos_bp.add_url_rule(f'/{raiz}', 'servir_recurso', servir_recurso,
+                                    defaults={'resto': raiz}, methods=['GET'])
+    if 'index.html' in catalogo.archivos:
+        # Endpoint propio: con el mismo endpoint Werkzeug redirigiría / a /index.html
+        recursos_bp.add_url_rule('/', 'servir_inicio', lambda: servir_recurso('index.html'),
+                                methods=['GET'])
+    
+    return recursos_bp
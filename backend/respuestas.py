@@ -0,0 +1,248 @@
+# ============================================
+# CODIFICACIÓN DE RESPUESTAS: JSON RÁPIDO Y COMPRESIÓN
+# ============================================
+#
+# Todas las respuestas de la API pasan por aquí:
+#
+#   1. jsonify() usa ProveedorJSON, que serializa con orjson (o con json si
+#      no está instalado) y convierte directamente los tipos que devuelve
+#      MySQLdb: Decimal como número y date/datetime en ISO 8601.
+#   2. CompresorRespuestas comprime con br o gzip, según Accept-Encoding,
+#      los cuerpos JSON/CSV de al menos COMPRESION_MINIMO_BYTES. Los
+#      listados NDJSON y las exportaciones se comprimen a medida que se
+#      transmiten.
+
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from flask import request
+from flask.json.provider import JSONProvider
+from backend.config import Config
+
+try:
+    import orjson
+except ImportError:  # Opcional: sin orjson se usa el módulo json
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli solo se comprime con gzip
+    brotli = None
+
+# Tipos que se comprimen; los streams SSE y los xlsx (ya son zip) quedan fuera
+TIPOS_COMPRIMIBLES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+def _convertir(valor):
+    """Tipos de las filas de MySQLdb que JSON no conoce"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (date, datetime, time)):
+        return valor.isoformat()
+    if isinstance(valor, timedelta):
+        return str(valor)
+    raise TypeError(f'Tipo no serializable en JSON: {type(valor).__name__}')
+
+def _codificar_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_convertir).encode('utf-8')
+
+def _codificar_orjson(obj):
+    # orjson ya escribe date/datetime en ISO 8601; solo Decimal y timedelta pasan por _convertir
+    return orjson.dumps(obj, default=_convertir, option=orjson.OPT_NON_STR_KEYS)
+
+CODIFICADORES = {'json': _codificar_json}
+if orjson is not None:
+    CODIFICADORES['orjson'] = _codificar_orjson
+
+def elegir_codificador(nombre):
+    """Codificador configurado, o json si no está disponible"""
+    return CODIFICADORES.get(nombre, _codificar_json)
+
+class ProveedorJSON(JSONProvider):
+    """Proveedor JSON de Flask (jsonify, request.get_json) sin claves ordenadas ni indentación"""
+    
+    mimetype = 'application/json'
+    
+    def __init__(self, app, codificador=None):
+        super().__init__(app)
+        self.codificar = codificador or elegir_codificador(app.config.get('JSON_CODIFICADOR'))
+    
+    def dumps(self, obj, **kwargs):
+        return self.codificar(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if orjson is not None else json.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.codificar(obj) + b'\n', mimetype=self.mimetype)
+
+class CompresorRespuestas:
+    """Compresión negociada (br/gzip) de las respuestas de la API.
+    
+    Las respuestas de la caché (con ETag) guardan su variante comprimida,
+    así un acierto no vuelve a comprimir. El ETag de la variante lleva la
+    codificación como sufijo ("<etag>-gzip").
+    """
+    
+    def __init__(self, minimo=1024, nivel_gzip=6, calidad_brotli=4, variantes=256):
+        self.minimo = minimo
+        self.nivel_gzip = nivel_gzip
+        self.calidad_brotli = calidad_brotli
+        self.capacidad = variantes
+        self.codificaciones = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._variantes = OrderedDict()
+        self._lock = threading.Lock()
+        self.comprimidas = {c: 0 for c in self.codificaciones}
+        self.flujos = 0
+        self.reutilizadas = 0
+        self.bytes_originales = 0
+        self.bytes_enviados = 0
+    
+    def negociar(self, aceptadas):
+        """Codificación preferida por el cliente (br ante un empate), o None"""
+        calidad, elegida = max(((aceptadas.quality(c), c) for c in self.codificaciones),
+                            key=lambda opcion: opcion[0])
+        return elegida if calidad > 0 else None
+    
+    def comprimir(self, datos, codificacion):
+        if codificacion == 'br':
+            return brotli.compress(datos, quality=self.calidad_brotli)
+        return zlib.compress(datos, self.nivel_gzip, wbits=31)
+    
+    def _compresor(self, codificacion):
+        """(alimentar, terminar) de un compresor incremental"""
+        if codificacion == 'br':
+            compresor = brotli.Compressor(quality=self.calidad_brotli)
+            return compresor.process, compresor.finish
+        compresor = zlib.compressobj(self.nivel_gzip, zlib.DEFLATED, 31)
+        return compresor.compress, compresor.flush
+    
+    def _comprimir_flujo(self, trozos, codificacion):
+        """Comprime un cuerpo en streaming; cierra el iterable original al terminar"""
+        alimentar, terminar = self._compresor(codificacion)
+        originales = enviados = 0
+        try:
+            for trozo in trozos:
+                if isinstance(trozo, str):
+                    trozo = trozo.encode('utf-8')
+                originales += len(trozo)
+                salida = alimentar(trozo)
+                if salida:
+                    enviados += len(salida)
+                    yield salida
+            salida = terminar()
+            enviados += len(salida)
+            yield salida
+        finally:
+            cerrar = getattr(trozos, 'close', None)
+            if cerrar is not None:
+                cerrar()
+            self._contar(codificacion, originales, enviados)
+    
+    def _variante(self, etag, codificacion, datos):
+        """Variante comprimida de una respuesta con ETag, reutilizada entre peticiones"""
+        clave = (etag, codificacion)
+        with self._lock:
+            comprimido = self._variantes.get(clave)
+            if comprimido is not None:
+                self._variantes.move_to_end(clave)
+                self.reutilizadas += 1
+                return comprimido
+        
+        comprimido = self.comprimir(datos, codificacion)
+        if self.capacidad > 0:
+            with self._lock:
+                self._variantes[clave] = comprimido
+                while len(self._variantes) > self.capacidad:
+                    self._variantes.popitem(last=False)
+        return comprimido
+    
+    def _contar(self, codificacion, originales, enviados):
+        with self._lock:
+            self.comprimidas[codificacion] += 1
+            self.bytes_originales += originales
+            self.bytes_enviados += enviados
+    
+    def _etag_no_modificada(self, respuesta, aceptadas):
+        """Un 304 lleva el ETag de la variante que recibiría el cliente con un 200.
+        
+        La variante se decide como en procesar(), con la codificación negociada
+        y el tamaño del cuerpo en caché (`tamano_cuerpo`, que pone
+        respuesta_cacheada), no con que siga o no en el LRU de variantes.
+        """
+        etag, debil = respuesta.get_etag()
+        tamano = getattr(respuesta, 'tamano_cuerpo', None)
+        if not etag or tamano is None or tamano < self.minimo:
+            return respuesta
+        
+        respuesta.vary.add('Accept-Encoding')
+        codificacion = self.negociar(aceptadas)
+        if codificacion:
+            respuesta.set_etag(f'{etag}-{codificacion}', debil)
+        return respuesta
+    
+    def procesar(self, respuesta, aceptadas):
+        """Comprime la respuesta si el tipo, el tamaño y el cliente lo permiten"""
+        if respuesta.status_code == 304:
+            return self._etag_no_modificada(respuesta, aceptadas)
+        if (respuesta.mimetype not in TIPOS_COMPRIMIBLES or respuesta.direct_passthrough
+                or 'Content-Encoding' in respuesta.headers or respuesta.status_code == 204):
+            return respuesta
+        
+        if respuesta.is_streamed:
+            respuesta.vary.add('Accept-Encoding')
+            codificacion = self.negociar(aceptadas)
+            if codificacion:
+                respuesta.response = self._comprimir_flujo(respuesta.response, codificacion)
+                respuesta.headers.pop('Content-Length', None)
+                respuesta.headers['Content-Encoding'] = codificacion
+                with self._lock:
+                    self.flujos += 1
+            return respuesta
+        
+        datos = respuesta.get_data()
+        if len(datos) < self.minimo:
+            return respuesta
+        
+        respuesta.vary.add('Accept-Encoding')
+        codificacion = self.negociar(aceptadas)
+        if not codificacion:
+            return respuesta
+        
+        etag, debil = respuesta.get_etag()
+        if etag:
+            comprimido = self._variante(etag, codificacion, datos)
+            respuesta.set_etag(f'{etag}-{codificacion}', debil)
+        else:
+            comprimido = self.comprimir(datos, codificacion)
+        respuesta.set_data(comprimido)
+        respuesta.headers['Content-Encoding'] = codificacion
+        self._contar(codificacion, len(datos), len(comprimido))
+        return respuesta
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                **{f'comprimidas_{c}': n for c, n in self.comprimidas.items()},
+                'flujos': self.flujos,
+                'variantes': len(self._variantes),
+                'reutilizadas': self.reutilizadas,
+                'bytes_originales': self.bytes_originales,
+                'bytes_enviados': self.bytes_enviados,
+                'proporcion': round(self.bytes_enviados / self.bytes_originales, 4)
+                            if self.bytes_originales else 0
+            }
+
+compresor_respuestas = CompresorRespuestas(Config.COMPRESION_MINIMO_BYTES, Config.COMPRESION_NIVEL_GZIP,
+                                        Config.COMPRESION_CALIDAD_BROTLI, Config.COMPRESION_VARIANTES)
+
+def init_respuestas(app):
+    """Instala el proveedor JSON y la compresión de respuestas en la aplicación"""
+    app.json = ProveedorJSON(app)
+    
+    @app.after_request
+    def comprimir_respuesta(respuesta):
+        return compresor_respuestas.procesar(respuesta, request.accept_encodings)
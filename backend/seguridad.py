@@ -0,0 +1,125 @@
+# ============================================
+# SEGURIDAD: DECORADOR DE AUTENTICACIÓN
+# ============================================
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify, g, current_app
+from backend.config import Config
+from backend.utils import verificar_token
+
+class CacheTokens:
+    """Caché LRU acotada de tokens JWT ya verificados.
+    
+    Evita repetir jwt.decode y la verificación HMAC en cada petición cuando
+    el mismo token se usa una y otra vez. Cada entrada caduca con el 'exp'
+    del propio token.
+    """
+    
+    def __init__(self, capacidad=1024):
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+    
+    def obtener(self, token):
+        """Devuelve el payload cacheado del token o None"""
+        with self._lock:
+            payload = self._entradas.get(token)
+            if payload is None:
+                self.fallos += 1
+                return None
+            
+            if payload['exp'] <= time.time():
+                # El token expiró: se expulsa y se trata como fallo
+                del self._entradas[token]
+                self.expulsiones += 1
+                self.fallos += 1
+                return None
+            
+            self._entradas.move_to_end(token)
+            self.aciertos += 1
+            return payload
+    
+    def guardar(self, token, payload):
+        """Guarda un payload ya verificado, expulsando el menos usado si está llena"""
+        if self.capacidad <= 0 or 'exp' not in payload:
+            return
+        
+        with self._lock:
+            self._entradas[token] = payload
+            self._entradas.move_to_end(token)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.expulsiones += 1
+    
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores"""
+        with self._lock:
+            self._entradas.clear()
+            self.aciertos = self.fallos = self.expulsiones = 0
+    
+    def estadisticas(self):
+        """Devuelve los contadores de la caché"""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'capacidad': self.capacidad,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0
+            }
+
+cache_tokens = CacheTokens(Config.TOKEN_CACHE_CAPACIDAD)
+
+def verificar_token_cacheado(token, secret_key):
+    """Verifica el token consultando primero la caché de tokens verificados"""
+    payload = cache_tokens.obtener(token)
+    if payload is not None:
+        return payload
+    
+    payload = verificar_token(token, secret_key)
+    if payload:
+        cache_tokens.guardar(token, payload)
+    return payload
+
+def requiere_token(tipo=None, desde_query=False):
+    """Exige un token válido (y opcionalmente de un tipo de usuario).
+    
+    El payload verificado queda disponible en flask.g.usuario. Con
+    `desde_query` también se acepta en `?token=`, para clientes que no pueden
+    enviar cabeceras (EventSource), pero solo un token de stream
+    (generar_token_stream): el token de sesión nunca debe ir en una URL. A
+    la inversa, un token de stream no sirve en la cabecera Authorization.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            token = request.headers.get('Authorization')
+            alcance = None
+            if not token and desde_query:
+                token = request.args.get('token')
+                alcance = 'stream'
+            if not token:
+                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
+            
+            payload = verificar_token_cacheado(token.replace('Bearer ', ''),
+                                            current_app.config['SECRET_KEY'])
+            if payload and payload.get('alcance') != alcance:
+                payload = None
+            if tipo:
+                if not payload or payload['tipo'] != tipo:
+                    return jsonify({'exito': False, 'mensaje': 'No autorizado'}), 403
+            elif not payload:
+                return jsonify({'exito': False, 'mensaje': 'Token inválido'}), 401
+            
+            g.usuario = payload
+            return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
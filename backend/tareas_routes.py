@@ -2,41 +2,61 @@
 # RUTAS DE TAREAS (PROFESORES)
 # ============================================
 
-from flask import Blueprint, request, jsonify
-from backend.utils import verificar_token
+from flask import Blueprint, request, jsonify, g
+from backend.seguridad import requiere_token
+from backend.cache import cache_respuestas, respuesta_cacheada
+from backend.eventos import canal_eventos
+from backend.busqueda import leer_filtros, sql_busqueda
+from backend.paginacion import (
+    leer_paginacion, condicion_keyset, separar_pagina, respuesta_ndjson
+)
 
-tareas_bp = Blueprint('tareas', __name__)
+# Columnas de la tarea en los listados: solo las que se muestran, no t.*
+COLUMNAS_TAREA = 't.id, t.titulo, t.descripcion, t.curso, t.tipo, t.fecha_entrega, t.puntos'
 
-def init_tareas_routes(mysql, app):
+# Estados que se consultan en el archivo (las tareas vencidas las cierra el planificador)
+ESTADOS_ARCHIVO = ('cerrada', 'archivada')
+
+def leer_estado_archivo(args):
+    """Estado a consultar en el archivo (por defecto 'cerrada'); lanza ValueError si no es válido"""
+    estado = args.get('estado', 'cerrada')
+    if estado not in ESTADOS_ARCHIVO:
+        raise ValueError(f"Estado inválido, debe ser uno de: {', '.join(ESTADOS_ARCHIVO)}")
+    return estado
+
+def init_tareas_routes(db, app):
     """Inicializa las rutas de tareas con las dependencias necesarias"""
+    tareas_bp = Blueprint('tareas', __name__)
     
     @tareas_bp.route('', methods=['POST'])
+    @requiere_token(tipo='profesor')
     def crear_tarea():
         """Crea una nueva tarea"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
-            
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload or payload['tipo'] != 'profesor':
-                return jsonify({'exito': False, 'mensaje': 'No autorizado'}), 403
-            
             datos = request.get_json()
             
-            cur = mysql.connection.cursor()
+            cur = db.connection.cursor()
             cur.execute("""
                 INSERT INTO tareas (titulo, descripcion, curso, tipo, fecha_entrega, 
                                 puntos, profesor_id, estado)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, 'activa')
             """, (datos['titulo'], datos['descripcion'], datos['curso'],
                 datos.get('tipo', 'tarea'), datos['fechaEntrega'], 
-                datos.get('puntos', 20), payload['usuario_id']))
+                datos.get('puntos', 20), g.usuario['usuario_id']))
             
-            mysql.connection.commit()
+            db.connection.commit()
             tarea_id = cur.lastrowid
             cur.close()
             
+            cache_respuestas.invalidar('tareas')
+            cache_respuestas.invalidar('profesor', g.usuario['usuario_id'])
+            canal_eventos.publicar_a_tipo('estudiante', {
+                'tipo': 'tarea',
+                'tarea_id': tarea_id,
+                'titulo': datos['titulo'],
+                'curso': datos['curso']
+            })
+            
             return jsonify({
                 'exito': True,
                 'tarea_id': tarea_id,
@@ -48,28 +68,22 @@ def init_tareas_routes(mysql, app):
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
 
     @tareas_bp.route('/profesor', methods=['GET'])
+    @requiere_token()
+    @respuesta_cacheada(lambda usuario: [('profesor', usuario['usuario_id']), ('cierre',)])
     def obtener_tareas_profesor():
-        """Obtiene todas las tareas de un profesor"""
+        """Obtiene las tareas activas de un profesor (las cerradas están en /profesor/archivo)"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
-            
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload:
-                return jsonify({'exito': False, 'mensaje': 'Token inválido'}), 401
-            
-            cur = mysql.connection.cursor()
-            cur.execute("""
-                SELECT t.*, 
+            cur = db.connection.cursor()
+            cur.execute(f"""
+                SELECT {COLUMNAS_TAREA},
                     COUNT(e.id) as total_entregas,
                     COUNT(CASE WHEN e.nota IS NOT NULL THEN 1 END) as calificadas
                 FROM tareas t
                 LEFT JOIN entregas e ON t.id = e.tarea_id
-                WHERE t.profesor_id = %s
+                WHERE t.profesor_id = %s AND t.estado = 'activa'
                 GROUP BY t.id
                 ORDER BY t.fecha_creacion DESC
-            """, (payload['usuario_id'],))
+            """, (g.usuario['usuario_id'],))
             
             tareas = cur.fetchall()
             cur.close()
@@ -80,32 +94,109 @@ def init_tareas_routes(mysql, app):
             print(f"Error en obtener_tareas_profesor: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
 
-    @tareas_bp.route('/<int:tarea_id>', methods=['DELETE'])
-    def eliminar_tarea(tarea_id):
-        """Elimina una tarea"""
+    @tareas_bp.route('/profesor/archivo', methods=['GET'])
+    @requiere_token(tipo='profesor')
+    def obtener_archivo_profesor():
+        """Obtiene las tareas cerradas del profesor, de la más reciente a la más antigua"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
+            try:
+                limite, despues_de = leer_paginacion(request.args, 2)
+                estado = leer_estado_archivo(request.args)
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
             
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload or payload['tipo'] != 'profesor':
-                return jsonify({'exito': False, 'mensaje': 'No autorizado'}), 403
+            condicion, parametros = '', [g.usuario['usuario_id'], estado]
+            if despues_de:
+                condicion, valores = condicion_keyset(['t.fecha_entrega', 't.id'], despues_de,
+                                                    descendente=True)
+                condicion = 'AND ' + condicion
+                parametros += valores
             
-            cur = mysql.connection.cursor()
+            # Rango sobre idx_tareas_profesor_estado_fecha; los conteos solo para la página
+            cur = db.connection.cursor()
+            cur.execute(f"""
+                SELECT {COLUMNAS_TAREA},
+                    (SELECT COUNT(*) FROM entregas e WHERE e.tarea_id = t.id) as total_entregas,
+                    (SELECT COUNT(e.nota) FROM entregas e WHERE e.tarea_id = t.id) as calificadas
+                FROM tareas t
+                WHERE t.profesor_id = %s AND t.estado = %s {condicion}
+                ORDER BY t.fecha_entrega DESC, t.id DESC
+                LIMIT %s
+            """, parametros + [limite + 1])
+            tareas, siguiente = separar_pagina(cur.fetchall(), limite, ('fecha_entrega', 'id'))
+            cur.close()
+            
+            return jsonify({
+                'exito': True,
+                'tareas': tareas,
+                'siguiente_cursor': siguiente
+            }), 200
             
-            # Verificar que la tarea pertenece al profesor
-            cur.execute("SELECT profesor_id FROM tareas WHERE id = %s", (tarea_id,))
-            tarea = cur.fetchone()
+        except Exception as e:
+            print(f"Error en obtener_archivo_profesor: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
+    @tareas_bp.route('/buscar', methods=['GET'])
+    @requiere_token()
+    def buscar_tareas():
+        """Busca tareas por texto (ordenadas por relevancia) y filtros, paginadas por cursor.
+        
+        Los profesores buscan entre sus propias tareas; los estudiantes entre todas.
+        """
+        try:
+            try:
+                limite, despues_de = leer_paginacion(request.args, 2)
+                filtros = leer_filtros(request.args)
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
             
-            if not tarea or tarea['profesor_id'] != payload['usuario_id']:
-                return jsonify({'exito': False, 'mensaje': 'Tarea no encontrada'}), 404
+            es_profesor = g.usuario['tipo'] == 'profesor'
+            sql, parametros, claves = sql_busqueda(
+                filtros,
+                """t.id, t.titulo, t.descripcion, t.curso, t.tipo, t.fecha_entrega,
+                    t.puntos, t.estado, t.profesor_id,
+                    u.nombres as profesor_nombres, u.apellidos as profesor_apellidos""",
+                despues_de,
+                g.usuario['usuario_id'] if es_profesor else None
+            )
             
-            # Eliminar tarea
-            cur.execute("DELETE FROM tareas WHERE id = %s", (tarea_id,))
-            mysql.connection.commit()
+            cur = db.connection.cursor()
+            cur.execute(sql + ' LIMIT %s', parametros + [limite + 1])
+            tareas, siguiente = separar_pagina(cur.fetchall(), limite, claves)
             cur.close()
             
+            return jsonify({
+                'exito': True,
+                'tareas': tareas,
+                'siguiente_cursor': siguiente
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en buscar_tareas: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+
+    @tareas_bp.route('/<int:tarea_id>', methods=['DELETE'])
+    @requiere_token(tipo='profesor')
+    def eliminar_tarea(tarea_id):
+        """Elimina una tarea (borrado lógico; el purgador borra sus entregas por lotes)"""
+        try:
+            cur = db.connection.cursor()
+            
+            # Solo el profesor de la tarea puede eliminarla; una sola fila afectada
+            cur.execute("""
+                UPDATE tareas SET estado = 'eliminada'
+                WHERE id = %s AND profesor_id = %s AND estado <> 'eliminada'
+            """, (tarea_id, g.usuario['usuario_id']))
+            eliminada = cur.rowcount
+            db.connection.commit()
+            cur.close()
+            
+            if not eliminada:
+                return jsonify({'exito': False, 'mensaje': 'Tarea no encontrada'}), 404
+            
+            cache_respuestas.invalidar('tareas')
+            cache_respuestas.invalidar('profesor', g.usuario['usuario_id'])
+            
             return jsonify({'exito': True, 'mensaje': 'Tarea eliminada'}), 200
             
         except Exception as e:
@@ -113,20 +204,25 @@ def init_tareas_routes(mysql, app):
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
     
     @tareas_bp.route('/estudiante', methods=['GET'])
+    @requiere_token()
+    @respuesta_cacheada(lambda usuario: [('tareas',), ('estudiante', usuario['usuario_id'])])
     def obtener_tareas_estudiante():
-        """Obtiene todas las tareas para un estudiante"""
+        """Obtiene las tareas activas para un estudiante, paginadas por cursor o en NDJSON"""
         try:
-            token = request.headers.get('Authorization')
-            if not token:
-                return jsonify({'exito': False, 'mensaje': 'Token requerido'}), 401
+            try:
+                limite, despues_de = leer_paginacion(request.args, 2)
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
             
-            payload = verificar_token(token.replace('Bearer ', ''), app.config['SECRET_KEY'])
-            if not payload:
-                return jsonify({'exito': False, 'mensaje': 'Token inválido'}), 401
+            ndjson = request.args.get('formato') == 'ndjson'
+            condicion, parametros = '', [g.usuario['usuario_id']]
+            if despues_de:
+                condicion, valores = condicion_keyset(['t.fecha_entrega', 't.id'], despues_de)
+                condicion = 'AND ' + condicion
+                parametros += valores
             
-            cur = mysql.connection.cursor()
-            cur.execute("""
-                SELECT t.*, 
+            sql = f"""
+                SELECT {COLUMNAS_TAREA},
                     u.nombres as profesor_nombres, 
                     u.apellidos as profesor_apellidos,
                     e.nota, e.comentario, e.estado as estado_entrega,
@@ -134,16 +230,74 @@ def init_tareas_routes(mysql, app):
                 FROM tareas t
                 LEFT JOIN usuarios u ON t.profesor_id = u.id
                 LEFT JOIN entregas e ON t.id = e.tarea_id AND e.estudiante_id = %s
-                ORDER BY t.fecha_entrega ASC
-            """, (payload['usuario_id'],))
+                WHERE t.estado = 'activa' {condicion}
+                ORDER BY t.fecha_entrega ASC, t.id ASC
+            """
             
-            tareas = cur.fetchall()
+            if ndjson:
+                if 'limite' in request.args:
+                    sql += ' LIMIT %s'
+                    parametros.append(limite)
+                return respuesta_ndjson(db.connection, sql, parametros)
+            
+            cur = db.connection.cursor()
+            cur.execute(sql + ' LIMIT %s', parametros + [limite + 1])
+            tareas, siguiente = separar_pagina(cur.fetchall(), limite, ('fecha_entrega', 'id'))
             cur.close()
             
-            return jsonify({'exito': True, 'tareas': tareas}), 200
+            return jsonify({
+                'exito': True,
+                'tareas': tareas,
+                'siguiente_cursor': siguiente
+            }), 200
             
         except Exception as e:
             print(f"Error en obtener_tareas_estudiante: {e}")
             return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
     
+    @tareas_bp.route('/estudiante/archivo', methods=['GET'])
+    @requiere_token()
+    def obtener_archivo_estudiante():
+        """Obtiene las tareas cerradas con la entrega del estudiante, de la más reciente a la más antigua"""
+        try:
+            try:
+                limite, despues_de = leer_paginacion(request.args, 2)
+                estado = leer_estado_archivo(request.args)
+            except ValueError as e:
+                return jsonify({'exito': False, 'mensaje': str(e)}), 400
+            
+            condicion, parametros = '', [g.usuario['usuario_id'], estado]
+            if despues_de:
+                condicion, valores = condicion_keyset(['t.fecha_entrega', 't.id'], despues_de,
+                                                    descendente=True)
+                condicion = 'AND ' + condicion
+                parametros += valores
+            
+            # Rango sobre idx_tareas_estado_fecha, recorrido en orden inverso
+            cur = db.connection.cursor()
+            cur.execute(f"""
+                SELECT {COLUMNAS_TAREA},
+                    u.nombres as profesor_nombres, 
+                    u.apellidos as profesor_apellidos,
+                    e.nota, e.comentario, e.estado as estado_entrega
+                FROM tareas t
+                LEFT JOIN usuarios u ON t.profesor_id = u.id
+                LEFT JOIN entregas e ON t.id = e.tarea_id AND e.estudiante_id = %s
+                WHERE t.estado = %s {condicion}
+                ORDER BY t.fecha_entrega DESC, t.id DESC
+                LIMIT %s
+            """, parametros + [limite + 1])
+            tareas, siguiente = separar_pagina(cur.fetchall(), limite, ('fecha_entrega', 'id'))
+            cur.close()
+            
+            return jsonify({
+                'exito': True,
+                'tareas': tareas,
+                'siguiente_cursor': siguiente
+            }), 200
+            
+        except Exception as e:
+            print(f"Error en obtener_archivo_estudiante: {e}")
+            return jsonify({'exito': False, 'mensaje': 'Error en el servidor'}), 500
+    
     return tareas_bp
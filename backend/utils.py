@@ -31,6 +31,22 @@ def generar_token(usuario_id, tipo, secret_key, expiration_hours=24):
     }
     return jwt.encode(payload, secret_key, algorithm='HS256')
 
+def generar_token_stream(usuario_id, tipo, secret_key, segundos=60):
+    """Genera un JWT de corta duración que solo sirve para abrir el stream SSE.
+    
+    EventSource no permite cabeceras y el token viaja en la URL, que queda en
+    los registros de acceso de proxies y servidores: por eso no es el token
+    de sesión, caduca en segundos y requiere_token lo rechaza en el resto de
+    la API.
+    """
+    payload = {
+        'usuario_id': usuario_id,
+        'tipo': tipo,
+        'alcance': 'stream',
+        'exp': datetime.utcnow() + timedelta(seconds=segundos)
+    }
+    return jwt.encode(payload, secret_key, algorithm='HS256')
+
 def verificar_token(token, secret_key):
     """Verifica y decodifica el token"""
     try:
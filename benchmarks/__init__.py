@@ -0,0 +1 @@
+# Benchmarks del sistema (ejecutar con: python -m benchmarks.<modulo>)
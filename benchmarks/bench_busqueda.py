@@ -0,0 +1,94 @@
+# ============================================
+# BENCHMARK: BÚSQUEDA DE TAREAS (FULLTEXT VS LIKE)
+# ============================================
+#
+# Uso:
+#   python -m benchmarks.generador --estudiantes 100 --tareas 300000 --densidad 0
+#   python -m benchmarks.bench_busqueda --consultas 200
+#
+# Mide la consulta de GET /api/tareas/buscar (backend/busqueda.py) con
+# palabras del vocabulario del generador: solo texto, texto + filtros,
+# segunda página por cursor y filtros sin texto. Como referencia mide
+# LIKE '%palabra%' sobre titulo y descripcion, que recorre toda la tabla.
+
+import argparse
+import random
+from backend.config import Config
+from backend.db import conectar
+from backend.busqueda import sql_busqueda
+from benchmarks.bench_hashing import medir, resumen
+from benchmarks.generador import TEMAS, TIPOS_TAREA
+
+COLUMNAS = 't.id, t.titulo, t.curso, t.tipo, t.fecha_entrega, t.estado'
+
+def filtros_vacios(**valores):
+    filtros = dict.fromkeys(('texto', 'curso', 'tipo', 'estado', 'desde', 'hasta'))
+    filtros.update(valores)
+    return filtros
+
+def main():
+    parser = argparse.ArgumentParser(description='Búsqueda de tareas: FULLTEXT vs LIKE')
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--limite', type=int, default=20)
+    parser.add_argument('--sin-like', action='store_true',
+                        help='No medir LIKE (lento con muchas tareas)')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+    rnd = random.Random(args.semilla)
+    
+    conn = conectar(Config)
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) AS total FROM tareas")
+        total = cur.fetchone()['total']
+        if not total:
+            print("No hay tareas: ejecutar antes benchmarks.generador")
+            return
+        
+        def buscar(filtros, despues_de=None):
+            sql, parametros, claves = sql_busqueda(filtros, COLUMNAS, despues_de)
+            cur.execute(sql + ' LIMIT %s', parametros + [args.limite + 1])
+            filas = cur.fetchall()
+            return [filas[args.limite - 1][c] for c in claves] if len(filas) > args.limite else None
+        
+        # Cursores de la primera página para medir la segunda
+        cursores = [(t, buscar(filtros_vacios(texto=t))) for t in TEMAS]
+        cursores = [(t, c) for t, c in cursores if c]
+        
+        mediciones = {
+            'texto': lambda: buscar(filtros_vacios(texto=rnd.choice(TEMAS))),
+            'texto+filtros': lambda: buscar(filtros_vacios(
+                texto=rnd.choice(TEMAS), tipo=rnd.choice(TIPOS_TAREA), estado='activa')),
+            'filtros': lambda: buscar(filtros_vacios(tipo=rnd.choice(TIPOS_TAREA), estado='activa'))
+        }
+        if cursores:
+            def segunda_pagina():
+                texto, cursor = rnd.choice(cursores)
+                buscar(filtros_vacios(texto=texto), cursor)
+            mediciones['página 2'] = segunda_pagina
+        if not args.sin_like:
+            def like():
+                patron = f'%{rnd.choice(TEMAS)}%'
+                cur.execute("""
+                    SELECT id, titulo FROM tareas
+                    WHERE (titulo LIKE %s OR descripcion LIKE %s) AND estado <> 'eliminada'
+                    ORDER BY fecha_entrega DESC, id DESC LIMIT %s
+                """, (patron, patron, args.limite))
+                cur.fetchall()
+            mediciones['LIKE'] = like
+        
+        sql, parametros, _ = sql_busqueda(filtros_vacios(texto=TEMAS[0]), COLUMNAS)
+        cur.execute('EXPLAIN ' + sql + ' LIMIT %s', parametros + [args.limite + 1])
+        plan = cur.fetchall()[0]
+        
+        print(f"{total} tareas; plan de la búsqueda por texto: type={plan['type']} key={plan['key']}")
+        print(f"{'Consulta':<14} {'p50':>13} {'p95':>13}")
+        for nombre, funcion in mediciones.items():
+            r = resumen(medir(funcion, args.consultas))
+            print(f"{nombre:<14} {r['p50_ms']:>10} ms {r['p95_ms']:>10} ms")
+    finally:
+        cur.close()
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# ============================================
+# BENCHMARK: COSTO DEL HASH DE CONTRASEÑAS POR LOGIN
+# ============================================
+#
+# Uso:
+#   python -m benchmarks.bench_hashing
+#   python -m benchmarks.bench_hashing --metodos scrypt:16384:8:1 scrypt:32768:8:1 --logins 200
+#
+# Mide, para cada método/factor de trabajo, el costo de generar un hash y
+# de verificar una contraseña (el trabajo de CPU de un login) y el
+# throughput de logins concurrentes usando el pool de procesos.
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.hashing import PoolHashing, _generar, _verificar
+
+CONTRASENA = 'clave123'
+
+def medir(funcion, repeticiones):
+    """Devuelve los tiempos (ms) de `repeticiones` llamadas a funcion()"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+def resumen(tiempos):
+    tiempos = sorted(tiempos)
+    return {
+        'media_ms': round(statistics.mean(tiempos), 2),
+        'p50_ms': round(tiempos[len(tiempos) // 2], 2),
+        'p95_ms': round(tiempos[int(len(tiempos) * 0.95) - 1], 2)
+    }
+
+def bench_metodo(metodo, repeticiones, logins, procesos, concurrencia):
+    hash_contrasena = _generar(CONTRASENA, metodo)
+    
+    generar = resumen(medir(lambda: _generar(CONTRASENA, metodo), repeticiones))
+    verificar = resumen(medir(lambda: _verificar(hash_contrasena, CONTRASENA), repeticiones))
+    
+    pool = PoolHashing(procesos=procesos, max_pendientes=concurrencia, metodo=metodo)
+    pool.calentar()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concurrencia) as hilos:
+        list(hilos.map(lambda _: pool.verificar(hash_contrasena, CONTRASENA), range(logins)))
+    duracion = time.perf_counter() - inicio
+    pool.cerrar()
+    
+    return {
+        'metodo': metodo,
+        'generar': generar,
+        'verificar': verificar,
+        'logins_por_segundo': round(logins / duracion, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Costo del hash de contraseñas por login')
+    parser.add_argument('--metodos', nargs='+',
+                        default=['pbkdf2:sha256:600000', 'scrypt:16384:8:1', 'scrypt:32768:8:1'])
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--procesos', type=int, default=2)
+    parser.add_argument('--concurrencia', type=int, default=8)
+    args = parser.parse_args()
+    
+    print(f"{'Método':<24} {'generar p50':>12} {'verificar p50':>14} {'verificar p95':>14} {'logins/s':>10}")
+    for metodo in args.metodos:
+        r = bench_metodo(metodo, args.repeticiones, args.logins, args.procesos, args.concurrencia)
+        print(f"{r['metodo']:<24} {r['generar']['p50_ms']:>10} ms {r['verificar']['p50_ms']:>12} ms "
+            f"{r['verificar']['p95_ms']:>12} ms {r['logins_por_segundo']:>10}")
+
+if __name__ == '__main__':
+    main()
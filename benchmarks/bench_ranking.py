@@ -0,0 +1,120 @@
+# ============================================
+# BENCHMARK: RANKING EN MEMORIA VS VISTA ranking_estudiantes
+# ============================================
+#
+# Uso:
+#   python -m benchmarks.generador --estudiantes 10000 --tareas 400
+#   python -m benchmarks.bench_ranking --consultas 200
+#   python -m benchmarks.bench_ranking --sintetico 50000    # solo el índice, sin MySQL
+#
+# Compara "top K" y "puesto del estudiante X" resueltos con la vista de
+# BD.sql (RANK() OVER sobre todos los estudiantes en cada lectura) contra
+# el índice de backend/ranking.py, y mide el costo de actualizar un promedio.
+
+import argparse
+import random
+import time
+from decimal import Decimal
+from backend.config import Config
+from backend.db import conectar
+from backend.ranking import IndiceRanking, SQL_RANKING
+from benchmarks.bench_hashing import medir, resumen
+from benchmarks.generador import GRADOS, SECCIONES
+
+def filas_sinteticas(cantidad, semilla):
+    rnd = random.Random(semilla)
+    return [{
+        'usuario_id': f'SINT{i:07d}',
+        'nombres': 'Estudiante',
+        'apellidos': f'{i:07d}',
+        'grado': rnd.choice(GRADOS),
+        'seccion': rnd.choice(SECCIONES),
+        'promedio_general': Decimal(rnd.randint(1, 2000)) / 100,
+        'tareas_completadas': rnd.randint(1, 40)
+    } for i in range(cantidad)]
+
+def bench_indice(filas, consultas, k, rnd):
+    indice = IndiceRanking()
+    inicio = time.perf_counter()
+    indice.reconstruir(filas)
+    construccion_ms = round((time.perf_counter() - inicio) * 1000, 2)
+    
+    ids = [f['usuario_id'] for f in filas]
+    muestra = filas[0]
+    seccion = ('seccion', muestra['grado'], muestra['seccion'])
+    
+    def actualizar():
+        fila = dict(rnd.choice(filas), promedio_general=Decimal(rnd.randint(1, 2000)) / 100)
+        indice.actualizar([fila])
+    
+    return {
+        'construccion_ms': construccion_ms,
+        'top_global': resumen(medir(lambda: indice.top(('global',), k), consultas)),
+        'top_seccion': resumen(medir(lambda: indice.top(seccion, k), consultas)),
+        'puesto': resumen(medir(lambda: indice.posicion(rnd.choice(ids)), consultas)),
+        'actualizar': resumen(medir(actualizar, consultas))
+    }
+
+def bench_vista(conn, ids, consultas, k, rnd):
+    cur = conn.cursor()
+    
+    def consultar(sql, parametros):
+        cur.execute(sql, parametros)
+        cur.fetchall()
+    
+    resultado = {
+        'top_global': resumen(medir(lambda: consultar(
+            "SELECT * FROM ranking_estudiantes LIMIT %s", (k,)), consultas)),
+        'puesto': resumen(medir(lambda: consultar(
+            "SELECT ranking FROM ranking_estudiantes WHERE usuario_id = %s",
+            (rnd.choice(ids),)), consultas))
+    }
+    cur.close()
+    return resultado
+
+def mostrar(nombre, resultado):
+    for operacion, r in resultado.items():
+        if isinstance(r, dict):
+            print(f"{nombre:<8} {operacion:<12} {r['p50_ms']:>10} ms {r['p95_ms']:>10} ms")
+    if 'construccion_ms' in resultado:
+        print(f"{nombre:<8} {'construcción':<12} {resultado['construccion_ms']:>10} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Ranking en memoria vs vista SQL')
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--sintetico', type=int, default=0,
+                        help='Estudiantes generados en memoria (no usa MySQL)')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+    rnd = random.Random(args.semilla)
+    
+    print(f"{'Origen':<8} {'Operación':<12} {'p50':>13} {'p95':>13}")
+    if args.sintetico:
+        filas = filas_sinteticas(args.sintetico, args.semilla)
+        print(f"{len(filas)} estudiantes sintéticos")
+        mostrar('índice', bench_indice(filas, args.consultas, args.k, rnd))
+        return
+    
+    conn = conectar(Config)
+    try:
+        inicio = time.perf_counter()
+        cur = conn.cursor()
+        cur.execute(SQL_RANKING + " WHERE e.promedio_general > 0")
+        filas = cur.fetchall()
+        cur.close()
+        lectura_ms = round((time.perf_counter() - inicio) * 1000, 2)
+        if not filas:
+            print("No hay estudiantes con promedio: ejecutar antes benchmarks.generador")
+            return
+        
+        print(f"{len(filas)} estudiantes con promedio")
+        ids = [f['usuario_id'] for f in filas]
+        mostrar('vista', bench_vista(conn, ids, args.consultas, args.k, rnd))
+        print(f"{'índice':<8} {'lectura BD':<12} {lectura_ms:>10} ms")
+        mostrar('índice', bench_indice(filas, args.consultas, args.k, rnd))
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# ============================================
+# BENCHMARK: CODIFICACIÓN Y COMPRESIÓN DE RESPUESTAS
+# ============================================
+#
+# Uso:
+#   python -m benchmarks.bench_respuestas
+#   python -m benchmarks.bench_respuestas --filas 50 500 --repeticiones 200
+#
+# Arma páginas con la forma de las filas de GET /api/calificaciones/tarea/<id>/entregas
+# (obtener_entregas) y GET /api/tareas/estudiante (obtener_tareas_estudiante),
+# con Decimal y date/datetime como las devuelve MySQLdb, y mide para cada
+# codificador el tiempo de serializar la respuesta y los bytes enviados sin
+# comprimir, con gzip y con br (backend/respuestas.py). "flask" es el
+# proveedor JSON por defecto de Flask, el que se usaba antes.
+
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from backend.respuestas import CODIFICADORES, CompresorRespuestas, brotli
+from benchmarks.bench_hashing import medir, resumen
+from benchmarks.generador import ACCIONES, APELLIDOS, NOMBRES, TEMAS, TIPOS_TAREA, id_estudiante
+
+def pagina_entregas(rnd, filas):
+    entregas = []
+    for i in range(filas):
+        calificada = rnd.random() < 0.7
+        entregas.append({
+            'id': id_estudiante(i),
+            'nombres': rnd.choice(NOMBRES),
+            'apellidos': f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}',
+            'nota': Decimal(rnd.randint(50, 200)) / 10 if calificada else None,
+            'comentario': rnd.choice(['Excelente trabajo', 'Revisar el procedimiento', None]),
+            'fecha_calificacion': datetime(2025, 5, 1, 8) + timedelta(minutes=rnd.randint(0, 90000))
+                                if calificada else None,
+            'estado': 'calificada' if calificada else None
+        })
+    return {'exito': True, 'entregas': entregas, 'siguiente_cursor': 'WyJWZWdhIiwiQW5hIiwiQkVOQ0giXQ'}
+
+def pagina_tareas_estudiante(rnd, filas):
+    hoy = date.today()
+    tareas = []
+    for i in range(filas):
+        tema, otros = rnd.choice(TEMAS), rnd.sample(TEMAS, 3)
+        dias = rnd.randint(0, 60)
+        calificada = rnd.random() < 0.4
+        tareas.append({
+            'id': 1000 + i,
+            'titulo': f'{rnd.choice(ACCIONES)} {tema} {i}',
+            'descripcion': f"{rnd.choice(ACCIONES)} {', '.join(otros)} y {tema}; actividad sintética {i}",
+            'curso': 'Matemática',
+            'tipo': rnd.choice(TIPOS_TAREA),
+            'fecha_entrega': hoy + timedelta(days=dias),
+            'puntos': 20,
+            'profesor_nombres': rnd.choice(NOMBRES),
+            'profesor_apellidos': rnd.choice(APELLIDOS),
+            'nota': Decimal(rnd.randint(50, 200)) / 10 if calificada else None,
+            'comentario': 'Buen trabajo' if calificada else None,
+            'estado_entrega': 'calificada' if calificada else None,
+            'dias_restantes': dias
+        })
+    return {'exito': True, 'tareas': tareas, 'siguiente_cursor': 'WyIyMDI1LTAxLTMwIiwxXQ'}
+
+PAGINAS = {
+    'obtener_entregas': pagina_entregas,
+    'obtener_tareas_estudiante': pagina_tareas_estudiante
+}
+
+def codificadores():
+    """Codificadores a comparar: el de Flask por defecto y los de backend.respuestas"""
+    proveedor = DefaultJSONProvider(Flask(__name__))
+    return {
+        'flask': lambda obj: proveedor.dumps(obj).encode('utf-8'),
+        **CODIFICADORES
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Codificación y compresión de respuestas')
+    parser.add_argument('--filas', type=int, nargs='+', default=[50, 500])
+    parser.add_argument('--repeticiones', type=int, default=100)
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+    
+    compresor = CompresorRespuestas()
+    comprimir = {c: (lambda datos, c=c: compresor.comprimir(datos, c)) for c in compresor.codificaciones}
+    
+    print(f"{'Endpoint':<26} {'filas':>5} {'codificador':<12} {'p50':>9} {'p95':>9} "
+        f"{'bytes':>9} " + ' '.join(f'{c:>9} {c + " p50":>10}' for c in comprimir))
+    for endpoint, construir in PAGINAS.items():
+        for filas in args.filas:
+            pagina = construir(random.Random(args.semilla), filas)
+            for nombre, codificar in codificadores().items():
+                tiempos = resumen(medir(lambda: codificar(pagina), args.repeticiones))
+                cuerpo = codificar(pagina)
+                columnas = []
+                for codificacion, funcion in comprimir.items():
+                    tiempo = resumen(medir(lambda: funcion(cuerpo), args.repeticiones))
+                    columnas.append(f"{len(funcion(cuerpo)):>9} {tiempo['p50_ms']:>7} ms")
+                print(f"{endpoint:<26} {filas:>5} {nombre:<12} {tiempos['p50_ms']:>6} ms "
+                    f"{tiempos['p95_ms']:>6} ms {len(cuerpo):>9} " + ' '.join(columnas))
+    if brotli is None:
+        print("(instalar el paquete brotli para medir también br)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+# ============================================
+# DRIVER DE CARGA
+# ============================================
+#
+# Ejecuta una mezcla de operaciones (login, listados de tareas, listado de
+# entregas, calificación y estadísticas) con la concurrencia indicada, ya
+# sea en proceso con el cliente de pruebas de Flask o contra un servidor
+# local (p. ej. gunicorn), y guarda el reporte en JSON.
+#
+# Requiere los datos de benchmarks.generador con los mismos tamaños:
+#   python -m benchmarks.driver --concurrencia 16 --duracion 30 --salida benchmarks/resultados/base.json
+#   python -m benchmarks.driver --url http://127.0.0.1:8000 --concurrencia 64 --duracion 60
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from backend.config import Config
+from backend.db import conectar
+from benchmarks.generador import CONTRASENA, PREFIJO, id_estudiante, id_profesor
+from benchmarks.reporte import construir_reporte, guardar, mostrar
+
+# Peso relativo de cada operación en la mezcla
+MEZCLA = {
+    'tareas_estudiante': 30,
+    'estadisticas': 20,
+    'tareas_profesor': 20,
+    'entregas': 15,
+    'calificar': 10,
+    'login': 5
+}
+
+class ClienteFlask:
+    """Cliente en proceso (sin red) sobre la aplicación Flask"""
+    
+    def __init__(self, app):
+        self.cliente = app.test_client()
+    
+    def pedir(self, metodo, ruta, token=None, cuerpo=None):
+        cabeceras = {'Authorization': f'Bearer {token}'} if token else {}
+        respuesta = self.cliente.open(ruta, method=metodo, json=cuerpo, headers=cabeceras)
+        return respuesta.status_code, respuesta.get_json(silent=True)
+
+class ClienteHTTP:
+    """Cliente HTTP contra un servidor local"""
+    
+    def __init__(self, url_base):
+        self.url_base = url_base.rstrip('/')
+    
+    def pedir(self, metodo, ruta, token=None, cuerpo=None):
+        datos = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+        peticion = urllib.request.Request(self.url_base + ruta, data=datos, method=metodo)
+        peticion.add_header('Content-Type', 'application/json')
+        if token:
+            peticion.add_header('Authorization', f'Bearer {token}')
+        try:
+            with urllib.request.urlopen(peticion, timeout=30) as respuesta:
+                return respuesta.status, json.loads(respuesta.read() or b'null')
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+class UsuarioVirtual(threading.Thread):
+    """Hilo que inicia sesión y ejecuta operaciones al azar hasta `fin`"""
+    
+    def __init__(self, numero, cliente, datos, fin, semilla):
+        super().__init__(daemon=True)
+        self.cliente = cliente
+        self.datos = datos
+        self.fin = fin
+        self.rnd = random.Random(semilla + numero)
+        self.muestras = {}
+        self.estudiante = id_estudiante(self.rnd.randrange(datos['estudiantes']))
+        self.profesor = id_profesor(self.rnd.randrange(datos['profesores']))
+        self.tokens = {}
+    
+    def medir(self, nombre, metodo, ruta, token=None, cuerpo=None):
+        inicio = time.perf_counter()
+        try:
+            estado, cuerpo_respuesta = self.cliente.pedir(metodo, ruta, token, cuerpo)
+        except Exception:
+            estado, cuerpo_respuesta = 599, None
+        self.muestras.setdefault(nombre, []).append((time.perf_counter() - inicio, estado))
+        return estado, cuerpo_respuesta
+    
+    def login(self, usuario_id):
+        estado, cuerpo = self.medir('login', 'POST', '/api/login',
+                                    cuerpo={'id': usuario_id, 'contrasena': CONTRASENA})
+        if estado == 200 and cuerpo:
+            self.tokens[usuario_id] = cuerpo['token']
+        return self.tokens.get(usuario_id)
+    
+    def token(self, usuario_id):
+        return self.tokens.get(usuario_id) or self.login(usuario_id)
+    
+    def run(self):
+        operaciones, pesos = zip(*MEZCLA.items())
+        while time.monotonic() < self.fin:
+            operacion = self.rnd.choices(operaciones, pesos)[0]
+            tarea_id = self.rnd.choice(self.datos['tareas'])
+            
+            if operacion == 'login':
+                self.login(self.rnd.choice([self.estudiante, self.profesor]))
+            elif operacion == 'tareas_estudiante':
+                self.medir(operacion, 'GET', '/api/tareas/estudiante', self.token(self.estudiante))
+            elif operacion == 'estadisticas':
+                self.medir(operacion, 'GET', '/api/calificaciones/estudiante/estadisticas',
+                        self.token(self.estudiante))
+            elif operacion == 'tareas_profesor':
+                self.medir(operacion, 'GET', '/api/tareas/profesor', self.token(self.profesor))
+            elif operacion == 'entregas':
+                self.medir(operacion, 'GET', f'/api/calificaciones/tarea/{tarea_id}/entregas',
+                        self.token(self.profesor))
+            elif operacion == 'calificar':
+                self.medir(operacion, 'POST', '/api/calificaciones', self.token(self.profesor), {
+                    'tarea_id': tarea_id,
+                    'estudiante_id': id_estudiante(self.rnd.randrange(self.datos['estudiantes'])),
+                    'nota': round(self.rnd.uniform(5, 20), 1),
+                    'comentario': 'Calificación de prueba de carga'
+                })
+
+def cargar_datos():
+    """Lee de la base de datos el tamaño del colegio sintético"""
+    conn = conectar(Config)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT tipo, COUNT(*) AS total FROM usuarios WHERE id LIKE %s GROUP BY tipo",
+                    (PREFIJO + '%',))
+        conteos = {fila['tipo']: fila['total'] for fila in cur.fetchall()}
+        cur.execute("SELECT id FROM tareas WHERE profesor_id LIKE %s", (PREFIJO + '%',))
+        tareas = [fila['id'] for fila in cur.fetchall()]
+        cur.close()
+    finally:
+        conn.close()
+    
+    if not conteos.get('profesor') or not conteos.get('estudiante') or not tareas:
+        raise SystemExit('No hay datos sintéticos: ejecuta primero python -m benchmarks.generador')
+    return {'profesores': conteos['profesor'], 'estudiantes': conteos['estudiante'], 'tareas': tareas}
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API')
+    parser.add_argument('--url', help='URL de un servidor local; sin ella se usa el cliente de Flask')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--duracion', type=float, default=20, help='Segundos de medición')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help='Archivo JSON donde guardar el reporte')
+    args = parser.parse_args()
+    
+    datos = cargar_datos()
+    if args.url:
+        crear_cliente = lambda: ClienteHTTP(args.url)
+    else:
+        from app import app
+        crear_cliente = lambda: ClienteFlask(app)
+    
+    inicio = time.monotonic()
+    fin = inicio + args.duracion
+    usuarios = [UsuarioVirtual(i, crear_cliente(), datos, fin, args.semilla)
+                for i in range(args.concurrencia)]
+    for usuario in usuarios:
+        usuario.start()
+    for usuario in usuarios:
+        usuario.join()
+    duracion = time.monotonic() - inicio
+    
+    muestras = {}
+    for usuario in usuarios:
+        for nombre, registros in usuario.muestras.items():
+            muestras.setdefault(nombre, []).extend(registros)
+    
+    reporte = construir_reporte(muestras, duracion, {
+        'modo': 'http' if args.url else 'cliente_flask',
+        'url': args.url,
+        'concurrencia': args.concurrencia,
+        'duracion_s': args.duracion,
+        'semilla': args.semilla,
+        'profesores': datos['profesores'],
+        'estudiantes': datos['estudiantes'],
+        'tareas': len(datos['tareas'])
+    })
+    mostrar(reporte)
+    
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        guardar(reporte, args.salida)
+        print(f"Reporte guardado en {args.salida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+# ============================================
+# GENERADOR DE UN COLEGIO SINTÉTICO
+# ============================================
+#
+# Llena el esquema de BD.sql con N profesores, M estudiantes, K tareas y
+# calificaciones con la densidad indicada, de forma reproducible (semilla).
+# Todos los usuarios generados tienen la contraseña CONTRASENA y un id con
+# prefijo BENCH, de modo que se pueden borrar sin tocar los datos reales.
+#
+# Uso:
+#   python -m benchmarks.generador --profesores 50 --estudiantes 2000 --tareas 400 --densidad 0.6
+#   python -m benchmarks.generador --limpiar
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from backend.config import Config
+from backend.db import conectar
+from backend.estadisticas import reconstruir
+from backend.hashing import _generar
+
+CONTRASENA = 'clave123'
+PREFIJO = 'BENCH'
+TAMANO_LOTE = 1000
+
+NOMBRES = ['Ana', 'Luis', 'Carmen', 'José', 'María', 'Jorge', 'Rosa', 'Pedro',
+        'Lucía', 'Miguel', 'Sofía', 'Diego', 'Valeria', 'Andrés', 'Camila', 'Raúl']
+APELLIDOS = ['Quispe', 'Flores', 'Sánchez', 'Rodríguez', 'García', 'Mamani',
+            'Torres', 'Rojas', 'Huamán', 'Vargas', 'Castillo', 'Mendoza',
+            'Chávez', 'Ramírez', 'Vega', 'Díaz']
+GRADOS = ['1ro', '2do', '3ro', '4to', '5to']
+SECCIONES = ['A', 'B', 'C', 'D']
+TIPOS_TAREA = ['tarea', 'tarea', 'tarea', 'examen', 'proyecto']
+# Vocabulario de títulos y descripciones (para que la búsqueda por texto sea realista)
+ACCIONES = ['Resolver', 'Investigar', 'Redactar', 'Analizar', 'Exponer', 'Practicar',
+            'Comparar', 'Resumir', 'Elaborar', 'Leer']
+TEMAS = ['ecuaciones', 'fracciones', 'fotosíntesis', 'revolución', 'poemas', 'célula',
+        'geometría', 'independencia', 'ecosistema', 'probabilidades', 'verbos', 'energía',
+        'volcanes', 'mitología', 'estadística', 'cuentos', 'átomos', 'derivadas',
+        'ortografía', 'climatología', 'migraciones', 'polinomios', 'reciclaje', 'incas']
+
+def id_profesor(i):
+    return f'{PREFIJO}P{i:06d}'
+
+def id_estudiante(i):
+    return f'{PREFIJO}E{i:07d}'
+
+def insertar_por_lotes(cur, conn, sql_base, fila_sql, filas):
+    """Inserta `filas` con sentencias multi-fila de TAMANO_LOTE filas"""
+    total = 0
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        lote = filas[inicio:inicio + TAMANO_LOTE]
+        parametros = [valor for fila in lote for valor in fila]
+        cur.execute(sql_base + ', '.join([fila_sql] * len(lote)), parametros)
+        conn.commit()
+        total += len(lote)
+    return total
+
+def generar(conn, profesores, estudiantes, tareas, densidad, semilla):
+    rnd = random.Random(semilla)
+    cur = conn.cursor()
+    hash_contrasena = _generar(CONTRASENA, Config.HASH_METODO)
+    
+    def persona(i):
+        return (rnd.choice(NOMBRES), f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}')
+    
+    # Usuarios (los DNI sintéticos empiezan en 90000000 para no chocar con los reales)
+    usuarios, filas_profesores, filas_estudiantes = [], [], []
+    for i in range(profesores):
+        nombres, apellidos = persona(i)
+        usuarios.append((id_profesor(i), nombres, apellidos, f'{90000000 + i}',
+                        f'bench.prof{i}@gmail.com', hash_contrasena, 'profesor'))
+        filas_profesores.append((id_profesor(i), rnd.choice(['Matemática', 'Comunicación'])))
+    for i in range(estudiantes):
+        nombres, apellidos = persona(i)
+        usuarios.append((id_estudiante(i), nombres, apellidos, f'{90000000 + profesores + i}',
+                        f'bench.est{i}@gmail.com', hash_contrasena, 'estudiante'))
+        filas_estudiantes.append((id_estudiante(i), rnd.choice(GRADOS), rnd.choice(SECCIONES)))
+    
+    insertar_por_lotes(cur, conn, """
+        INSERT INTO usuarios (id, nombres, apellidos, dni, correo, contrasena, tipo) VALUES
+    """, '(%s, %s, %s, %s, %s, %s, %s)', usuarios)
+    insertar_por_lotes(cur, conn, "INSERT INTO profesores (usuario_id, especialidad) VALUES ",
+                    '(%s, %s)', filas_profesores)
+    insertar_por_lotes(cur, conn, "INSERT INTO estudiantes (usuario_id, grado, seccion) VALUES ",
+                    '(%s, %s, %s)', filas_estudiantes)
+    
+    # Tareas repartidas alrededor de hoy
+    cur.execute("SELECT nombre FROM cursos ORDER BY id")
+    cursos = [fila['nombre'] for fila in cur.fetchall()] or ['Matemática']
+    hoy = date.today()
+    
+    def texto_tarea(i):
+        tema, otros = rnd.choice(TEMAS), rnd.sample(TEMAS, 3)
+        return (f'{rnd.choice(ACCIONES)} {tema} {i}',
+                f"{rnd.choice(ACCIONES)} {', '.join(otros)} y {tema}; actividad sintética {i}")
+    
+    filas_tareas = [
+        texto_tarea(i) + (rnd.choice(cursos), rnd.choice(TIPOS_TAREA),
+                        hoy + timedelta(days=rnd.randint(-180, 60)),
+                        id_profesor(rnd.randrange(profesores)))
+        for i in range(tareas)
+    ]
+    insertar_por_lotes(cur, conn, """
+        INSERT INTO tareas (titulo, descripcion, curso, tipo, fecha_entrega, profesor_id) VALUES
+    """, '(%s, %s, %s, %s, %s, %s)', filas_tareas)
+    
+    cur.execute("SELECT id FROM tareas WHERE profesor_id LIKE %s ORDER BY id", (PREFIJO + '%',))
+    ids_tareas = [fila['id'] for fila in cur.fetchall()]
+    
+    # Calificaciones: cada par (tarea, estudiante) con probabilidad `densidad`,
+    # generadas e insertadas por tarea para no acumularlas todas en memoria
+    total_entregas = 0
+    for tarea_id in ids_tareas:
+        filas = [
+            (tarea_id, id_estudiante(i), round(rnd.uniform(5, 20), 1))
+            for i in range(estudiantes) if rnd.random() < densidad
+        ]
+        total_entregas += insertar_por_lotes(cur, conn, """
+            INSERT INTO entregas (tarea_id, estudiante_id, nota, estado, fecha_calificacion) VALUES
+        """, "(%s, %s, %s, 'calificada', NOW())", filas)
+    
+    cur.close()
+    return {
+        'profesores': profesores,
+        'estudiantes': estudiantes,
+        'tareas': len(ids_tareas),
+        'entregas': total_entregas
+    }
+
+def limpiar(conn):
+    """Borra los datos sintéticos (tareas primero, para que sus triggers descuenten las notas)"""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM tareas WHERE profesor_id LIKE %s", (PREFIJO + '%',))
+    cur.execute("DELETE FROM usuarios WHERE id LIKE %s", (PREFIJO + '%',))
+    conn.commit()
+    cur.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera un colegio sintético para benchmarks')
+    parser.add_argument('--profesores', type=int, default=20)
+    parser.add_argument('--estudiantes', type=int, default=1000)
+    parser.add_argument('--tareas', type=int, default=200)
+    parser.add_argument('--densidad', type=float, default=0.5,
+                        help='Fracción de pares (tarea, estudiante) calificados')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--limpiar', action='store_true',
+                        help='Solo borrar los datos sintéticos existentes')
+    args = parser.parse_args()
+    
+    conn = conectar(Config)
+    try:
+        inicio = time.perf_counter()
+        limpiar(conn)
+        if not args.limpiar:
+            resumen = generar(conn, args.profesores, args.estudiantes, args.tareas,
+                            args.densidad, args.semilla)
+            print(f"Generado: {resumen}")
+        
+        # Los borrados en cascada de usuarios no disparan triggers
+        reconstruir(conn)
+        print(f"Listo en {time.perf_counter() - inicio:.1f} s")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# ============================================
+# REPORTE DE RESULTADOS DE CARGA
+# ============================================
+#
+# Uso:
+#   python -m benchmarks.reporte mostrar resultados/base.json
+#   python -m benchmarks.reporte comparar resultados/base.json resultados/nuevo.json
+
+import argparse
+import json
+
+def percentil(valores_ordenados, p):
+    """Percentil por el método del rango más cercano"""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1,
+                        int(round(p / 100 * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+def construir_reporte(muestras, duracion, parametros):
+    """Resume las muestras {endpoint: [(latencia_s, estado), ...]}"""
+    endpoints = {}
+    for endpoint, registros in sorted(muestras.items()):
+        latencias = sorted(latencia * 1000 for latencia, _ in registros)
+        errores = sum(1 for _, estado in registros if estado >= 400)
+        endpoints[endpoint] = {
+            'peticiones': len(registros),
+            'errores': errores,
+            'throughput_rps': round(len(registros) / duracion, 2) if duracion else 0,
+            'p50_ms': round(percentil(latencias, 50), 2),
+            'p95_ms': round(percentil(latencias, 95), 2),
+            'p99_ms': round(percentil(latencias, 99), 2),
+            'max_ms': round(latencias[-1], 2) if latencias else 0
+        }
+    
+    total = sum(e['peticiones'] for e in endpoints.values())
+    return {
+        'parametros': parametros,
+        'duracion_s': round(duracion, 2),
+        'peticiones': total,
+        'throughput_rps': round(total / duracion, 2) if duracion else 0,
+        'endpoints': endpoints
+    }
+
+def guardar(reporte, ruta):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+def mostrar(reporte):
+    print(f"Duración: {reporte['duracion_s']} s  Peticiones: {reporte['peticiones']}  "
+        f"Throughput: {reporte['throughput_rps']} req/s")
+    print(f"{'Endpoint':<28} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for nombre, e in reporte['endpoints'].items():
+        print(f"{nombre:<28} {e['peticiones']:>7} {e['errores']:>5} {e['throughput_rps']:>8} "
+            f"{e['p50_ms']:>7}ms {e['p95_ms']:>7}ms {e['p99_ms']:>7}ms")
+
+def comparar(base, nuevo):
+    print(f"{'Endpoint':<28} {'p50 base':>10} {'p50 nuevo':>10} {'p99 base':>10} "
+        f"{'p99 nuevo':>10} {'Δ req/s':>9}")
+    for nombre in sorted(set(base['endpoints']) | set(nuevo['endpoints'])):
+        b = base['endpoints'].get(nombre)
+        n = nuevo['endpoints'].get(nombre)
+        if not b or not n:
+            print(f"{nombre:<28} (solo en {'nuevo' if n else 'base'})")
+            continue
+        delta = n['throughput_rps'] - b['throughput_rps']
+        print(f"{nombre:<28} {b['p50_ms']:>8}ms {n['p50_ms']:>8}ms {b['p99_ms']:>8}ms "
+            f"{n['p99_ms']:>8}ms {delta:>+9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Muestra o compara reportes de carga')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('mostrar').add_argument('reporte')
+    p = sub.add_parser('comparar')
+    p.add_argument('base')
+    p.add_argument('nuevo')
+    args = parser.parse_args()
+    
+    if args.comando == 'mostrar':
+        mostrar(cargar(args.reporte))
+    else:
+        comparar(cargar(args.base), cargar(args.nuevo))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# ============================================
+# CONFIGURACIÓN DE GUNICORN (PRODUCCIÓN)
+# Uso: gunicorn -c gunicorn.conf.py
+# ============================================
+
+import multiprocessing
+import os
+from dotenv import load_dotenv
+
+# Los mismos archivos que backend/config.py, para que GUNICORN_* y POOL_* se
+# puedan definir ahí (las variables del entorno tienen prioridad)
+RAIZ_PROYECTO = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(RAIZ_PROYECTO, '.env'))
+load_dotenv(os.path.join(RAIZ_PROYECTO, 'configuracion.env'))
+
+# Aplicación WSGI
+wsgi_app = 'app:app'
+
+# Dirección de escucha
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Workers con hilos: las peticiones esperan sobre todo a MySQL, así que cada
+# worker atiende varias a la vez con hilos; el hash de contraseñas no bloquea
+# los hilos porque corre en el pool de procesos de backend/hashing.py.
+# POOL_MAX debe ser al menos igual a `threads`. Cada stream SSE de notificaciones
+# ocupa un hilo (no una conexión a MySQL): SSE_MAX_CONEXIONES debe ser menor que `threads`.
+# Los clientes que no obtienen stream (429) consultan cada SSE_SONDEO_SEGUNDOS;
+# para dar stream a todos hace falta subir `threads` o agregar workers.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Presupuesto de conexiones a MySQL. Cada worker abre hasta POOL_MAX conexiones
+# a la primaria (y otras tantas a cada réplica) más una del planificador, así
+# que workers × (POOL_MAX + 1) no puede pasar de max_connections del servidor
+# (151 por defecto en MySQL). MYSQL_MAX_CONEXIONES es la parte de max_connections
+# que puede usar esta aplicación (por defecto 140: deja margen para
+# administración y replicación).
+# Sin GUNICORN_WORKERS se usan 2 × CPU + 1 workers, pero no más de los que caben
+# con POOL_MAX = threads; con GUNICORN_WORKERS explícito, POOL_MAX se reduce
+# para respetar el presupuesto. Se ajusta aquí, antes de cargar la aplicación,
+# porque backend.config lee el entorno al importarse.
+MYSQL_MAX_CONEXIONES = int(os.environ.get('MYSQL_MAX_CONEXIONES', 140))
+workers = int(os.environ.get('GUNICORN_WORKERS', max(1, min(
+    multiprocessing.cpu_count() * 2 + 1, MYSQL_MAX_CONEXIONES // (threads + 1)))))
+POOL_MAX_POR_WORKER = MYSQL_MAX_CONEXIONES // workers - 1
+if POOL_MAX_POR_WORKER < 1:
+    raise RuntimeError(
+        f"{workers} workers no caben en MYSQL_MAX_CONEXIONES={MYSQL_MAX_CONEXIONES} "
+        "(cada worker necesita al menos 2 conexiones): bajar GUNICORN_WORKERS o subir "
+        "max_connections en MySQL y MYSQL_MAX_CONEXIONES")
+os.environ['POOL_MAX'] = str(min(int(os.environ.get('POOL_MAX', 10)), POOL_MAX_POR_WORKER))
+os.environ['POOL_MIN'] = str(min(int(os.environ.get('POOL_MIN', 2)), int(os.environ['POOL_MAX'])))
+
+# Cargar la aplicación una vez en el proceso maestro y compartirla con los workers
+preload_app = True
+
+# Tiempos de espera y apagado ordenado
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Reciclar workers periódicamente para acotar fugas de memoria
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = 500
+
+# Registro. La línea de acceso omite la query string: el stream SSE lleva su
+# token en ?token= (EventSource no envía cabeceras)
+accesslog = '-'
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+def when_ready(server):
+    """Avisa si el presupuesto de conexiones deja hilos esperando una conexión"""
+    if int(os.environ['POOL_MAX']) < threads:
+        server.log.warning(
+            f"POOL_MAX={os.environ['POOL_MAX']} es menor que threads={threads} "
+            f"({workers} workers con MYSQL_MAX_CONEXIONES={MYSQL_MAX_CONEXIONES}): "
+            "los hilos pueden esperar hasta POOL_TIMEOUT_SEGUNDOS por una conexión")
+
+def post_fork(server, worker):
+    """Calienta conexiones, pool de hashing y JWT en cada worker recién creado"""
+    from app import app, calentar
+    calentar(app)
+    server.log.info(f"Worker {worker.pid} listo")
+
+def worker_exit(server, worker):
+    """Apagado ordenado: guarda los últimos accesos y libera conexiones y procesos de hashing del worker"""
+    from app import app, cerrar
+    cerrar(app)
@@ -835,6 +835,10 @@ function inicializarDatosPrueba() {
     });
 }
 // Función para hacer peticiones a la API
+// Tras una escritura el servidor indica hasta cuándo leer de la base de datos
+// primaria (y no de una réplica), para ver enseguida los propios cambios
+let leerPrimariaHasta = null;
+
 async function fetchAPI(endpoint, options = {}) {
     const config = {
         ...options,
@@ -847,9 +851,13 @@ async function fetchAPI(endpoint, options = {}) {
     if (authToken) {
         config.headers['Authorization'] = `Bearer ${authToken}`;
     }
+    if (leerPrimariaHasta && Number(leerPrimariaHasta) > Date.now()) {
+        config.headers['X-Leer-Primaria-Hasta'] = leerPrimariaHasta;
+    }
 
     try {
         const response = await fetch(`${API_URL}${endpoint}`, config);
+        leerPrimariaHasta = response.headers.get('X-Leer-Primaria-Hasta') || leerPrimariaHasta;
         const data = await response.json();
         return data;
     } catch (error) {
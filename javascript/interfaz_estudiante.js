@@ -14,14 +14,13 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
 
     cargarDatosEstudiante(usuario);
-    await cargarTareas();
-    await cargarEstadisticas();
+    await cargarDashboard();
+    escucharNotificaciones();
 });
 // Inicialización
 document.addEventListener('DOMContentLoaded', () => {
     verificarSesion();
     cargarDatosEstudiante();
-    cargarTareas();
     configurarEventos();
 });
         
@@ -44,22 +43,6 @@ function verificarSesion() {
         sesionActual.nombres.charAt(0) + sesionActual.apellidos.charAt(0);
 }
 
-async function cargarEstadisticas() {
-    try {
-        const resultado = await fetchAPI('/estadisticas/estudiante');
-        
-        if (resultado.exito) {
-            const stats = resultado.estadisticas;
-            document.getElementById('totalTareas').textContent = stats.total_tareas;
-            document.getElementById('tareasPendientes').textContent = stats.pendientes;
-            document.getElementById('tareasCalificadas').textContent = stats.calificadas;
-            document.getElementById('promedioGeneral').textContent = stats.promedio;
-        }
-    } catch (error) {
-        console.error('Error al cargar estadísticas:', error);
-    }
-}
-
 function configurarEventos() {
     document.getElementById('btnCerrarSesion').addEventListener('click', () => {
         if (confirm('¿Deseas cerrar sesión?')) {
@@ -68,17 +51,98 @@ function configurarEventos() {
     });
 }
 
-async function cargarTareas() {
+async function cargarDashboard() {
     try {
-        const resultado = await fetchAPI('/tareas/estudiante');
+        // Tareas activas y estadísticas llegan juntas en una sola petición
+        const resultado = await fetchAPI('/dashboard/estudiante');
+        if (!resultado.exito) return;
         
-        if (resultado.exito) {
-            tareasData = resultado.tareas;
-            renderizarTareas();
-        }
+        const stats = resultado.estadisticas;
+        document.getElementById('totalTareas').textContent = stats.total_tareas;
+        document.getElementById('tareasPendientes').textContent = stats.pendientes;
+        document.getElementById('tareasCalificadas').textContent = stats.calificadas;
+        document.getElementById('promedioGeneral').textContent = stats.promedio;
+        
+        tareasData = resultado.tareas;
+        renderizarTareas();
     } catch (error) {
-        console.error('Error al cargar tareas:', error);
+        console.error('Error al cargar el dashboard:', error);
+    }
+}
+
+// Stream de notificaciones (SSE) con consulta periódica de respaldo
+const RECARGA_TAREA_MAX_MS = 30000;   // Una tarea nueva llega a todos a la vez: repartir las recargas
+let fuenteNotificaciones = null;
+let ultimaNotificacionId = null;
+let sondeoMs = 60000;
+let temporizadorSondeo = null;
+let temporizadorRecarga = null;
+
+function programarRecarga(esperaMaximaMs) {
+    // Una recarga pendiente cubre los avisos que lleguen mientras tanto
+    if (temporizadorRecarga) {
+        if (esperaMaximaMs > 0) return;
+        clearTimeout(temporizadorRecarga);
     }
+    temporizadorRecarga = setTimeout(() => {
+        temporizadorRecarga = null;
+        cargarDashboard();
+    }, Math.random() * esperaMaximaMs);
+}
+
+function iniciarSondeo() {
+    // Sin stream (servidor lleno, token vencido o red caída): consultar cada sondeoMs
+    // (con variación aleatoria) e intentar abrir el stream otra vez
+    if (temporizadorSondeo) return;
+    temporizadorSondeo = setTimeout(async () => {
+        temporizadorSondeo = null;
+        await cargarDashboard();
+        escucharNotificaciones();
+    }, sondeoMs * (0.75 + Math.random() / 2));
+}
+
+async function escucharNotificaciones() {
+    // El servidor avisa por SSE de notas y tareas nuevas. El token de sesión no va en la URL:
+    // se pide uno de corta duración que solo sirve para abrir el stream.
+    if (!window.EventSource) {
+        iniciarSondeo();
+        return;
+    }
+    
+    let resultado;
+    try {
+        resultado = await fetchAPI('/notificaciones/stream/token', { method: 'POST' });
+    } catch (error) {
+        resultado = null;
+    }
+    if (!resultado || !resultado.exito) {
+        iniciarSondeo();
+        return;
+    }
+    sondeoMs = resultado.sondeo_segundos * 1000;
+    
+    const parametros = new URLSearchParams({ token: resultado.token });
+    if (ultimaNotificacionId !== null) parametros.set('desde', ultimaNotificacionId);
+    const fuente = new EventSource(`${API_URL}/notificaciones/stream?${parametros}`);
+    fuenteNotificaciones = fuente;
+    
+    fuente.addEventListener('notificacion', (evento) => {
+        ultimaNotificacionId = evento.lastEventId;
+        programarRecarga(0);
+    });
+    fuente.addEventListener('tarea', () => programarRecarga(RECARGA_TAREA_MAX_MS));
+    fuente.addEventListener('reconectar', () => {
+        // Fin de la duración máxima: reconectar con un token nuevo
+        fuente.close();
+        escucharNotificaciones();
+    });
+    fuente.addEventListener('error', () => {
+        // Un 429/401 cierra el EventSource para siempre; con la red caída se reintenta solo
+        if (fuente.readyState === EventSource.CLOSED && fuenteNotificaciones === fuente) {
+            fuenteNotificaciones = null;
+            iniciarSondeo();
+        }
+    });
 }
 
 function renderizarTareas() {
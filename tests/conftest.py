@@ -0,0 +1,75 @@
+# ============================================
+# CONFIGURACIÓN DE LAS PRUEBAS
+# ============================================
+#
+# Las pruebas que necesitan base de datos usan el MySQL de configuracion.env
+# con el esquema de BD.sql. Si MySQLdb no está instalado o el servidor no
+# responde, se omiten.
+#
+# La primera ejecución siembra el colegio sintético de benchmarks.generador
+# (prefijo BENCH, no toca los datos reales) a la escala de PLANES_*; las
+# siguientes lo reutilizan mientras la escala no cambie.
+
+import os
+import threading
+import pytest
+
+ESCALA = {
+    'profesores': int(os.environ.get('PLANES_PROFESORES', 50)),
+    'estudiantes': int(os.environ.get('PLANES_ESTUDIANTES', 3000)),
+    'tareas': int(os.environ.get('PLANES_TAREAS', 1000)),
+    'densidad': float(os.environ.get('PLANES_DENSIDAD', 0.1))
+}
+
+def sembrar(conn):
+    """Genera el colegio sintético si falta o tiene otra escala y actualiza las estadísticas"""
+    from backend.estadisticas import reconstruir
+    from backend.planificador import CierreTareas
+    from benchmarks.generador import PREFIJO, generar, limpiar
+    
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT IFNULL(SUM(id LIKE %s), 0) AS profesores, IFNULL(SUM(id LIKE %s), 0) AS estudiantes
+        FROM usuarios WHERE id LIKE %s
+    """, (PREFIJO + 'P%', PREFIJO + 'E%', PREFIJO + '%'))
+    usuarios = cur.fetchone()
+    cur.execute("SELECT COUNT(*) AS tareas FROM tareas WHERE profesor_id LIKE %s", (PREFIJO + '%',))
+    tareas = cur.fetchone()['tareas']
+    
+    if ((int(usuarios['profesores']), int(usuarios['estudiantes'])) !=
+            (ESCALA['profesores'], ESCALA['estudiantes']) or tareas < ESCALA['tareas']):
+        limpiar(conn)
+        generar(conn, ESCALA['profesores'], ESCALA['estudiantes'], ESCALA['tareas'],
+                ESCALA['densidad'], semilla=42)
+        # Como en producción: las tareas vencidas ya las cerró el planificador
+        CierreTareas().cerrar_vencidas(conn, threading.Event())
+        reconstruir(conn)
+    
+    # Estadísticas al día para que EXPLAIN estime con la escala real
+    cur.execute("ANALYZE TABLE usuarios, estudiantes, tareas, entregas")
+    cur.fetchall()
+    cur.close()
+
+@pytest.fixture(scope='session')
+def conexion_mysql():
+    """Conexión directa al MySQL de configuracion.env, con el colegio sintético sembrado"""
+    MySQLdb = pytest.importorskip('MySQLdb')
+    from backend.config import Config
+    from backend.db import conectar
+    
+    try:
+        conn = conectar(Config)
+    except MySQLdb.OperationalError as e:
+        pytest.skip(f'MySQL no disponible: {e}')
+    
+    try:
+        cur = conn.cursor()
+        cur.execute("SHOW TABLES LIKE 'entregas'")
+        esquema = cur.fetchone()
+        cur.close()
+        if not esquema:
+            pytest.skip('La base de datos no tiene el esquema de BD.sql')
+        sembrar(conn)
+        yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,50 @@
+# ============================================
+# ANÁLISIS DE PLANES DE EJECUCIÓN (EXPLAIN FORMAT=JSON)
+# ============================================
+#
+# Recorre el plan de MySQL 8 y devuelve los problemas que superan los
+# umbrales acordados:
+#
+#   - Recorrido completo de una tabla (access_type ALL) o de un índice entero
+#     (index) que examina más de `escaneo` filas por recorrido.
+#   - Filesort o tabla temporal sobre más de `ordenamiento` filas (las filas
+#     que produce el join debajo de la operación).
+
+import json
+
+ACCESOS_COMPLETOS = {'ALL': 'recorrido completo', 'index': 'recorrido completo del índice'}
+OPERACIONES = (('using_filesort', 'filesort'), ('using_temporary_table', 'tabla temporal'))
+
+def _nodos(nodo):
+    """Todos los diccionarios del plan, en profundidad"""
+    if isinstance(nodo, dict):
+        yield nodo
+        for valor in nodo.values():
+            yield from _nodos(valor)
+    elif isinstance(nodo, list):
+        for valor in nodo:
+            yield from _nodos(valor)
+
+def _tablas(nodo):
+    return (n for n in _nodos(nodo) if 'access_type' in n)
+
+def problemas_plan(plan, escaneo, ordenamiento):
+    """Lista de problemas del plan (texto JSON o ya decodificado) que superan los umbrales"""
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    
+    problemas = []
+    for tabla in _tablas(plan):
+        filas = int(tabla.get('rows_examined_per_scan', 0))
+        if tabla['access_type'] in ACCESOS_COMPLETOS and filas > escaneo:
+            problemas.append(f"{ACCESOS_COMPLETOS[tabla['access_type']]} de "
+                            f"{tabla.get('table_name', '?')} ({filas} filas por recorrido)")
+    
+    for nodo in _nodos(plan):
+        for clave, nombre in OPERACIONES:
+            if not nodo.get(clave):
+                continue
+            filas = max((int(t.get('rows_produced_per_join', 0)) for t in _tablas(nodo)), default=0)
+            if filas > ordenamiento:
+                problemas.append(f"{nombre} sobre ~{filas} filas")
+    return problemas
@@ -0,0 +1,68 @@
+# ============================================
+# PRUEBAS: ÚLTIMO ACCESO CON ESCRITURA DIFERIDA
+# ============================================
+
+import pytest
+from backend.accesos import BufferAccesos
+
+class ConexionFalsa:
+    def __init__(self, error=None):
+        self.error = error
+        self.sentencias = []
+        self.commits = 0
+        self.rollbacks = 0
+    
+    def cursor(self):
+        conexion = self
+        
+        class Cursor:
+            def execute(self, sql, parametros):
+                if conexion.error is not None:
+                    raise conexion.error
+                conexion.sentencias.append((' '.join(sql.split()), parametros))
+            
+            def close(self):
+                pass
+        return Cursor()
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        self.rollbacks += 1
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [500.0]
+    monkeypatch.setattr('backend.accesos.time.monotonic', lambda: ahora[0])
+    return ahora
+
+def test_vaciar_usa_el_reloj_de_la_base_de_datos(reloj):
+    buffer = BufferAccesos(maximo=10)
+    buffer.registrar('EST002')
+    reloj[0] += 3
+    buffer.registrar('EST001')
+    buffer.registrar('EST002')   # Solo cuenta el último acceso
+    reloj[0] += 2
+    conexion = ConexionFalsa()
+    
+    assert buffer.vaciar(conexion) == 2
+    sql, parametros = conexion.sentencias[0]
+    assert 'NOW() - INTERVAL %s SECOND' in sql
+    assert parametros == ['EST001', 2, 'EST002', 2, 'EST001', 'EST002']
+    assert conexion.commits == 1
+    assert buffer.vaciar(conexion) == 0
+
+def test_un_error_devuelve_los_accesos_sin_pisar_los_nuevos(reloj):
+    buffer = BufferAccesos(maximo=10)
+    buffer.registrar('EST001')
+    
+    with pytest.raises(RuntimeError):
+        buffer.vaciar(ConexionFalsa(error=RuntimeError('sin conexión')))
+    reloj[0] += 4
+    buffer.registrar('EST002')
+    
+    conexion = ConexionFalsa()
+    assert buffer.vaciar(conexion) == 2
+    assert conexion.sentencias[0][1][:4] == ['EST001', 4, 'EST002', 0]
+    assert buffer.estadisticas()['errores'] == 1
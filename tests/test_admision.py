@@ -0,0 +1,151 @@
+# ============================================
+# PRUEBAS: CONTROL DE ADMISIÓN Y LÍMITES DE TASA
+# ============================================
+#
+# Cubetas de tokens con un reloj falso, turnos de concurrencia y el
+# decorador controlar_admision sobre una aplicación Flask mínima.
+
+import threading
+import pytest
+from flask import Flask, jsonify
+from backend.admision import (
+    ControlAdmision, LimitadorTasa, controlar_admision, leer_limite, respuesta_saturado
+)
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr('backend.admision.time.monotonic', lambda: ahora[0])
+    return ahora
+
+def test_leer_limite():
+    assert leer_limite('30/60') == (30, 60.0)
+    assert leer_limite('5') == (5, 1.0)
+    assert leer_limite('none') is None
+    assert leer_limite('') is None
+
+# ============================================
+# LimitadorTasa
+# ============================================
+
+def test_rafaga_y_espera_hasta_la_proxima_ficha(reloj):
+    limitador = LimitadorTasa(3, 60)   # Una ficha cada 20 s
+    
+    assert [limitador.consumir('1.2.3.4') for _ in range(3)] == [0, 0, 0]
+    assert limitador.consumir('1.2.3.4') == pytest.approx(20)
+    # Cada clave tiene su propia cubeta
+    assert limitador.consumir('5.6.7.8') == 0
+
+def test_las_fichas_se_reponen_con_el_tiempo_sin_pasar_la_capacidad(reloj):
+    limitador = LimitadorTasa(2, 10)   # Una ficha cada 5 s
+    limitador.consumir('ip')
+    limitador.consumir('ip')
+    
+    reloj[0] += 5
+    assert limitador.consumir('ip') == 0
+    assert limitador.consumir('ip') == pytest.approx(5)
+    
+    reloj[0] += 3600
+    # Tras una hora sigue habiendo solo `capacidad` fichas
+    assert [limitador.consumir('ip') for _ in range(2)] == [0, 0]
+    assert limitador.consumir('ip') == pytest.approx(5)
+
+def test_max_claves_olvida_la_cubeta_menos_reciente(reloj):
+    limitador = LimitadorTasa(1, 60, max_claves=2)
+    limitador.consumir('a')
+    limitador.consumir('b')
+    assert limitador.consumir('a') > 0   # 'a' vuelve a ser la más reciente
+    limitador.consumir('c')
+    
+    assert limitador.claves() == 2
+    assert limitador.consumir('b') == 0   # Olvidada: vuelve llena
+    assert limitador.consumir('c') > 0
+
+# ============================================
+# ControlAdmision
+# ============================================
+
+def test_verificar_tasa_aplica_el_limite_mas_estricto(reloj):
+    control = ControlAdmision({'login': {'ip': (5, 60), 'usuario': (1, 60)}})
+    
+    assert control.verificar_tasa('login', '1.2.3.4', 'EST001') == 0
+    assert control.verificar_tasa('login', '1.2.3.4', 'EST001') == pytest.approx(60)
+    assert control.verificar_tasa('login', '1.2.3.4', 'EST002') == 0
+    # Las clases sin límites configurados no se frenan
+    assert control.verificar_tasa('registro', '1.2.3.4', 'EST001') == 0
+    assert control.estadisticas()['rechazadas_tasa'] == 1
+
+def test_tomar_turno_rechaza_tras_la_espera():
+    control = ControlAdmision({}, concurrencia=1, espera=0.01)
+    
+    assert control.tomar_turno()
+    assert not control.tomar_turno()
+    control.liberar_turno()
+    assert control.tomar_turno()
+    control.liberar_turno()
+    
+    estadisticas = control.estadisticas()
+    assert estadisticas['admitidas'] == 2
+    assert estadisticas['encoladas'] == 1
+    assert estadisticas['rechazadas_concurrencia'] == 1
+    assert estadisticas['en_espera'] == 0
+
+def test_admitidas_no_pierde_cuentas_entre_hilos():
+    control = ControlAdmision({}, concurrencia=4, espera=5)
+    
+    def pedir():
+        for _ in range(500):
+            if control.tomar_turno():
+                control.liberar_turno()
+    
+    hilos = [threading.Thread(target=pedir) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    assert control.estadisticas()['admitidas'] == 8 * 500
+
+# ============================================
+# controlar_admision
+# ============================================
+
+def test_controlar_admision_responde_429_con_retry_after(reloj, monkeypatch):
+    control = ControlAdmision({'login': {'ip': (2, 60), 'usuario': None}})
+    monkeypatch.setattr('backend.admision.control_admision', control)
+    app = Flask(__name__)
+    
+    @app.route('/login', methods=['POST'])
+    @controlar_admision('login')
+    def login():
+        return jsonify({'exito': True})
+    
+    cliente = app.test_client()
+    assert [cliente.post('/login', json={'id': 'EST001'}).status_code for _ in range(2)] == [200, 200]
+    
+    respuesta = cliente.post('/login', json={'id': 'EST001'})
+    assert respuesta.status_code == 429
+    assert respuesta.headers['Retry-After'] == '30'
+    assert respuesta.get_json()['exito'] is False
+    assert control.estadisticas()['admitidas'] == 2
+
+def test_controlar_admision_con_cuerpo_csv_y_reporte_parcial(reloj, monkeypatch):
+    control = ControlAdmision({'registro': {'ip': (1, 60), 'usuario': (1, 60)}})
+    monkeypatch.setattr('backend.admision.control_admision', control)
+    app = Flask(__name__)
+    
+    @app.route('/lote', methods=['POST'])
+    @controlar_admision('registro')
+    def lote():
+        return respuesta_saturado(1, 'Servidor ocupado en la fila 501', insertadas=500)
+    
+    cliente = app.test_client()
+    # Un CSV no tiene `id`: solo aplica el límite por IP
+    respuesta = cliente.post('/lote', data='id,nombres\n', content_type='text/csv')
+    assert respuesta.status_code == 429
+    assert respuesta.headers['Retry-After'] == '1'
+    assert respuesta.get_json() == {'exito': False, 'mensaje': 'Servidor ocupado en la fila 501',
+                                    'insertadas': 500}
+    
+    assert cliente.post('/lote', data='id,nombres\n', content_type='text/csv').headers['Retry-After'] == '60'
+    assert control.estadisticas()['rechazadas_tasa'] == 1
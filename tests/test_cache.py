@@ -0,0 +1,122 @@
+# ============================================
+# PRUEBAS: CACHÉ DE RESPUESTAS Y ETAGS
+# ============================================
+#
+# CacheRespuestas (versiones por ámbito, LRU y TTL) y el decorador
+# respuesta_cacheada con If-None-Match, sobre una aplicación Flask mínima.
+
+import pytest
+from flask import Flask, g, jsonify
+from backend.cache import CacheRespuestas, cache_respuestas, respuesta_cacheada
+
+# ============================================
+# CacheRespuestas
+# ============================================
+
+def test_invalidar_incrementa_solo_la_version_del_ambito():
+    cache = CacheRespuestas()
+    cache.invalidar('estudiante', 'EST001')
+    cache.invalidar('estudiante', 'EST001')
+    
+    assert cache.version('estudiante', 'EST001') == 2
+    assert cache.version('estudiante', 'EST002') == 0
+    assert cache.version('tareas') == 0
+    assert cache.estadisticas()['invalidaciones'] == 2
+
+def test_expulsa_la_entrada_menos_usada():
+    cache = CacheRespuestas(capacidad=2)
+    cache.guardar('a', 'etag-a', b'a')
+    cache.guardar('b', 'etag-b', b'b')
+    assert cache.obtener('a') == ('etag-a', b'a')   # 'b' pasa a ser la menos usada
+    cache.guardar('c', 'etag-c', b'c')
+    
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') is not None and cache.obtener('c') is not None
+    assert cache.estadisticas()['expulsiones'] == 1
+
+def test_las_entradas_caducan_con_el_ttl(monkeypatch):
+    ahora = [100.0]
+    monkeypatch.setattr('backend.cache.time.monotonic', lambda: ahora[0])
+    cache = CacheRespuestas(ttl=10)
+    cache.guardar('clave', 'etag', b'{}')
+    
+    ahora[0] += 9
+    assert cache.obtener('clave') == ('etag', b'{}')
+    ahora[0] += 2
+    assert cache.obtener('clave') is None
+
+def test_capacidad_cero_desactiva_la_cache():
+    cache = CacheRespuestas(capacidad=0)
+    cache.guardar('clave', 'etag', b'{}')
+    assert cache.obtener('clave') is None
+
+# ============================================
+# respuesta_cacheada
+# ============================================
+
+@pytest.fixture
+def cliente():
+    cache_respuestas.limpiar()
+    app = Flask(__name__)
+    llamadas = []
+    
+    @app.route('/listado')
+    @respuesta_cacheada(lambda usuario: [('estudiante', usuario['usuario_id'])])
+    def listado():
+        llamadas.append(1)
+        return jsonify({'exito': True, 'llamada': len(llamadas)})
+    
+    @app.route('/error')
+    @respuesta_cacheada(lambda usuario: [])
+    def error():
+        llamadas.append(1)
+        return jsonify({'exito': False}), 500
+    
+    @app.before_request
+    def autenticar():
+        g.usuario = {'usuario_id': 'EST001', 'tipo': 'estudiante'}
+    
+    cliente = app.test_client()
+    cliente.llamadas = llamadas
+    yield cliente
+    cache_respuestas.limpiar()
+
+def test_acierto_no_vuelve_a_ejecutar_la_ruta(cliente):
+    primera = cliente.get('/listado')
+    segunda = cliente.get('/listado')
+    
+    assert primera.status_code == segunda.status_code == 200
+    assert primera.get_json() == segunda.get_json() == {'exito': True, 'llamada': 1}
+    assert primera.headers['ETag'] == segunda.headers['ETag']
+    assert primera.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Authorization' in primera.headers['Vary']
+    assert len(cliente.llamadas) == 1
+
+def test_if_none_match_con_el_etag_vigente_responde_304(cliente):
+    etag = cliente.get('/listado').headers['ETag']
+    respuesta = cliente.get('/listado', headers={'If-None-Match': etag})
+    
+    assert respuesta.status_code == 304
+    assert respuesta.get_data() == b''
+    assert respuesta.headers['ETag'] == etag
+    assert cliente.get('/listado', headers={'If-None-Match': '"otro"'}).status_code == 200
+
+def test_invalidar_el_ambito_cambia_el_etag(cliente):
+    etag = cliente.get('/listado').headers['ETag']
+    cache_respuestas.invalidar('estudiante', 'EST001')
+    respuesta = cliente.get('/listado', headers={'If-None-Match': etag})
+    
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['llamada'] == 2
+    assert respuesta.headers['ETag'] != etag
+
+def test_invalidar_otro_usuario_no_afecta(cliente):
+    etag = cliente.get('/listado').headers['ETag']
+    cache_respuestas.invalidar('estudiante', 'EST002')
+    assert cliente.get('/listado', headers={'If-None-Match': etag}).status_code == 304
+
+def test_las_respuestas_con_error_no_se_cachean(cliente):
+    assert cliente.get('/error').status_code == 500
+    assert cliente.get('/error').status_code == 500
+    assert 'ETag' not in cliente.get('/error').headers
+    assert len(cliente.llamadas) == 3
@@ -0,0 +1,259 @@
+# ============================================
+# PRUEBAS: CALIFICACIONES (SIN BASE DE DATOS)
+# ============================================
+#
+# Validación de las notas y rutas de calificación contra una conexión
+# falsa que registra las sentencias y responde lo que cada prueba indique.
+# No necesitan servidor MySQL, pero sí el paquete MySQLdb (IntegrityError).
+
+import pytest
+
+MySQLdb = pytest.importorskip('MySQLdb')
+
+from flask import Flask
+from backend.cache import cache_respuestas
+from backend.calificaciones_routes import init_calificaciones_routes, validar_calificacion
+from backend.utils import generar_token
+
+SECRET_KEY = 'clave-de-pruebas'
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.rowcount = 0
+        self._filas = []
+    
+    def execute(self, sql, parametros=None):
+        self.conexion.sentencias.append((' '.join(sql.split()), parametros))
+        self._filas, self.rowcount = self.conexion.responder(sql, parametros or ())
+    
+    def fetchall(self):
+        return self._filas
+    
+    def fetchone(self):
+        return self._filas[0] if self._filas else None
+    
+    def close(self):
+        pass
+
+class ConexionFalsa:
+    """Conexión que registra sentencias, commits y rollbacks"""
+    
+    def __init__(self, tareas_disponibles=None, error_escritura=None, error_ranking=None,
+                filas_afectadas=None, profesor_tareas='PROF01'):
+        self.tareas_disponibles = tareas_disponibles
+        self.profesor_tareas = profesor_tareas
+        self.filas_afectadas = filas_afectadas
+        self.error_escritura = error_escritura
+        self.error_ranking = error_ranking
+        self.sentencias = []
+        self.commits = 0
+        self.rollbacks = 0
+    
+    def disponible(self, tarea_id, profesor_id):
+        """Tarea no eliminada y del profesor que califica"""
+        return profesor_id == self.profesor_tareas and (
+            self.tareas_disponibles is None or str(tarea_id) in self.tareas_disponibles)
+    
+    def responder(self, sql, parametros):
+        # El profesor que califica es siempre el último parámetro
+        if sql.lstrip().startswith('SELECT id FROM tareas'):
+            disponibles = [p for p in parametros[:-1] if self.disponible(p, parametros[-1])]
+            return [{'id': int(p)} for p in disponibles], len(disponibles)
+        if 'FROM estudiantes e' in sql and self.error_ranking is not None:
+            raise self.error_ranking
+        if sql.lstrip().startswith('INSERT'):
+            if self.error_escritura is not None:
+                raise self.error_escritura
+            if self.filas_afectadas is not None:
+                return [], self.filas_afectadas
+            # El JOIN con tareas omite las filas de tareas no disponibles
+            return [], sum(self.disponible(t, parametros[-1]) for t in parametros[:-1:4])
+        return [], 0
+    
+    def cursor(self):
+        return CursorFalso(self)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        self.rollbacks += 1
+    
+    def escrituras(self):
+        return [sql for sql, _ in self.sentencias if sql.startswith('INSERT INTO entregas')]
+
+class BaseDatosFalsa:
+    def __init__(self, conexion):
+        self.connection = conexion
+
+@pytest.fixture
+def crear_cliente():
+    cache_respuestas.limpiar()
+    
+    def crear(conexion):
+        app = Flask(__name__)
+        app.config.update(SECRET_KEY=SECRET_KEY, LOTE_MAXIMO_CALIFICACIONES=3)
+        app.register_blueprint(init_calificaciones_routes(BaseDatosFalsa(conexion), app),
+                            url_prefix='/api/calificaciones')
+        cliente = app.test_client()
+        token = generar_token('PROF01', 'profesor', SECRET_KEY, 1)
+        cliente.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        return cliente
+    return crear
+
+def calificacion(tarea_id=1, estudiante_id='EST001', nota=18):
+    return {'tarea_id': tarea_id, 'estudiante_id': estudiante_id, 'nota': nota, 'comentario': 'Bien'}
+
+# ============================================
+# VALIDACIÓN
+# ============================================
+
+@pytest.mark.parametrize('datos, mensaje', [
+    (None, 'Formato de calificación inválido'),
+    ([1, 2], 'Formato de calificación inválido'),
+    ({'estudiante_id': 'EST001', 'nota': 10}, 'Campo requerido: tarea_id'),
+    ({'tarea_id': 1, 'estudiante_id': '', 'nota': 10}, 'Campo requerido: estudiante_id'),
+    ({'tarea_id': 1, 'estudiante_id': 'EST001'}, 'Campo requerido: nota'),
+    ({'tarea_id': 1, 'estudiante_id': 'EST001', 'nota': 'diez'}, 'Nota debe ser un número'),
+    ({'tarea_id': 1, 'estudiante_id': 'EST001', 'nota': -0.5}, 'Nota debe estar entre 0 y 20'),
+    ({'tarea_id': 1, 'estudiante_id': 'EST001', 'nota': 20.01}, 'Nota debe estar entre 0 y 20')
+])
+def test_validar_calificacion_rechaza(datos, mensaje):
+    assert validar_calificacion(datos) == mensaje
+
+@pytest.mark.parametrize('nota', [0, 20, '15.5', 12.25])
+def test_validar_calificacion_acepta_los_extremos(nota):
+    assert validar_calificacion(calificacion(nota=nota)) is None
+
+# ============================================
+# RUTAS
+# ============================================
+
+def test_calificacion_usa_un_solo_upsert_con_tabla_derivada(crear_cliente):
+    conexion = ConexionFalsa()
+    respuesta = crear_cliente(conexion).post('/api/calificaciones', json=calificacion())
+    
+    assert respuesta.status_code == 200
+    assert conexion.commits == 1
+    escrituras = conexion.escrituras()
+    assert len(escrituras) == 1
+    assert 'AS nueva' in escrituras[0] and 'VALUES(' not in escrituras[0]
+    # Sin VALUES ROW() ni alias de fila: también corre en MariaDB
+    assert 'ROW(' not in escrituras[0] and 'UNION ALL' not in escrituras[0]
+    # La tarea se comprueba dentro del upsert, sin consultar tareas antes ni después
+    assert conexion.sentencias[0][0] == escrituras[0]
+    assert not any(sql.startswith('SELECT id FROM tareas') for sql, _ in conexion.sentencias)
+    assert 't.profesor_id = %s' in escrituras[0]
+    assert conexion.sentencias[0][1][-1] == 'PROF01'
+
+def test_calificar_tarea_eliminada_responde_404(crear_cliente):
+    conexion = ConexionFalsa(tareas_disponibles={'2'})
+    respuesta = crear_cliente(conexion).post('/api/calificaciones', json=calificacion(tarea_id=1))
+    
+    assert respuesta.status_code == 404
+    assert respuesta.get_json()['mensaje'] == 'Tarea no encontrada'
+    assert conexion.rollbacks == 1
+    assert conexion.commits == 0
+
+def test_calificar_tarea_de_otro_profesor_responde_404(crear_cliente):
+    conexion = ConexionFalsa(profesor_tareas='PROF02')
+    cliente = crear_cliente(conexion)
+    versiones = cache_respuestas.version('estudiante', 'EST001')
+    
+    assert cliente.post('/api/calificaciones', json=calificacion()).status_code == 404
+    lote = cliente.post('/api/calificaciones/lote', json=[calificacion(1), calificacion(2)])
+    assert lote.status_code == 400
+    assert [r['mensaje'] for r in lote.get_json()['resultados']] == ['Tarea no encontrada'] * 2
+    assert conexion.commits == 0 and conexion.rollbacks == 2
+    assert cache_respuestas.version('estudiante', 'EST001') == versiones
+
+def test_repetir_la_misma_nota_sin_cambios_no_es_404(crear_cliente):
+    conexion = ConexionFalsa(filas_afectadas=0)
+    respuesta = crear_cliente(conexion).post('/api/calificaciones', json=calificacion())
+    
+    assert respuesta.status_code == 200
+    assert conexion.commits == 1
+
+def test_lote_devuelve_un_resultado_por_fila(crear_cliente):
+    conexion = ConexionFalsa()
+    lote = [calificacion(1, 'EST001', 18), calificacion(2, 'EST002', 11.5)]
+    respuesta = crear_cliente(conexion).post('/api/calificaciones/lote', json={'calificaciones': lote})
+    
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos['exito'] is True
+    assert [(r['indice'], r['tarea_id'], r['estudiante_id'], r['exito']) for r in datos['resultados']] == [
+        (0, 1, 'EST001', True), (1, 2, 'EST002', True)]
+    # Todo el lote en una sola sentencia y una sola transacción
+    assert len(conexion.escrituras()) == 1
+    assert conexion.escrituras()[0].count('UNION ALL SELECT %s, %s, %s, %s') == 1
+    assert conexion.commits == 1
+
+def test_lote_con_tareas_eliminadas_informa_cada_fila(crear_cliente):
+    conexion = ConexionFalsa(tareas_disponibles={'1'})
+    lote = [calificacion(1, 'EST001'), calificacion(2, 'EST001'), calificacion(1, 'EST002')]
+    respuesta = crear_cliente(conexion).post('/api/calificaciones/lote', json=lote)
+    
+    assert respuesta.status_code == 400
+    datos = respuesta.get_json()
+    assert datos['mensaje'] == 'Lote rechazado: hay tareas inexistentes o eliminadas'
+    assert [r['exito'] for r in datos['resultados']] == [True, False, True]
+    assert datos['resultados'][1]['mensaje'] == 'Tarea no encontrada'
+    # Escribe primero y comprueba después, en la misma transacción, que se descarta
+    assert conexion.sentencias[0][0].startswith('INSERT INTO entregas')
+    assert conexion.rollbacks == 1
+    assert conexion.commits == 0
+
+def test_lote_con_filas_invalidas_no_escribe(crear_cliente):
+    conexion = ConexionFalsa()
+    lote = [calificacion(nota=18), calificacion(nota=25), {'tarea_id': 1}]
+    respuesta = crear_cliente(conexion).post('/api/calificaciones/lote', json=lote)
+    
+    assert respuesta.status_code == 400
+    resultados = respuesta.get_json()['resultados']
+    assert [r['exito'] for r in resultados] == [True, False, False]
+    assert resultados[1]['mensaje'] == 'Nota debe estar entre 0 y 20'
+    assert resultados[2]['mensaje'] == 'Campo requerido: estudiante_id'
+    assert conexion.escrituras() == []
+
+def test_lote_vacio_o_demasiado_grande(crear_cliente):
+    cliente = crear_cliente(ConexionFalsa())
+    assert cliente.post('/api/calificaciones/lote', json={'calificaciones': []}).status_code == 400
+    assert cliente.post('/api/calificaciones/lote', json=[calificacion()] * 4).status_code == 400
+
+def test_lote_con_estudiante_inexistente_hace_rollback(crear_cliente):
+    conexion = ConexionFalsa(error_escritura=MySQLdb.IntegrityError(1452, 'Cannot add or update a child row'))
+    respuesta = crear_cliente(conexion).post('/api/calificaciones/lote', json=[calificacion()])
+    
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['mensaje'] == 'Lote rechazado: tarea o estudiante inexistente'
+    assert conexion.rollbacks == 1
+    assert conexion.commits == 0
+
+def test_calificar_requiere_profesor(crear_cliente):
+    cliente = crear_cliente(ConexionFalsa())
+    token = generar_token('EST001', 'estudiante', SECRET_KEY, 1)
+    respuesta = cliente.post('/api/calificaciones', json=calificacion(),
+                            headers={'Authorization': f'Bearer {token}'})
+    assert respuesta.status_code == 403
+
+def test_calificar_invalida_la_cache_del_profesor_y_del_estudiante(crear_cliente):
+    conexion = ConexionFalsa()
+    versiones = (cache_respuestas.version('profesor', 'PROF01'),
+                cache_respuestas.version('estudiante', 'EST001'))
+    crear_cliente(conexion).post('/api/calificaciones', json=calificacion())
+    
+    assert cache_respuestas.version('profesor', 'PROF01') == versiones[0] + 1
+    assert cache_respuestas.version('estudiante', 'EST001') == versiones[1] + 1
+    # El profesor es el del token (el upsert lo exige): no se consulta la tabla tareas
+    assert not any(sql.startswith('SELECT') and 'FROM tareas' in sql for sql, _ in conexion.sentencias)
+
+def test_un_fallo_despues_del_commit_no_devuelve_500(crear_cliente):
+    conexion = ConexionFalsa(error_ranking=MySQLdb.OperationalError(2013, 'Lost connection'))
+    cliente = crear_cliente(conexion)
+    
+    assert cliente.post('/api/calificaciones', json=calificacion()).status_code == 200
+    assert cliente.post('/api/calificaciones/lote', json=[calificacion()]).status_code == 200
+    assert conexion.commits == 2
+    assert conexion.rollbacks == 0
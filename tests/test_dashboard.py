@@ -0,0 +1,167 @@
+# ============================================
+# PRUEBAS: DASHBOARD DEL ESTUDIANTE (SIN BASE DE DATOS)
+# ============================================
+#
+# resumir_dashboard sobre las filas que devolvería SQL_DASHBOARD_ESTUDIANTE,
+# armadas por una conexión falsa a partir de tareas y entregas en memoria:
+# solo las tareas activas salen como filas, y el contador y los agregados
+# del estudiante se repiten en cada una.
+
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from flask import Flask
+from backend.cache import cache_respuestas
+from backend.dashboard_routes import PROXIMAS_ENTREGAS, init_dashboard_routes, resumir_dashboard
+from backend.utils import generar_token
+
+SECRET_KEY = 'clave-de-pruebas'
+HOY = date(2026, 10, 18)
+
+def tarea(tarea_id, dias, estado='activa'):
+    return {'id': tarea_id, 'titulo': f'Tarea {tarea_id}', 'descripcion': '', 'curso': 'Matemática',
+            'tipo': 'tarea', 'fecha_entrega': HOY + timedelta(days=dias), 'puntos': 20,
+            'estado': estado, 'profesor_id': 'PROF01'}
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self._filas = []
+    
+    def execute(self, sql, parametros=None):
+        self.conexion.sentencias.append((' '.join(sql.split()), parametros))
+        self._filas = self.conexion.filas()
+    
+    def fetchall(self):
+        return self._filas
+    
+    def close(self):
+        pass
+
+class ConexionFalsa:
+    """Arma las filas del dashboard como lo haría la consulta"""
+    
+    def __init__(self, tareas=(), notas=None):
+        self.tareas = list(tareas)
+        self.notas = notas or {}   # tarea_id -> nota del estudiante (None: entregada sin calificar)
+        self.sentencias = []
+    
+    def filas(self):
+        # contadores.total_tareas cuenta las tareas no eliminadas; agregados_estudiante,
+        # las notas del estudiante en cualquier tarea
+        calificadas = [n for n in self.notas.values() if n is not None]
+        constantes = {'total_tareas': sum(t['estado'] != 'eliminada' for t in self.tareas),
+                    'calificadas': len(calificadas),
+                    'suma_notas': sum(calificadas, Decimal(0))}
+        activas = sorted((t for t in self.tareas if t['estado'] == 'activa'),
+                        key=lambda t: (t['fecha_entrega'], t['id']))
+        if not activas:
+            # LEFT JOIN sin tareas activas: una fila con las columnas de la tarea en NULL
+            return [dict(constantes, **{clave: None for clave in tarea(0, 0)},
+                        nota=None, dias_restantes=None)]
+        
+        filas = []
+        for t in activas:
+            entregada = t['id'] in self.notas
+            filas.append(dict(constantes, **t, profesor_nombres='Carlos', profesor_apellidos='Ruiz',
+                            nota=self.notas.get(t['id']),
+                            comentario='Bien' if entregada else None,
+                            estado_entrega='calificada' if self.notas.get(t['id']) is not None
+                            else ('pendiente' if entregada else None),
+                            dias_restantes=(t['fecha_entrega'] - HOY).days))
+        return filas
+    
+    def cursor(self):
+        return CursorFalso(self)
+
+class BaseDatosFalsa:
+    def __init__(self, conexion):
+        self.connection = conexion
+
+# ============================================
+# resumir_dashboard
+# ============================================
+
+def test_estudiante_sin_tareas_ni_notas():
+    dashboard = resumir_dashboard(ConexionFalsa().filas())
+    
+    assert dashboard == {
+        'tareas': [],
+        'estadisticas': {'total_tareas': 0, 'activas': 0, 'pendientes': 0,
+                        'calificadas': 0, 'promedio': 0},
+        'proximas_entregas': []
+    }
+
+def test_tareas_sin_calificar_y_calificadas():
+    conexion = ConexionFalsa([tarea(1, -2), tarea(2, 0), tarea(3, 4), tarea(4, 1)],
+                            notas={3: Decimal('18.00'), 4: Decimal('15.50'), 2: None})
+    dashboard = resumir_dashboard(conexion.filas())
+    
+    assert [t['id'] for t in dashboard['tareas']] == [1, 2, 4, 3]
+    assert dashboard['estadisticas'] == {'total_tareas': 4, 'activas': 4, 'pendientes': 2,
+                                        'calificadas': 2, 'promedio': 16.75}
+    # Solo las pendientes sin vencer; la que vence hoy cuenta, la vencida no
+    assert [p['id'] for p in dashboard['proximas_entregas']] == [2]
+    assert set(dashboard['proximas_entregas'][0]) == {
+        'id', 'titulo', 'curso', 'tipo', 'fecha_entrega', 'dias_restantes'}
+    # Las columnas de los agregados no se repiten en cada tarea
+    assert not {'total_tareas', 'calificadas', 'suma_notas'} & set(dashboard['tareas'][0])
+
+def test_proximas_entregas_en_orden_y_acotadas():
+    conexion = ConexionFalsa([tarea(i, dias) for i, dias in enumerate([9, 3, 7, 1, 5, 8, 2, 6], 1)])
+    dashboard = resumir_dashboard(conexion.filas())
+    
+    proximas = dashboard['proximas_entregas']
+    assert len(proximas) == PROXIMAS_ENTREGAS
+    assert [p['dias_restantes'] for p in proximas] == [1, 2, 3, 5, 6]
+    assert dashboard['estadisticas']['pendientes'] == 8
+
+def test_tareas_cerradas_y_eliminadas_no_se_listan():
+    conexion = ConexionFalsa([tarea(1, 3), tarea(2, -10, 'cerrada'), tarea(3, 5, 'eliminada')],
+                            notas={2: Decimal('12.00'), 1: Decimal('17.00')})
+    dashboard = resumir_dashboard(conexion.filas())
+    
+    assert [t['id'] for t in dashboard['tareas']] == [1]
+    # La cerrada sigue contando en el total y su nota en el promedio; la eliminada no cuenta
+    assert dashboard['estadisticas'] == {'total_tareas': 2, 'activas': 1, 'pendientes': 0,
+                                        'calificadas': 2, 'promedio': 14.5}
+    assert dashboard['proximas_entregas'] == []
+
+def test_solo_tareas_cerradas_con_notas():
+    conexion = ConexionFalsa([tarea(1, -5, 'cerrada'), tarea(2, -3, 'cerrada')],
+                            notas={1: Decimal('11.00'), 2: Decimal('14.34')})
+    dashboard = resumir_dashboard(conexion.filas())
+    
+    assert dashboard['tareas'] == []
+    assert dashboard['estadisticas'] == {'total_tareas': 2, 'activas': 0, 'pendientes': 0,
+                                        'calificadas': 2, 'promedio': 12.67}
+
+# ============================================
+# RUTA
+# ============================================
+
+@pytest.fixture
+def cliente():
+    cache_respuestas.limpiar()
+    conexion = ConexionFalsa([tarea(1, 2), tarea(2, 6)], notas={2: Decimal('19.00')})
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY=SECRET_KEY)
+    app.register_blueprint(init_dashboard_routes(BaseDatosFalsa(conexion), app),
+                        url_prefix='/api/dashboard')
+    cliente = app.test_client()
+    token = generar_token('EST001', 'estudiante', SECRET_KEY, 1)
+    cliente.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    cliente.conexion = conexion
+    yield cliente
+    cache_respuestas.limpiar()
+
+def test_dashboard_del_estudiante_en_una_consulta(cliente):
+    respuesta = cliente.get('/api/dashboard/estudiante')
+    
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos['exito'] is True
+    assert datos['estadisticas'] == {'total_tareas': 2, 'activas': 2, 'pendientes': 1,
+                                    'calificadas': 1, 'promedio': 19.0}
+    assert [p['id'] for p in datos['proximas_entregas']] == [1]
+    assert [parametros for _, parametros in cliente.conexion.sentencias] == [('EST001', 'EST001')]
@@ -0,0 +1,140 @@
+# ============================================
+# PRUEBAS: POOL DE CONEXIONES Y RÉPLICAS
+# ============================================
+#
+# Conexiones falsas en lugar de MySQLdb.connect: un cursor que pierde el
+# servidor a mitad de la petición debe expulsar la réplica aunque la ruta
+# capture la excepción.
+
+import threading
+import pytest
+
+MySQLdb = pytest.importorskip('MySQLdb')
+
+from flask import Flask, jsonify
+from backend.config import Config
+from backend.db import BaseDatos, es_fallo_de_servidor
+from backend.metricas import CursorInstrumentado
+
+class CursorBase:
+    rowcount = -1
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def execute(self, query, args=None):
+        if self.connection.error is not None:
+            raise self.connection.error
+        self.rowcount = 1
+    
+    def executemany(self, query, args):
+        return self.execute(query)
+    
+    def fetchall(self):
+        return [{'ok': 1}]
+    
+    def close(self):
+        pass
+
+class CursorFalso(CursorInstrumentado, CursorBase):
+    pass
+
+class ConexionFalsa:
+    def __init__(self, host):
+        self.host = host
+        self.error = None
+        self.cerrada = False
+    
+    def cursor(self):
+        return CursorFalso(self)
+    
+    def ping(self):
+        pass
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        self.cerrada = True
+
+@pytest.fixture
+def servidores(monkeypatch):
+    abiertas = []
+    
+    def conectar(**parametros):
+        conexion = ConexionFalsa(parametros['host'])
+        abiertas.append(conexion)
+        return conexion
+    
+    monkeypatch.setattr('backend.db.MySQLdb.connect', conectar)
+    return abiertas
+
+def crear_app(error=None):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(MYSQL_HOST='primaria', MYSQL_REPLICAS='replica1', POOL_PRE_PING=False)
+    db = BaseDatos(app)
+    
+    @app.route('/lectura')
+    def lectura():
+        try:
+            conexion = db.connection
+            conexion.error = error
+            cur = conexion.cursor()
+            cur.execute('SELECT 1')
+            return jsonify({'exito': True, 'filas': cur.fetchall()})
+        except Exception as e:
+            return jsonify({'exito': False, 'mensaje': str(e)}), 500
+    
+    return app, db
+
+def test_es_fallo_de_servidor():
+    assert es_fallo_de_servidor(MySQLdb.OperationalError(2013, 'Lost connection'))
+    assert es_fallo_de_servidor(MySQLdb.OperationalError(4031, 'Disconnected by the server'))
+    # Un bloqueo o un timeout de espera no invalidan la conexión
+    assert not es_fallo_de_servidor(MySQLdb.OperationalError(1205, 'Lock wait timeout'))
+    assert not es_fallo_de_servidor(MySQLdb.ProgrammingError(1064, 'Syntax error'))
+    assert not es_fallo_de_servidor(None)
+
+def test_fallo_capturado_por_la_ruta_expulsa_la_replica(servidores):
+    app, db = crear_app(error=MySQLdb.OperationalError(2013, 'Lost connection'))
+    
+    respuesta = app.test_client().get('/lectura')
+    assert respuesta.status_code == 500
+    
+    replica = [c for c in servidores if c.host == 'replica1']
+    assert len(replica) == 1 and replica[0].cerrada
+    estadisticas = db.estadisticas_replicas()
+    assert estadisticas['expulsiones'] == 1
+    assert estadisticas['disponibles'] == 0
+    # La siguiente lectura va a la primaria mientras dura la expulsión
+    app.test_client().get('/lectura')
+    assert db.estadisticas_replicas()['sin_replica'] == 1
+
+def test_error_de_la_consulta_no_expulsa_la_replica(servidores):
+    app, db = crear_app(error=MySQLdb.OperationalError(1205, 'Lock wait timeout'))
+    
+    assert app.test_client().get('/lectura').status_code == 500
+    assert db.estadisticas_replicas()['expulsiones'] == 0
+    assert not any(c.cerrada for c in servidores)
+    
+    # La conexión vuelve al pool sin la marca del fallo anterior
+    conexion = db.replicas.pools[0]._inactivas[0]
+    assert conexion.fallo_operacional is None
+
+def test_contadores_no_pierden_cuentas_entre_hilos(servidores):
+    app, db = crear_app()
+    
+    def pedir():
+        cliente = app.test_client()
+        for _ in range(200):
+            cliente.get('/lectura')
+    
+    hilos = [threading.Thread(target=pedir) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    estadisticas = db.estadisticas_replicas()
+    assert estadisticas['lecturas'] == 8 * 200
@@ -0,0 +1,54 @@
+# ============================================
+# PRUEBAS: CACHÉ DE DERIVADOS DE IMÁGENES
+# ============================================
+#
+# CacheImagenes en un directorio temporal con generadores falsos (no
+# necesitan Pillow).
+
+import os
+import threading
+import time
+import pytest
+from backend.imagenes import CacheImagenes
+
+def test_fallos_simultaneos_generan_el_derivado_una_sola_vez(tmp_path):
+    cache = CacheImagenes(str(tmp_path), max_bytes=10 ** 6)
+    barrera = threading.Barrier(8)
+    llamadas = []
+    rutas = []
+    
+    def generar():
+        llamadas.append(True)
+        time.sleep(0.05)   # Los demás hilos llegan mientras se genera
+        return b'x' * 100
+    
+    def pedir():
+        barrera.wait()
+        rutas.append(cache.obtener('ab' * 16, 'webp', generar))
+    
+    hilos = [threading.Thread(target=pedir) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    assert len(llamadas) == 1
+    assert len(set(rutas)) == 1 and os.path.getsize(rutas[0]) == 100
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['generadas'], estadisticas['aciertos']) == (1, 7)
+    assert estadisticas['bytes'] == 100
+    assert cache._generando == {}
+
+def test_un_error_al_generar_no_deja_el_derivado_bloqueado(tmp_path):
+    cache = CacheImagenes(str(tmp_path), max_bytes=10 ** 6)
+    
+    def fallar():
+        raise OSError('imagen dañada')
+    
+    with pytest.raises(OSError):
+        cache.obtener('cd' * 16, 'jpeg', fallar)
+    ruta = cache.obtener('cd' * 16, 'jpeg', lambda: b'y' * 10)
+    
+    assert os.path.getsize(ruta) == 10
+    assert cache.estadisticas()['generadas'] == 1
+    assert not any(nombre.endswith('.tmp') for _, _, nombres in os.walk(tmp_path) for nombre in nombres)
@@ -0,0 +1,49 @@
+# ============================================
+# PRUEBAS: ACCESO A /api/metrics
+# ============================================
+
+import pytest
+
+pytest.importorskip('MySQLdb')
+
+from flask import Flask
+from backend.metricas import acceso_metricas_permitido, init_metricas, leer_ips
+
+def crear_cliente(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    init_metricas(app)
+    return app.test_client()
+
+def test_leer_ips():
+    assert leer_ips(' 127.0.0.1, ::1 ,') == {'127.0.0.1', '::1'}
+    assert leer_ips('') == set()
+    assert leer_ips(None) == set()
+
+def test_acceso_por_ip_o_por_token():
+    permitidas = {'10.0.0.5'}
+    assert acceso_metricas_permitido('10.0.0.5', None, permitidas, '')
+    assert not acceso_metricas_permitido('10.0.0.6', None, permitidas, '')
+    assert acceso_metricas_permitido('10.0.0.6', 'Bearer secreto', permitidas, 'secreto')
+    assert not acceso_metricas_permitido('10.0.0.6', 'Bearer otro', permitidas, 'secreto')
+    # Sin token configurado, ninguna cabecera abre el acceso
+    assert not acceso_metricas_permitido('10.0.0.6', 'Bearer ', permitidas, '')
+
+def test_metricas_rechaza_ips_no_permitidas():
+    cliente = crear_cliente(METRICAS_IPS='10.0.0.5', METRICAS_TOKEN='')
+    respuesta = cliente.get('/api/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'})
+    
+    assert respuesta.status_code == 403
+    assert b'http_peticiones_total' not in respuesta.get_data()
+
+def test_metricas_con_ip_permitida_o_token():
+    cliente = crear_cliente(METRICAS_IPS='127.0.0.1', METRICAS_TOKEN='secreto')
+    
+    local = cliente.get('/api/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+    assert local.status_code == 200
+    assert local.mimetype == 'text/plain'
+    
+    remota = cliente.get('/api/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'},
+                        headers={'Authorization': 'Bearer secreto'})
+    assert remota.status_code == 200
+    assert b'# TYPE http_peticiones_total counter' in remota.get_data()
@@ -0,0 +1,163 @@
+# ============================================
+# PRUEBAS: STREAM DE NOTIFICACIONES (SIN BASE DE DATOS)
+# ============================================
+#
+# Reserva de lugares en CanalEventos, alcance de los tokens de stream y la
+# ruta /stream con una base de datos falsa que no tiene notificaciones (las
+# rutas importan MySQLdb a través de backend.paginacion).
+
+import json
+import threading
+from contextlib import contextmanager
+import pytest
+from flask import Flask
+from backend.eventos import CanalEventos, canal_eventos
+from backend.seguridad import cache_tokens
+from backend.utils import generar_token, generar_token_stream
+
+SECRET_KEY = 'clave-de-pruebas'
+
+# ============================================
+# CanalEventos
+# ============================================
+
+def test_suscribir_respeta_el_maximo_y_cancelar_libera_el_lugar():
+    canal = CanalEventos()
+    primera = canal.suscribir('EST001', 'estudiante', maximo=2)
+    segunda = canal.suscribir('EST001', 'estudiante', maximo=2)
+    
+    assert canal.suscribir('EST002', 'estudiante', maximo=2) is None
+    assert canal.estadisticas()['rechazadas'] == 1
+    
+    primera.cancelar()
+    primera.cancelar()   # Cancelar dos veces no libera dos lugares
+    assert canal.conexiones() == 1
+    assert canal.suscribir('EST002', 'estudiante', maximo=2) is not None
+    assert canal.suscribir('EST003', 'estudiante', maximo=2) is None
+    segunda.cancelar()
+
+def test_conexiones_simultaneas_no_superan_el_maximo():
+    canal = CanalEventos()
+    barrera = threading.Barrier(16)
+    obtenidas = []
+    
+    def conectar(i):
+        barrera.wait()
+        obtenidas.append(canal.suscribir(f'EST{i:03d}', 'estudiante', maximo=4))
+    
+    hilos = [threading.Thread(target=conectar, args=(i,)) for i in range(16)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    assert sum(s is not None for s in obtenidas) == 4
+    assert canal.conexiones() == 4
+
+def test_publicar_desde_varios_hilos_no_pierde_cuentas():
+    canal = CanalEventos(capacidad_cola=1000)
+    suscripciones = [canal.suscribir('EST001', 'estudiante') for _ in range(2)]
+    
+    def publicar():
+        for _ in range(500):
+            canal.publicar('EST001', {'tipo': 'notificacion'})
+    
+    hilos = [threading.Thread(target=publicar) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    estadisticas = canal.estadisticas()
+    assert estadisticas['publicados'] == 8 * 500
+    # Cada evento llega a las dos conexiones o se descarta por cola llena
+    assert estadisticas['entregados'] == 2 * 1000
+    assert estadisticas['entregados'] + estadisticas['descartados'] == 2 * 8 * 500
+    for suscripcion in suscripciones:
+        suscripcion.cancelar()
+
+# ============================================
+# RUTAS
+# ============================================
+
+class BaseDatosFalsa:
+    """Solo atiende las lecturas del stream, siempre sin notificaciones nuevas"""
+    
+    class Cursor:
+        def execute(self, sql, parametros=None):
+            pass
+        
+        def fetchall(self):
+            return []
+        
+        def fetchone(self):
+            return {'ultimo': 0}
+        
+        def close(self):
+            pass
+    
+    class Conexion:
+        def cursor(self):
+            return BaseDatosFalsa.Cursor()
+    
+    @contextmanager
+    def conexion(self):
+        yield self.Conexion()
+
+@pytest.fixture
+def cliente():
+    pytest.importorskip('MySQLdb')
+    from backend.notificaciones_routes import init_notificaciones_routes
+    
+    cache_tokens.limpiar()
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY=SECRET_KEY, PAGINA_TAMANO=50, PAGINA_MAXIMA=500,
+                    SSE_LATIDO_SEGUNDOS=0.01, SSE_DURACION_MAXIMA_SEGUNDOS=0.05,
+                    SSE_MAX_CONEXIONES=1, SSE_SONDEO_SEGUNDOS=60, SSE_TOKEN_SEGUNDOS=60)
+    app.register_blueprint(init_notificaciones_routes(BaseDatosFalsa(), app),
+                        url_prefix='/api/notificaciones')
+    yield app.test_client()
+    cache_tokens.limpiar()
+
+def token_sesion():
+    return generar_token('EST001', 'estudiante', SECRET_KEY, 1)
+
+def test_token_de_stream_y_stream_hasta_reconectar(cliente):
+    respuesta = cliente.post('/api/notificaciones/stream/token',
+                            headers={'Authorization': f'Bearer {token_sesion()}'})
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos['expira_en'] == 60 and datos['sondeo_segundos'] == 60
+    
+    stream = cliente.get(f"/api/notificaciones/stream?token={datos['token']}&desde=0")
+    cuerpo = stream.get_data(as_text=True)
+    
+    assert stream.status_code == 200
+    assert stream.mimetype == 'text/event-stream'
+    assert cuerpo.startswith('retry: ')
+    ultimo = cuerpo.rstrip().split('\n\n')[-1].split('\n')
+    assert ultimo[0] == 'event: reconectar'
+    assert json.loads(ultimo[1][len('data: '):]) == {'ultimo_id': 0}
+    assert canal_eventos.conexiones() == 0
+
+def test_el_token_de_sesion_no_se_acepta_en_la_url(cliente):
+    respuesta = cliente.get(f'/api/notificaciones/stream?token={token_sesion()}')
+    assert respuesta.status_code == 401
+
+def test_el_token_de_stream_no_sirve_para_el_resto_de_la_api(cliente):
+    token = generar_token_stream('EST001', 'estudiante', SECRET_KEY, 60)
+    respuesta = cliente.post('/api/notificaciones/stream/token',
+                            headers={'Authorization': f'Bearer {token}'})
+    assert respuesta.status_code == 401
+
+def test_sin_lugar_libre_responde_429_con_retry_after(cliente):
+    ocupada = canal_eventos.suscribir('EST999', 'estudiante')
+    try:
+        token = generar_token_stream('EST001', 'estudiante', SECRET_KEY, 60)
+        respuesta = cliente.get(f'/api/notificaciones/stream?token={token}')
+    finally:
+        ocupada.cancelar()
+    
+    assert respuesta.status_code == 429
+    assert respuesta.headers['Retry-After'] == '60'
+    assert canal_eventos.conexiones() == 0
@@ -0,0 +1,234 @@
+# ============================================
+# PRUEBAS: PLANES DE LAS CONSULTAS DE LAS RUTAS
+# ============================================
+#
+# Recorre todas las rutas de auth_routes, tareas_routes,
+# calificaciones_routes y dashboard_routes con el cliente de pruebas de Flask contra el MySQL
+# sembrado (conftest.py), captura cada sentencia SQL que emiten y pasa las
+# SELECT/UPDATE/DELETE por EXPLAIN FORMAT=JSON. Una prueba por endpoint
+# falla si alguna de sus sentencias recorre una tabla completa, ordena con
+# filesort o usa una tabla temporal por encima de los umbrales:
+#
+#   PLANES_UMBRAL_ESCANEO=1000 PLANES_UMBRAL_ORDENAMIENTO=1000 python -m pytest tests -q
+#
+# Una ruta nueva sin escenario en recorrer_rutas hace fallar
+# test_todas_las_rutas_tienen_escenario.
+
+import os
+import threading
+from datetime import date, timedelta
+from urllib.parse import quote
+import pytest
+from tests.planes import problemas_plan
+
+UMBRAL_ESCANEO = int(os.environ.get('PLANES_UMBRAL_ESCANEO', 1000))
+UMBRAL_ORDENAMIENTO = int(os.environ.get('PLANES_UMBRAL_ORDENAMIENTO', 1000))
+EXPLICABLES = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+BLUEPRINTS = ('auth', 'tareas', 'calificaciones', 'dashboard')
+
+ENDPOINTS = (
+    'auth.registro_profesor',
+    'auth.registro_estudiante',
+    'auth.registro_lote',
+    'auth.login',
+    'tareas.crear_tarea',
+    'tareas.obtener_tareas_profesor',
+    'tareas.obtener_archivo_profesor',
+    'tareas.buscar_tareas',
+    'tareas.eliminar_tarea',
+    'tareas.obtener_tareas_estudiante',
+    'tareas.obtener_archivo_estudiante',
+    'calificaciones.asignar_calificacion',
+    'calificaciones.asignar_calificaciones_lote',
+    'calificaciones.obtener_entregas',
+    'calificaciones.exportar_libreta',
+    'calificaciones.obtener_estadisticas_estudiante',
+    'dashboard.obtener_dashboard_estudiante'
+)
+
+# Usuarios que crean las rutas de registro (prefijo BENCH: los borra benchmarks.generador)
+REGISTRADOS = {
+    'profesor': ('BENCHXP01', '98000001', 'bench.planes.profesor@gmail.com'),
+    'estudiante': ('BENCHXE01', '98000002', 'bench.planes.estudiante@gmail.com'),
+    'lote': ('BENCHXE02', '98000003', 'bench.planes.lote@gmail.com')
+}
+
+# ============================================
+# PLANES DE EJEMPLO (SIN BASE DE DATOS)
+# ============================================
+
+def test_detecta_recorrido_completo_sobre_el_umbral():
+    plan = {'query_block': {'table': {'table_name': 'tareas', 'access_type': 'ALL',
+                                    'rows_examined_per_scan': 5000, 'rows_produced_per_join': 5000}}}
+    assert problemas_plan(plan, 1000, 1000) == ['recorrido completo de tareas (5000 filas por recorrido)']
+    assert problemas_plan(plan, 10000, 10000) == []
+
+def test_detecta_filesort_y_tabla_temporal_del_join():
+    plan = {'query_block': {'ordering_operation': {
+        'using_filesort': True,
+        'grouping_operation': {
+            'using_temporary_table': True,
+            'nested_loop': [
+                {'table': {'table_name': 't', 'access_type': 'ref',
+                        'rows_examined_per_scan': 20, 'rows_produced_per_join': 20}},
+                {'table': {'table_name': 'e', 'access_type': 'ref',
+                        'rows_examined_per_scan': 300, 'rows_produced_per_join': 6000}}
+            ]
+        }
+    }}}
+    assert problemas_plan(plan, 1000, 1000) == ['filesort sobre ~6000 filas', 'tabla temporal sobre ~6000 filas']
+
+def test_acceso_por_indice_no_es_problema():
+    plan = '{"query_block": {"table": {"table_name": "usuarios", "access_type": "const", "rows_examined_per_scan": 1}}}'
+    assert problemas_plan(plan, 0, 0) == []
+
+# ============================================
+# RUTAS CONTRA MYSQL
+# ============================================
+
+def recorrer_rutas(cliente, conn):
+    """Ejecuta cada ruta (y cada variante de su SQL) con los datos sembrados.
+    
+    Devuelve el id de la tarea creada, ya eliminada lógicamente.
+    """
+    from backend.config import Config
+    from backend.utils import generar_token
+    from benchmarks.generador import CONTRASENA, id_estudiante, id_profesor
+    
+    profesor, estudiante = id_profesor(0), id_estudiante(0)
+    cabeceras = {
+        tipo: {'Authorization': f"Bearer {generar_token(usuario, tipo, Config.SECRET_KEY, 1)}"}
+        for tipo, usuario in (('profesor', profesor), ('estudiante', estudiante))
+    }
+    
+    def pedir(metodo, url, estado, como=None, **opciones):
+        respuesta = cliente.open(url, method=metodo, headers=cabeceras.get(como, {}), **opciones)
+        cuerpo = respuesta.get_data()  # Consume también las respuestas en streaming
+        assert respuesta.status_code == estado, f"{metodo} {url}: {respuesta.status_code} {cuerpo[:200]!r}"
+        return respuesta
+    
+    def paginas(url, como):
+        """Primera página y la siguiente por cursor (la condición keyset cambia el plan)"""
+        primera = pedir('GET', url, 200, como).get_json()
+        if primera.get('siguiente_cursor'):
+            pedir('GET', f"{url}&cursor={quote(primera['siguiente_cursor'])}", 200, como)
+    
+    def datos_registro(clave, **extra):
+        usuario_id, dni, correo = REGISTRADOS[clave]
+        return dict(id=usuario_id, nombres='Prueba', apellidos='Planes', dni=dni,
+                    correo=correo, contrasena='clave123', **extra)
+    
+    # Autenticación
+    pedir('POST', '/api/registro/profesor', 201,
+        json=datos_registro('profesor', especialidad='Matemática'))
+    pedir('POST', '/api/registro/estudiante', 201,
+        json=datos_registro('estudiante', grado='1ro', seccion='A'))
+    fila = datos_registro('lote', grado='1ro', seccion='A')
+    csv = ','.join(fila) + '\n' + ','.join(fila.values()) + '\n'
+    pedir('POST', '/api/registro/estudiante/lote', 200, 'profesor', data=csv, content_type='text/csv')
+    pedir('POST', '/api/login', 200, json={'id': profesor, 'contrasena': CONTRASENA})
+    
+    # Tareas
+    cur = conn.cursor()
+    cur.execute("SELECT curso FROM tareas WHERE profesor_id = %s LIMIT 1", (profesor,))
+    curso = cur.fetchone()['curso']
+    cur.close()
+    tarea_id = pedir('POST', '/api/tareas', 201, 'profesor', json={
+        'titulo': 'Resolver ecuaciones de prueba',
+        'descripcion': 'Tarea creada por las pruebas de planes de consulta',
+        'curso': curso,
+        'tipo': 'tarea',
+        'fechaEntrega': (date.today() + timedelta(days=7)).isoformat()
+    }).get_json()['tarea_id']
+    pedir('GET', '/api/tareas/profesor', 200, 'profesor')
+    paginas('/api/tareas/profesor/archivo?limite=5', 'profesor')
+    paginas('/api/tareas/buscar?q=ecuaciones&limite=10', 'profesor')
+    paginas('/api/tareas/buscar?q=fracciones&tipo=examen&estado=cerrada&limite=10', 'estudiante')
+    paginas('/api/tareas/buscar?estado=activa&limite=10', 'estudiante')
+    paginas('/api/tareas/estudiante?limite=10', 'estudiante')
+    pedir('GET', '/api/tareas/estudiante?formato=ndjson', 200, 'estudiante')
+    paginas('/api/tareas/estudiante/archivo?limite=10', 'estudiante')
+    
+    # Calificaciones
+    pedir('POST', '/api/calificaciones', 200, 'profesor', json={
+        'tarea_id': tarea_id, 'estudiante_id': estudiante, 'nota': 15, 'comentario': 'Prueba'
+    })
+    pedir('POST', '/api/calificaciones/lote', 200, 'profesor', json={'calificaciones': [
+        {'tarea_id': tarea_id, 'estudiante_id': id_estudiante(i), 'nota': 10 + i} for i in range(1, 6)
+    ]})
+    paginas(f'/api/calificaciones/tarea/{tarea_id}/entregas?limite=50', 'profesor')
+    pedir('GET', f'/api/calificaciones/tarea/{tarea_id}/entregas?formato=ndjson', 200, 'profesor')
+    pedir('GET', f'/api/calificaciones/exportar?curso={quote(curso)}&grado=1ro&seccion=A', 200, 'profesor')
+    pedir('GET', '/api/calificaciones/estudiante/estadisticas', 200, 'estudiante')
+    pedir('GET', '/api/dashboard/estudiante', 200, 'estudiante')
+    
+    pedir('DELETE', f'/api/tareas/{tarea_id}', 200, 'profesor')
+    return tarea_id
+
+@pytest.fixture(scope='session')
+def aplicacion():
+    pytest.importorskip('MySQLdb')
+    from app import crear_app
+    return crear_app()
+
+@pytest.fixture(scope='session')
+def sentencias(conexion_mysql, aplicacion):
+    """SQL (con los valores ya interpolados) emitido por cada endpoint: {endpoint: [sql, ...]}"""
+    from flask import has_request_context, request
+    from backend.hashing import pool_hashing
+    from backend.metricas import CursorInstrumentado
+    from backend.purga import Purgador
+    
+    capturadas = {}
+    medir = CursorInstrumentado._medir
+    
+    def medir_y_capturar(self, metodo, query, args):
+        resultado = medir(self, metodo, query, args)
+        if has_request_context() and self._executed:
+            sql = self._executed
+            sql = sql.decode('utf-8', 'replace') if isinstance(sql, bytes) else sql
+            lista = capturadas.setdefault(request.endpoint, [])
+            if sql not in lista:
+                lista.append(sql)
+        return resultado
+    
+    cur = conexion_mysql.cursor()
+    usuarios = [usuario_id for usuario_id, _, _ in REGISTRADOS.values()]
+    cur.execute(f"DELETE FROM usuarios WHERE id IN ({', '.join(['%s'] * len(usuarios))})", usuarios)
+    conexion_mysql.commit()
+    cur.close()
+    
+    with pytest.MonkeyPatch.context() as parche:
+        parche.setattr(CursorInstrumentado, '_medir', medir_y_capturar)
+        try:
+            tarea_id = recorrer_rutas(aplicacion.test_client(), conexion_mysql)
+        finally:
+            aplicacion.extensions['base_datos'].pool.cerrar()
+            pool_hashing.cerrar()
+    
+    Purgador(pausa=0).purgar_tarea(conexion_mysql, tarea_id, threading.Event())
+    return capturadas
+
+def test_todas_las_rutas_tienen_escenario(aplicacion):
+    rutas = {regla.endpoint for regla in aplicacion.url_map.iter_rules()
+            if regla.endpoint.split('.')[0] in BLUEPRINTS}
+    assert rutas == set(ENDPOINTS)
+
+@pytest.mark.parametrize('endpoint', ENDPOINTS)
+def test_plan_de_consultas(endpoint, sentencias, conexion_mysql):
+    assert endpoint in sentencias, f'{endpoint} no ejecutó ninguna sentencia'
+    
+    cur = conexion_mysql.cursor()
+    problemas = []
+    try:
+        for sql in sentencias[endpoint]:
+            if sql.split(None, 1)[0].upper() not in EXPLICABLES:
+                continue
+            cur.execute('EXPLAIN FORMAT=JSON ' + sql)
+            plan = cur.fetchone()['EXPLAIN']
+            for problema in problemas_plan(plan, UMBRAL_ESCANEO, UMBRAL_ORDENAMIENTO):
+                problemas.append(f"{problema}\n    {' '.join(sql.split())[:400]}")
+    finally:
+        cur.close()
+    
+    assert not problemas, f'{endpoint}:\n' + '\n'.join(problemas)
@@ -0,0 +1,171 @@
+# ============================================
+# PRUEBAS: RANKING DE ESTUDIANTES EN MEMORIA
+# ============================================
+#
+# Árbol de Fenwick, puestos con empates y top K de IndiceRanking, comparados
+# con un RANK() calculado a mano como el de la vista ranking_estudiantes.
+
+import random
+from decimal import Decimal
+import pytest
+from backend.ranking import CUBETAS, ArbolFenwick, IndiceRanking
+
+def estudiante(usuario_id, promedio, grado='5to', seccion='A'):
+    return {
+        'usuario_id': usuario_id,
+        'nombres': f'Nombre {usuario_id}',
+        'apellidos': f'Apellido {usuario_id}',
+        'grado': grado,
+        'seccion': seccion,
+        'promedio_general': Decimal(promedio) if promedio is not None else None,
+        'tareas_completadas': 3
+    }
+
+def rank_esperado(filas):
+    """RANK() OVER (ORDER BY promedio_general DESC) de los estudiantes con promedio > 0"""
+    rankeados = [f for f in filas if f['promedio_general'] and f['promedio_general'] > 0]
+    return {f['usuario_id']: 1 + sum(o['promedio_general'] > f['promedio_general'] for o in rankeados)
+            for f in rankeados}
+
+# ============================================
+# ArbolFenwick
+# ============================================
+
+def test_fenwick_desde_conteos_equivale_a_sumar_uno_a_uno():
+    rnd = random.Random(7)
+    conteos = [rnd.randint(0, 3) for _ in range(CUBETAS)]
+    construido = ArbolFenwick.desde_conteos(conteos)
+    incremental = ArbolFenwick(CUBETAS)
+    for i, conteo in enumerate(conteos):
+        incremental.sumar(i, conteo)
+    
+    assert construido._arbol == incremental._arbol
+    for i in (-1, 0, 1, 999, CUBETAS - 2, CUBETAS - 1):
+        assert construido.prefijo(i) == sum(conteos[:i + 1])
+
+def test_fenwick_buscar_devuelve_el_menor_indice_que_alcanza_k():
+    arbol = ArbolFenwick.desde_conteos([0, 2, 0, 0, 1, 3])
+    assert [arbol.buscar(k) for k in range(1, 7)] == [1, 1, 4, 5, 5, 5]
+
+# ============================================
+# IndiceRanking
+# ============================================
+
+def test_cubetas_en_los_extremos_de_0_a_20():
+    assert IndiceRanking.posicion_de(Decimal('20.00')) == 0
+    assert IndiceRanking.posicion_de(Decimal('19.99')) == 1
+    assert IndiceRanking.posicion_de(Decimal('0.01')) == CUBETAS - 2
+    assert IndiceRanking.posicion_de(Decimal('0')) == CUBETAS - 1
+    
+    indice = IndiceRanking()
+    indice.reconstruir([estudiante('A', '20.00'), estudiante('B', '0.01'),
+                        estudiante('C', '0'), estudiante('D', None)])
+    assert indice.posicion('A')['ranking'] == 1
+    assert indice.posicion('B')['ranking'] == 2
+    # Como en la vista, los que no tienen promedio no entran en el ranking
+    assert indice.posicion('C') is None and indice.posicion('D') is None
+    assert indice.top(('global',), 10)[1:] == (2, 0)
+
+def test_empates_comparten_puesto_y_el_siguiente_salta():
+    indice = IndiceRanking()
+    indice.reconstruir([estudiante('A', '18.50'), estudiante('B', '18.50'),
+                        estudiante('C', '17.00'), estudiante('D', '18.50')])
+    
+    assert [indice.posicion(i)['ranking'] for i in 'ABCD'] == [1, 1, 4, 1]
+    top, total, restantes = indice.top(('global',), 4)
+    assert [(e['usuario_id'], e['ranking']) for e in top] == [('A', 1), ('B', 1), ('D', 1), ('C', 4)]
+    assert (total, restantes) == (4, 0)
+
+def test_top_no_pasa_de_k_y_cuenta_los_empatados_que_quedan_fuera():
+    indice = IndiceRanking()
+    indice.reconstruir([estudiante('Z', '19')] +
+                    [estudiante(f'E{i:03d}', '15') for i in range(500)])
+    
+    # Los empatados que caben van por apellido y nombre
+    top, total, restantes = indice.top(('global',), 3)
+    assert [(e['usuario_id'], e['ranking']) for e in top] == [('Z', 1), ('E000', 2), ('E001', 2)]
+    assert (total, restantes) == (501, 498)
+    
+    top, _, restantes = indice.top(('global',), 1)
+    assert [e['usuario_id'] for e in top] == ['Z'] and restantes == 0
+
+def test_actualizar_mueve_al_estudiante_y_lo_quita_sin_promedio():
+    indice = IndiceRanking()
+    indice.reconstruir([estudiante('A', '15'), estudiante('B', '16'), estudiante('C', '17')])
+    assert indice.posicion('A')['ranking'] == 3
+    
+    indice.actualizar([estudiante('A', '19.25')])
+    assert indice.posicion('A')['ranking'] == 1
+    assert indice.posicion('C')['ranking'] == 2
+    
+    indice.actualizar([{'usuario_id': 'C', 'promedio_general': None}])
+    assert indice.posicion('C') is None
+    assert indice.top(('global',), 10)[1] == 2
+    
+    indice.actualizar([estudiante('N', '16')])   # Estudiante nuevo
+    assert indice.posicion('N')['ranking'] == 2
+    assert indice.posicion('B')['ranking'] == 2
+
+def test_ambitos_por_grado_y_seccion():
+    indice = IndiceRanking()
+    indice.reconstruir([estudiante('A', '12', '5to', 'A'), estudiante('B', '14', '5to', 'B'),
+                        estudiante('C', '16', '4to', 'A')])
+    
+    puestos = indice.posicion('A')['puestos']
+    assert puestos['global'] == {'ranking': 3, 'total': 3}
+    assert puestos['grado'] == {'ranking': 2, 'total': 2}
+    assert puestos['seccion'] == {'ranking': 1, 'total': 1}
+    
+    # Al quedar vacío, el ámbito desaparece
+    indice.actualizar([{'usuario_id': 'C', 'promedio_general': 0}])
+    assert indice.top(('grado', '4to'), 5) == ([], 0, 0)
+
+@pytest.mark.parametrize('semilla', [1, 2, 3])
+def test_coincide_con_rank_tras_actualizaciones_aleatorias(semilla):
+    rnd = random.Random(semilla)
+    notas = [Decimal(rnd.randint(0, 40)) / 2 for _ in range(200)]   # Muchos empates, incluye 0 y 20
+    filas = {i: estudiante(f'E{i:03d}', n, rnd.choice(['4to', '5to']), rnd.choice('AB'))
+            for i, n in enumerate(notas)}
+    indice = IndiceRanking()
+    indice.reconstruir(list(filas.values()))
+    
+    for _ in range(300):
+        i = rnd.randrange(len(filas))
+        filas[i] = dict(filas[i], promedio_general=Decimal(rnd.randint(0, 2000)) / 100)
+        indice.actualizar([filas[i]])
+    
+    esperado = rank_esperado(filas.values())
+    assert {f['usuario_id']: (indice.posicion(f['usuario_id']) or {}).get('ranking')
+            for f in filas.values()} == {f['usuario_id']: esperado.get(f['usuario_id'])
+                                        for f in filas.values()}
+    
+    top, total, restantes = indice.top(('global',), 10)
+    assert total == len(esperado)
+    assert len(top) == min(10, total)
+    assert [e['ranking'] for e in top] == sorted(esperado[e['usuario_id']] for e in top)
+    # Dentro de cada puesto, por apellidos y nombres aunque hayan llegado por actualizaciones
+    assert top == sorted(top, key=lambda e: (e['ranking'], e['apellidos'], e['nombres']))
+    # Los que quedaron fuera empatan con el último devuelto
+    assert restantes == sum(p == top[-1]['ranking'] for p in esperado.values()) - sum(
+        e['ranking'] == top[-1]['ranking'] for e in top)
+
+def test_refrescar_estudiantes_relee_los_promedios():
+    class Cursor:
+        def __init__(self, filas):
+            self.filas, self.sentencias = filas, []
+        
+        def execute(self, sql, parametros):
+            self.sentencias.append(parametros)
+        
+        def fetchall(self):
+            return self.filas
+    
+    indice = IndiceRanking()
+    indice.reconstruir([estudiante('A', '10'), estudiante('B', '12')])
+    # B ya no aparece en la base de datos: sale del ranking
+    cur = Cursor([estudiante('A', '13')])
+    indice.refrescar_estudiantes(cur, ['B', 'A', 'A'])
+    
+    assert cur.sentencias == [['A', 'B']]
+    assert indice.posicion('A')['ranking'] == 1
+    assert indice.posicion('B') is None
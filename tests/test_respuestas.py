@@ -0,0 +1,146 @@
+# ============================================
+# PRUEBAS: COMPRESIÓN NEGOCIADA Y ETAGS DE VARIANTES
+# ============================================
+#
+# Negociación de Accept-Encoding, compresión de cuerpos y streams, y los
+# ETag de las variantes comprimidas en los 200 y 304 de respuesta_cacheada.
+
+import gzip
+import pytest
+from flask import Flask, Response, g, jsonify
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from backend.cache import cache_respuestas, respuesta_cacheada
+from backend.respuestas import CompresorRespuestas, compresor_respuestas, init_respuestas
+
+def aceptadas(texto):
+    return parse_accept_header(texto, Accept)
+
+# ============================================
+# CompresorRespuestas
+# ============================================
+
+@pytest.mark.parametrize('cabecera, esperada', [
+    ('gzip, br', 'br'),            # Empate: gana br
+    ('br;q=0.5, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('identity', None),
+    ('*', 'br'),
+    ('*, br;q=0', 'gzip')
+])
+def test_negociar(cabecera, esperada):
+    compresor = CompresorRespuestas()
+    compresor.codificaciones = ('br', 'gzip')   # Sin depender de que brotli esté instalado
+    assert compresor.negociar(aceptadas(cabecera)) == esperada
+
+def test_sin_brotli_solo_se_ofrece_gzip(monkeypatch):
+    monkeypatch.setattr('backend.respuestas.brotli', None)
+    assert CompresorRespuestas().negociar(aceptadas('br')) is None
+
+def test_cuerpos_pequenos_o_no_comprimibles_no_se_comprimen():
+    compresor = CompresorRespuestas(minimo=100)
+    pequena = Response(b'{"a":1}', mimetype='application/json')
+    imagen = Response(b'x' * 500, mimetype='image/png')
+    
+    assert 'Content-Encoding' not in compresor.procesar(pequena, aceptadas('gzip')).headers
+    assert 'Content-Encoding' not in compresor.procesar(imagen, aceptadas('gzip')).headers
+
+def test_gzip_se_descomprime_y_el_etag_lleva_la_codificacion():
+    compresor = CompresorRespuestas(minimo=100)
+    cuerpo = b'{"tareas":[' + b'{"id":1},' * 100 + b'{"id":2}]}'
+    respuesta = Response(cuerpo, mimetype='application/json')
+    respuesta.set_etag('abc')
+    
+    respuesta = compresor.procesar(respuesta, aceptadas('gzip'))
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert respuesta.get_etag() == ('abc-gzip', False)
+    assert 'Accept-Encoding' in respuesta.vary
+    assert gzip.decompress(respuesta.get_data()) == cuerpo
+    assert compresor.estadisticas()['comprimidas_gzip'] == 1
+
+def test_stream_comprimido_y_cerrado():
+    compresor = CompresorRespuestas(minimo=100)
+    cerrado = []
+    
+    class Trozos:
+        def __iter__(self):
+            return iter([b'{"id":1}\n', '{"id":2}\n'])
+        
+        def close(self):
+            cerrado.append(True)
+    
+    respuesta = Response(Trozos(), mimetype='application/x-ndjson')
+    respuesta = compresor.procesar(respuesta, aceptadas('gzip'))
+    
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(b''.join(respuesta.response)) == b'{"id":1}\n{"id":2}\n'
+    assert cerrado == [True]
+
+# ============================================
+# ETags de variantes en respuesta_cacheada
+# ============================================
+
+@pytest.fixture
+def cliente():
+    cache_respuestas.limpiar()
+    app = Flask(__name__)
+    init_respuestas(app)
+    tamano = {'filas': 1000}   # Por encima de COMPRESION_MINIMO_BYTES
+    
+    @app.before_request
+    def autenticar():
+        g.usuario = {'usuario_id': 'EST001', 'tipo': 'estudiante'}
+    
+    @app.route('/listado')
+    @respuesta_cacheada(lambda usuario: [('estudiante', usuario['usuario_id'])])
+    def listado():
+        return jsonify({'exito': True, 'filas': list(range(tamano['filas']))})
+    
+    cliente = app.test_client()
+    cliente.tamano = tamano
+    yield cliente
+    cache_respuestas.limpiar()
+
+def test_304_de_la_variante_aunque_haya_salido_del_lru(cliente):
+    primera = cliente.get('/listado', headers={'Accept-Encoding': 'gzip'})
+    etag = primera.get_etag()[0]
+    assert etag.endswith('-gzip')
+    assert primera.headers['Content-Encoding'] == 'gzip'
+    
+    with compresor_respuestas._lock:
+        compresor_respuestas._variantes.clear()
+    
+    respuesta = cliente.get('/listado', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert respuesta.status_code == 304
+    assert respuesta.get_etag()[0] == etag
+    assert 'Accept-Encoding' in respuesta.vary
+
+def test_304_lleva_la_variante_que_negocia_el_cliente(cliente):
+    etag = cliente.get('/listado', headers={'Accept-Encoding': 'gzip'}).get_etag()[0]
+    base = etag[:-len('-gzip')]
+    
+    # El mismo cliente sin Accept-Encoding recibe el ETag sin sufijo
+    sin_compresion = cliente.get('/listado', headers={'If-None-Match': f'"{etag}"'})
+    assert sin_compresion.status_code == 304
+    assert sin_compresion.get_etag()[0] == base
+    
+    con_base = cliente.get('/listado', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{base}"'})
+    assert con_base.status_code == 304
+    assert con_base.get_etag()[0] == etag
+
+def test_solo_coinciden_el_etag_y_sus_variantes_exactas(cliente):
+    base = cliente.get('/listado').get_etag()[0]
+    
+    for recibido in (f'{base}-deflate', f'{base}-gzip-x', base[:-1]):
+        assert cliente.get('/listado', headers={'If-None-Match': f'"{recibido}"'}).status_code == 200
+    assert cliente.get('/listado', headers={'If-None-Match': f'"{base}-gzip"'}).status_code == 304
+
+def test_304_de_un_cuerpo_pequeno_no_lleva_sufijo(cliente):
+    cliente.tamano['filas'] = 3
+    primera = cliente.get('/listado', headers={'Accept-Encoding': 'gzip'})
+    etag = primera.get_etag()[0]
+    assert 'Content-Encoding' not in primera.headers
+    
+    respuesta = cliente.get('/listado', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert respuesta.status_code == 304
+    assert respuesta.get_etag()[0] == etag